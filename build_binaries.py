@@ -8,15 +8,69 @@ import os
 import platform
 import subprocess
 import sys
+import time
 import shutil
+import tarfile
 import argparse
 from pathlib import Path
 
+# Never imported by the CLI at runtime: optional extras of our dependencies, the openai CLI and
+# API areas the bridge doesn't call. Keeping them out shrinks the bundle and the import scan.
+EXCLUDED_MODULES = [
+    "requests", "numpy", "pandas", "tkinter", "IPython", "pytest", "PIL", "tqdm", "typer", "mcp.cli",
+    "openai.cli", "openai.helpers", "openai.voice_helpers", "openai.resources.beta", "openai.resources.audio",
+    "openai.resources.realtime", "openai.resources.fine_tuning", "openai.resources.vector_stores",
+    "openai.resources.evals", "openai.resources.containers", "openai.resources.uploads",
+    "openai.resources.batches", "openai.resources.images", "openai.resources.webhooks",
+]
+
+# Where onedir builds are unpacked once and reused by every run
+DEFAULT_INSTALL_ROOT = Path.home() / ".local" / "share" / "computer"
+
+def pyinstaller_args(binary_name, layout="onefile", optimize=1):
+    """PyInstaller arguments for a layout: onefile unpacks itself on every run, onedir is already unpacked."""
+    args = ["--noconfirm", f"--{layout}", "--name", binary_name]
+    if optimize: args += ["--optimize", str(optimize)]
+    for module in EXCLUDED_MODULES: args += ["--exclude-module", module]
+    return args + ["src/mcp_llm_bridge/main.py"]
+
+def archive_onedir(binary_name):
+    """Pack dist/<name>/ into dist/<name>-onedir.tar.gz for releases."""
+    archive = Path("dist") / f"{binary_name}-onedir.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar: tar.add(Path("dist") / binary_name, arcname=binary_name)
+    return archive
+
+def install_onedir(binary_name, install_root=DEFAULT_INSTALL_ROOT, bin_dir=Path.home() / ".local" / "bin"):
+    """Copy an onedir build into a versioned cache directory and point bin_dir/computer at it."""
+    target = Path(install_root) / f"{binary_name}-{int(time.time())}"
+    shutil.copytree(Path("dist") / binary_name, target)
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    link, staging = bin_dir / "computer", bin_dir / ".computer.new"
+    if staging.is_symlink() or staging.exists(): staging.unlink()
+    staging.symlink_to(target / binary_name)
+    os.replace(staging, link)  # Atomic swap, so a running shell never sees a missing binary
+    for old in Path(install_root).glob(f"{binary_name}-*"):
+        if old != target: shutil.rmtree(old, ignore_errors=True)
+    print(f"Installed to {target}, linked from {link}")
+    return link
+
+def benchmark_startup(executable, runs=5):
+    """Time `executable --help`: the first run after the build (cold) and the median of the next runs (warm)."""
+    def once():
+        started = time.perf_counter()
+        subprocess.run([str(executable), "--help"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return time.perf_counter() - started
+    cold = once()
+    warm = sorted(once() for _ in range(runs))
+    print(f"Startup benchmark for {executable}: cold {cold * 1000:.0f} ms, "
+          f"warm median {warm[len(warm) // 2] * 1000:.0f} ms (best {warm[0] * 1000:.0f} ms over {runs} runs)")
+    return cold, warm
+
 def run_command(cmd):
     print(f"Running: {' '.join(cmd if isinstance(cmd, list) else cmd.split())}")
     subprocess.run(cmd if isinstance(cmd, list) else cmd.split(), check=True)
 
-def build_native():
+def build_native(layout="onefile", optimize=1, install=False, benchmark=True):
     """Build for the current platform"""
     # Ensure PyInstaller is installed
     try:
@@ -46,12 +100,7 @@ def build_native():
         binary_name += ".exe"
     
     # PyInstaller command
-    pyinstaller_cmd = [
-        "pyinstaller",
-        "--onefile",
-        "--name", binary_name,
-        "src/mcp_llm_bridge/main.py"
-    ]
+    pyinstaller_cmd = ["pyinstaller"] + pyinstaller_args(binary_name, layout, optimize)
     
     # Run PyInstaller
     run_command(pyinstaller_cmd)
@@ -63,9 +112,17 @@ def build_native():
     if os.path.exists(f"{binary_name}.spec"):
         os.remove(f"{binary_name}.spec")
     
-    print(f"Build complete. Binary available at dist/{binary_name}")
+    if layout == "onedir":
+        executable = dist_dir / binary_name / binary_name
+        print(f"Build complete. Directory available at dist/{binary_name}, archive at {archive_onedir(binary_name)}")
+        if install: executable = install_onedir(binary_name)
+    else:
+        executable = dist_dir / binary_name
+        print(f"Build complete. Binary available at dist/{binary_name}")
+    
+    if benchmark: benchmark_startup(executable)
 
-def build_docker(platform, arch):
+def build_docker(platform, arch, layout="onefile", optimize=1):
     """Build for the specified platform and architecture using Docker"""
     if platform == "macos":
         docker_platform = f"linux/{arch}"
@@ -101,8 +158,9 @@ def build_docker(platform, arch):
         "apt-get install -y python3-pip && "
         "pip install pyinstaller && "
         "pip install -e . && "
-        f"pyinstaller --onefile --name {binary_name} src/mcp_llm_bridge/main.py && "
-        f"chmod 755 dist/{binary_name}"
+        f"pyinstaller {' '.join(pyinstaller_args(binary_name, layout, optimize))} && "
+        + (f"tar -czf dist/{binary_name}-onedir.tar.gz -C dist {binary_name}" if layout == "onedir"
+           else f"chmod 755 dist/{binary_name}")
     ]
     
     # Run Docker command
@@ -114,11 +172,11 @@ def build_docker(platform, arch):
         print("Make sure Docker is installed and has proper architecture emulation support.")
         print("For ARM64 emulation: docker run --privileged --rm tonistiigi/binfmt --install arm64")
 
-def build_linux_arm64():
+def build_linux_arm64(layout="onefile", optimize=1):
     """Legacy function for backward compatibility"""
-    build_docker("linux", "arm64")
+    build_docker("linux", "arm64", layout, optimize)
 
-def build_all():
+def build_all(layout="onefile", optimize=1):
     """Build binaries for all supported platforms"""
     platforms = [
         ("linux", "amd64"),
@@ -129,7 +187,7 @@ def build_all():
     for platform, arch in platforms:
         try:
             print(f"\n=== Building {platform}-{arch} ===\n")
-            build_docker(platform, arch)
+            build_docker(platform, arch, layout, optimize)
         except Exception as e:
             print(f"Error building {platform}-{arch}: {e}")
     
@@ -141,16 +199,23 @@ if __name__ == "__main__":
                         choices=["native", "linux-amd64", "linux-arm64", "windows-amd64", "all", "arm64"],
                         default="native", 
                         help="Target platform (default: native)")
+    parser.add_argument("--layout", choices=["onefile", "onedir"], default="onefile",
+                        help="onedir skips the per-run unpacking of onefile and starts much faster")
+    parser.add_argument("--optimize", type=int, choices=[0, 1, 2], default=1,
+                        help="Bytecode optimization level for bundled modules (2 also strips docstrings)")
+    parser.add_argument("--install", action="store_true",
+                        help=f"Install a native onedir build under {DEFAULT_INSTALL_ROOT} and link ~/.local/bin/computer")
+    parser.add_argument("--no-benchmark", action="store_true", help="Skip the cold/warm startup benchmark")
     
     args = parser.parse_args()
     
     if args.platform == "native":
-        build_native()
+        build_native(args.layout, args.optimize, args.install, not args.no_benchmark)
     elif args.platform == "arm64" or args.platform == "linux-arm64":
-        build_linux_arm64()
+        build_linux_arm64(args.layout, args.optimize)
     elif args.platform == "linux-amd64":
-        build_docker("linux", "amd64")
+        build_docker("linux", "amd64", args.layout, args.optimize)
     elif args.platform == "windows-amd64":
-        build_docker("windows", "amd64")
+        build_docker("windows", "amd64", args.layout, args.optimize)
     elif args.platform == "all":
-        build_all()
\ No newline at end of file
+        build_all(args.layout, args.optimize)
\ No newline at end of file
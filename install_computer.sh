@@ -38,24 +38,37 @@ fi
 echo "Detected platform: $SYSTEM-$ARCH"
 
 # Get latest release info
-LATEST_RELEASE_URL=$(curl -s https://api.github.com/repos/theycallmeloki/milady-llm-bridge/releases/latest | grep "browser_download_url.*computer-$SYSTEM-$ARCH" | head -n 1 | sed 's/.*"browser_download_url": *"\(.*\)".*/\1/')
+RELEASE_JSON=$(curl -s https://api.github.com/repos/theycallmeloki/milady-llm-bridge/releases/latest)
+LATEST_RELEASE_URL=$(echo "$RELEASE_JSON" | grep "browser_download_url.*computer-$SYSTEM-$ARCH\"" | head -n 1 | sed 's/.*"browser_download_url": *"\(.*\)".*/\1/')
+ONEDIR_URL=$(echo "$RELEASE_JSON" | grep "browser_download_url.*computer-$SYSTEM-$ARCH-onedir.tar.gz" | head -n 1 | sed 's/.*"browser_download_url": *"\(.*\)".*/\1/')
 
-if [[ -z "$LATEST_RELEASE_URL" ]]; then
+if [[ -z "$LATEST_RELEASE_URL" && -z "$ONEDIR_URL" ]]; then
   echo "Error: Could not find a release for your platform ($SYSTEM-$ARCH)"
   echo "Please download the appropriate binary directly from:"
   echo "https://github.com/theycallmeloki/milady-llm-bridge/releases/latest"
   exit 1
 fi
 
-echo "Downloading latest computer CLI from: $LATEST_RELEASE_URL"
-
 # Create a temporary directory
 TEMP_DIR=$(mktemp -d)
 TEMP_FILE="$TEMP_DIR/computer"
 
-# Download binary
-curl -L -o "$TEMP_FILE" "$LATEST_RELEASE_URL"
-chmod +x "$TEMP_FILE"
+if [[ -n "$ONEDIR_URL" ]]; then
+  # Pre-extracted build: unpacked once into a cache directory, so runs skip the self-extraction step
+  LIB_DIR="$HOME/.local/share/computer"
+  echo "Downloading latest computer CLI from: $ONEDIR_URL"
+  curl -L -o "$TEMP_DIR/computer.tar.gz" "$ONEDIR_URL"
+  mkdir -p "$LIB_DIR"
+  rm -rf "$LIB_DIR/computer-$SYSTEM-$ARCH"
+  tar -xzf "$TEMP_DIR/computer.tar.gz" -C "$LIB_DIR"
+  ln -s "$LIB_DIR/computer-$SYSTEM-$ARCH/computer-$SYSTEM-$ARCH" "$TEMP_FILE"
+  echo "Unpacked to $LIB_DIR/computer-$SYSTEM-$ARCH"
+else
+  echo "Downloading latest computer CLI from: $LATEST_RELEASE_URL"
+  # Download binary
+  curl -L -o "$TEMP_FILE" "$LATEST_RELEASE_URL"
+  chmod +x "$TEMP_FILE"
+fi
 
 # Determine installation directory
 PRIMARY_INSTALL_DIR="/usr/local/bin"
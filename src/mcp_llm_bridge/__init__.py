@@ -1,5 +1,6 @@
 # src/mcp_llm_bridge/__init__.py
 from .mcp_client import MCPClient
 from .bridge import MCPLLMBridge, BridgeManager
+from .conversation import Conversation
 from .config import BridgeConfig, LLMConfig
 from .llm_client import LLMClient
\ No newline at end of file
@@ -1,19 +1,134 @@
 # src/mcp_llm_bridge/bridge.py
+import sys
 import json
-from mcp_llm_bridge.mcp_client import MCPClient
-from mcp_llm_bridge.llm_client import LLMClient
-from mcp_llm_bridge.logging_config import notify_tool_call
-from mcp_llm_bridge.config import SSEServerParameters
+import time
+import hashlib
+import asyncio
+import itertools
+import logging
+from mcp_llm_bridge.mcp_client import MCPClient, progress_token
+from mcp_llm_bridge.multi_client import MultiMCPClient, sanitize_tool_name
+from mcp_llm_bridge.llm_client import LLMClient, estimate_tokens
+from mcp_llm_bridge.logging_config import dispatch_event
+from mcp_llm_bridge.events import emit, ToolCallStartEvent, ToolCallEndEvent, MCPNotificationEvent
+from mcp_llm_bridge.conversation import Conversation
+from mcp_llm_bridge.usage import UsageTotals
+from mcp_llm_bridge.scheduler import shared_limiter, server_key
+from mcp_llm_bridge.circuit import CircuitBoard
+from mcp_llm_bridge.singleflight import SingleFlight, call_key, is_idempotent
+from mcp_llm_bridge.prompt_cache import PromptCache
+from mcp_llm_bridge.config import SSEServerParameters, ContentPolicy
+from mcp_llm_bridge.session_store import SessionStore
+from mcp_llm_bridge.condense import condense, FETCH_TOOL, FETCH_TOOL_NAME
+from mcp_llm_bridge.content import render_tool_result
+from mcp_llm_bridge.validation import parse_arguments, compile_validator, format_validation_error
+
+logger = logging.getLogger(__name__)
+
+async def _within(coro, timeout):
+    """Await coro in this task, cancelling it after `timeout` seconds (then TimeoutError).
+
+    Unlike asyncio.wait_for before Python 3.12 it doesn't move coro to another task, which
+    anyio-based transports need to exit their cancel scopes.
+    """
+    task, expired = asyncio.current_task(), []
+    def expire():
+        expired.append(True)
+        task.cancel()
+    handle = asyncio.get_running_loop().call_later(timeout, expire)
+    try: return await coro
+    except asyncio.CancelledError:
+        if not expired: raise
+        if hasattr(task, "uncancel"): task.uncancel()
+        raise TimeoutError(f"Gave up after {timeout:g}s") from None
+    finally: handle.cancel()
 
 class MCPLLMBridge:
-    def __init__(self, config):
+    def __init__(self, config, mcp_client=None, llm_client=None):
         self.config = config
-        self.mcp_client = MCPClient(config.mcp_server_params)
-        self.llm_client = LLMClient(config.llm_config)
+        # An already-connected client (e.g. a StdioServerPool lease) skips spawning a server
+        params = config.mcp_server_params
+        self.mcp_client = mcp_client or (MultiMCPClient(params) if isinstance(params, (list, tuple, dict))
+                                         else MCPClient(params))
+        self.llm_client = llm_client or LLMClient(config.llm_config)
+        self._apply_mcp_rate_limit(getattr(config, "mcp_rate_limit", None))
+        circuit = getattr(config, "circuit", None)
+        self.circuits = CircuitBoard(circuit) if circuit else None
+        if circuit and circuit.hide_open_tools: self.llm_client.tool_filter = self._available_tools
+        self.single_flight = SingleFlight()
+        self.idempotent_tools = set(getattr(config, "idempotent_tools", None) or [])
+        cache = getattr(config, "prompt_cache", None)
+        self.prompt_cache = PromptCache(cache.path, cache.threshold, cache.ttl_seconds, cache.max_entries) if cache else None
+        self.read_only_tools = set(cache.read_only_tools) if cache else set()
         if config.system_prompt: self.llm_client.system_prompt = config.system_prompt
         self.available_tools = []
         self.tool_name_mapping = {}
+        self.tool_validators = {}
+        self.session_store = None
+        self._calling_sinks = {}
+        self._progress_sinks = {}  # progressToken of an in-flight tool call -> its conversation's sink
+        self._progress_tokens = itertools.count(1)
+        self._conversation = Conversation(self)
+        self.timings = {}
+        self.usage = UsageTotals()  # Token usage of every conversation on this bridge
+        session = getattr(config, "session", None)
+        if session:
+            self.session_store = SessionStore(session.path, session.max_bytes, session.max_age_days)
+            self.llm_client.messages = self.session_store.open(session.name)
         
+    def _apply_mcp_rate_limit(self, rate_limit):
+        # One shared limiter per server, so every bridge in the process honours the same limit
+        if rate_limit is None: return
+        clients = getattr(self.mcp_client, "clients", None)
+        for client in clients.values() if isinstance(clients, dict) else [self.mcp_client]:
+            client.limiter = shared_limiter(server_key(getattr(client, "server_params", None)), rate_limit)
+
+    def _cache_scope(self):
+        # Cached answers are only reused under the same model, system prompt and tool set
+        key = [self.config.llm_config.model, self.llm_client.system_prompt or "", *sorted(self.tool_name_mapping)]
+        return hashlib.sha256("\0".join(key).encode()).hexdigest()[:16]
+
+    def _read_only(self, openai_name):
+        return openai_name == FETCH_TOOL_NAME or self.tool_name_mapping.get(openai_name) in self.read_only_tools
+
+    def _available_tools(self, tools):
+        # OpenAI-format tools minus those whose circuit is open
+        return [tool for tool in tools if self.circuits.available(
+            self.tool_name_mapping.get(tool.get("function", {}).get("name"), ""))]
+
+    async def _call_tool(self, mcp_name, arguments, turn_results=None):
+        # Identical calls to idempotent tools share one request: within a turn, and while in flight
+        key = call_key(mcp_name, arguments) if mcp_name in self.idempotent_tools else None
+        if key is None: return await self._call_mcp_tool(mcp_name, arguments)
+        if turn_results is not None and key in turn_results:
+            self.single_flight.saved_calls += 1
+            return turn_results[key]
+        result = await self.single_flight.do(key, lambda: self._call_mcp_tool(mcp_name, arguments))
+        if turn_results is not None: turn_results[key] = result
+        return result
+
+    async def _call_mcp_tool(self, mcp_name, arguments):
+        # call_tool with the tool's circuit breaker timing and judging the call
+        breaker = self.circuits.get(mcp_name) if self.circuits else None
+        if not breaker: return await self.mcp_client.call_tool(mcp_name, arguments)
+        timeout, started = breaker.config.call_timeout, time.monotonic()
+        try:
+            if timeout is None: result = await self.mcp_client.call_tool(mcp_name, arguments)
+            else:
+                # _within keeps the call in this task (anyio transports), unlike wait_for before 3.12
+                try: result = await _within(self.mcp_client.call_tool(mcp_name, arguments), timeout)
+                except TimeoutError: raise TimeoutError(f"{mcp_name} timed out after {timeout:g}s") from None
+        except asyncio.CancelledError:
+            breaker.cancel()
+            raise
+        except Exception:
+            breaker.record(time.monotonic() - started, True)
+            raise
+        # An isError result is usually the model's mistake (bad arguments, a missing item), not a broken tool
+        tool_error = breaker.config.count_tool_errors and getattr(result, "isError", False) is True
+        breaker.record(time.monotonic() - started, tool_error)
+        return result
+
     async def update_template(self, template_name, content):
         """Update a template directly from piped input without using MCP or LLMs.
         Specifically designed to handle Jenkinsfile templates."""
@@ -61,12 +176,11 @@ class MCPLLMBridge:
             except Exception as inner_e:
                 raise RuntimeError(f"Failed to update template: {str(inner_e) or str(e)}")
 
-    async def initialize(self):
-        try:
-            # Super kawaii Milady boot sequence
-            import time, random, requests
-            
-            small_milady_logo = """
+    async def _boot_sequence(self):
+        # Super kawaii Milady boot sequence
+        import random
+        
+        small_milady_logo = """
              ,.. ,.,
         ......,,.,,,,,,,
      ..,,..,,,,***,,.,,,,,.,
@@ -79,39 +193,67 @@ class MCPLLMBridge:
    ,,,,......%&&&&&%&%%%,,,,,
        ,,,...             ,,
     """
-            print(small_milady_logo)
-            print("\n⋆ ˚｡⋆୨♡୧⋆ ˚｡⋆  cute/acc  ⋆ ˚｡⋆୨♡୧⋆ ˚｡⋆\n")
-            
-            boot_messages = [
-                "˚₊‧꒰ა ☆ ໒꒱ Agent Milady...",
-                "˚✧₊⁎( ˘ω˘ )⁎⁺˳✧༚ Upgrading to Milady Context Protocol...",
-            ]
-            
-            # Print boot messages with cute typing effect
-            for msg in boot_messages:
-                for char in msg:
-                    print(char, end="", flush=True)
-                    time.sleep(random.uniform(0.01, 0.03))
-                time.sleep(0.3)
-                print(" ✓")
-                
-            # Note: removed health check since we try to connect anyway
-            
-            # Connect to MCP silently
-            print("\n", end="")  # Add a newline for spacing
+        print(small_milady_logo)
+        print("\n⋆ ˚｡⋆୨♡୧⋆ ˚｡⋆  cute/acc  ⋆ ˚｡⋆୨♡୧⋆ ˚｡⋆\n")
+        
+        boot_messages = [
+            "˚₊‧꒰ა ☆ ໒꒱ Agent Milady...",
+            "˚✧₊⁎( ˘ω˘ )⁎⁺˳✧༚ Upgrading to Milady Context Protocol...",
+        ]
+        
+        # Print boot messages with cute typing effect; the sleeps yield so connecting carries on meanwhile
+        for msg in boot_messages:
+            for char in msg:
+                print(char, end="", flush=True)
+                await asyncio.sleep(random.uniform(0.01, 0.03))
+            await asyncio.sleep(0.3)
+            print(" ✓")
+        print("\n", end="")  # Add a newline for spacing
+
+    async def _connect_and_discover(self):
+        # Connect to MCP silently
+        started = time.monotonic()
+        await self.mcp_client.connect()
+        self.timings["mcp_connect"] = time.monotonic() - started
+        server_timings = getattr(self.mcp_client, "timings", None)
+        if isinstance(server_timings, dict):
+            self.timings.update({f"mcp_connect:{alias}": seconds for alias, seconds in server_timings.items()})
+        
+        # Register notification handler
+        self.mcp_client.register_notification_handler("notifications/progress", self._on_progress_notification)
+        
+        # Get and convert tools
+        await self.refresh_tools()
+
+    async def refresh_tools(self):
+        """Fetch and convert the MCP tool list (again, e.g. after the server's tools changed)."""
+        started = time.monotonic()
+        mcp_tools = await self.mcp_client.get_available_tools()
+        self.timings["list_tools"] = time.monotonic() - started
+        self.available_tools = getattr(mcp_tools, 'tools', mcp_tools)
+        # Start over from a real listing, so tools the server dropped stop resolving
+        if isinstance(self.available_tools, list): self.tool_name_mapping, self.tool_validators = {}, {}
+        # Replaced in place: conversations forked earlier share this list and see the new catalog
+        self.llm_client.tools[:] = self._convert_mcp_tools_to_openai_format(self.available_tools)
+        return self.available_tools
+
+    async def reconnect(self):
+        """Reopen a dropped MCP connection in the current task and reload its tools."""
+        reconnect, close = getattr(self.mcp_client, "reconnect", None), getattr(self.mcp_client, "_close", None)
+        if reconnect: await reconnect()
+        elif close:
+            try: await close()
+            except Exception as e: logger.debug("Closing the dropped MCP connection failed: %s", e)
             await self.mcp_client.connect()
-            
-            # Register notification handler
-            from mcp_llm_bridge.logging_config import notify_mcp_notification
-            self.mcp_client.register_notification_handler(
-                "notifications/progress", 
-                lambda params: notify_mcp_notification("notifications/progress", params)
-            )
-            
-            # Get and convert tools
-            mcp_tools = await self.mcp_client.get_available_tools()
-            self.available_tools = getattr(mcp_tools, 'tools', mcp_tools)
-            self.llm_client.tools = self._convert_mcp_tools_to_openai_format(self.available_tools)
+        else: raise RuntimeError("This MCP client can't reconnect")
+        await self.refresh_tools()
+
+    async def initialize(self):
+        try:
+            # The boot animation runs alongside MCP connect and tool discovery
+            boot = asyncio.ensure_future(self._boot_sequence())
+            try: await self._connect_and_discover()
+            finally: await boot
             return True
         except Exception: return False
 
@@ -121,7 +263,7 @@ class MCPLLMBridge:
         - Replace hyphens and spaces with underscores
         - Convert to lowercase
         """
-        return name.replace("-", "_").replace(" ", "_").lower()
+        return sanitize_tool_name(name)
         
     def _convert_mcp_tools_to_openai_format(self, mcp_tools):
         openai_tools = []
@@ -131,9 +273,16 @@ class MCPLLMBridge:
         
         for tool in tools_list if isinstance(tools_list, list) else []:
             if hasattr(tool, 'name') and hasattr(tool, 'description'):
-                openai_name = self._sanitize_tool_name(tool.name)
+                openai_name = base_name = self._sanitize_tool_name(tool.name)
+                n = 2
+                # Two tools that sanitize alike keep distinct function names instead of one overwriting the other
+                while self.tool_name_mapping.get(openai_name, tool.name) != tool.name: openai_name, n = f"{base_name}_{n}", n + 1
                 self.tool_name_mapping[openai_name] = tool.name
                 tool_schema = getattr(tool, 'inputSchema', {"type": "object", "properties": {}, "required": []})
+                validator = compile_validator(tool_schema) if isinstance(tool_schema, dict) else None
+                if validator: self.tool_validators[tool.name] = validator
+                if is_idempotent(tool): self.idempotent_tools.add(tool.name)
+                if getattr(getattr(tool, "annotations", None), "readOnlyHint", None) is True: self.read_only_tools.add(tool.name)
                 openai_tools.append({
                     "type": "function",
                     "function": {
@@ -144,38 +293,75 @@ class MCPLLMBridge:
                 })
         return openai_tools
 
-    async def process_message(self, message, stream=True):
-        try:
-            # Set up streaming handler if enabled
-            stream_handler = None
-            if stream:
-                from mcp_llm_bridge.logging_config import notify_stream_token
-                stream_handler = notify_stream_token
-            
-            # Send message to LLM
-            response = await self.llm_client.invoke_with_prompt(message, stream, stream_handler)
-            
-            # Process tool calls until we get a final response
-            while response.is_tool_call and response.tool_calls:
-                tool_responses = await self._handle_tool_calls(response.tool_calls)
-                
-                # Properly invoke the LLM with the tool responses
-                try:
-                    response = await self.llm_client.invoke(tool_responses, stream, stream_handler)
-                except Exception as e:
-                    # If the LLM has trouble with the tool response, just show it once
-                    if len(tool_responses) == 1:
-                        # Don't print it here as it will be returned and printed later
-                        return tool_responses[0]['output']
-                    else:
-                        output = "\n".join(t['output'] for t in tool_responses)
-                        return output
-            
-            return response.content
-        except Exception as e: return f"Error: {str(e)}"
+    async def _on_progress_notification(self, params):
+        # Progress goes to the conversation whose call carries its token. Untagged progress goes to
+        # the only conversation in a tool call; anything else (including late progress for a call
+        # that already finished) to the global callbacks, never to a conversation that may not own it
+        event = MCPNotificationEvent("notifications/progress", params)
+        token = params.get("progressToken") if isinstance(params, dict) else None
+        sink = self._progress_sinks.get(token)
+        if token is None and len(self._calling_sinks) == 1: sink = next(iter(self._calling_sinks))
+        await emit(sink or dispatch_event, event)
+
+    def _condense_output(self, tool_name, tool_call_id, output, conversation):
+        policies = getattr(self.config, "condense_policies", None) or {}
+        policy = policies.get(tool_name, policies.get("*"))
+        if policy is None: return output
+        condensed = condense(output, policy)
+        if condensed is output: return output
+        before, after = estimate_tokens(output), estimate_tokens(condensed)
+        logger.info("Condensed %s output: ~%d -> ~%d tokens", tool_name, before, after)
+        # The original stays with its conversation, which is only now offered the fetch tool
+        conversation.tool_outputs.put(tool_call_id, output)
+        extra_tools = conversation.llm_client.extra_tools
+        if FETCH_TOOL not in extra_tools: extra_tools.append(FETCH_TOOL)
+        return (f"{condensed}\n[condensed from ~{before} to ~{after} tokens; call {FETCH_TOOL_NAME} "
+                f"with tool_call_id={tool_call_id} to read the full output]")
+
+    def _prepare_arguments(self, tool_name, function_args):
+        """Parse, repair and validate tool arguments; returns (arguments, problems)."""
+        repairs = []
+        if isinstance(function_args, str):
+            try: arguments, repairs = parse_arguments(function_args)
+            except ValueError as e: return None, [str(e)]
+        else:
+            arguments = function_args if function_args else {}
+        validator = self.tool_validators.get(tool_name)
+        if validator:
+            arguments, problems, schema_repairs = validator.validate(arguments)
+            if problems: return arguments, problems
+            repairs += schema_repairs
+        elif not isinstance(arguments, dict):
+            return arguments, ["Arguments must be a JSON object"]
+        if repairs: logger.info("Repaired %s arguments: %s", tool_name, "; ".join(repairs))
+        return arguments, []
+
+    def _fetch_tool_output(self, arguments, tool_outputs):
+        try: arguments = json.loads(arguments) if isinstance(arguments, str) else (arguments or {})
+        except json.JSONDecodeError: arguments = {}
+        return tool_outputs.fetch(arguments.get("tool_call_id"), arguments.get("offset"), arguments.get("limit"))
 
-    async def _handle_tool_calls(self, tool_calls):
+    def conversation(self, history=None, sink=None, priority=None):
+        """Start an isolated conversation that shares this bridge's MCP session, tools and HTTP client.
+
+        `priority` ("interactive" or "batch") orders its LLM and tool calls behind rate limits.
+        """
+        return Conversation(self, self.llm_client.fork(history), sink, priority)
+
+    def process_message_events(self, message, stream=True, maxsize=256):
+        return self._conversation.process_message_events(message, stream, maxsize)
+
+    async def process_message(self, message, stream=True, sink=None):
+        return await self._conversation.process_message(message, stream, sink)
+
+    @property
+    def last_usage(self): return self._conversation.last_usage
+
+    async def _handle_tool_calls(self, tool_calls, sink=None, conversation=None):
+        sink = sink or dispatch_event
+        conversation = conversation or self._conversation
         tool_responses = []
+        turn_results = {}
         
         for tool_call in tool_calls:
             try:
@@ -190,31 +376,56 @@ class MCPLLMBridge:
                     function_args = tool_call['function']['arguments']
                 else: continue
                 
+                if openai_name == FETCH_TOOL_NAME and getattr(self.config, "condense_policies", None):
+                    # Served locally from the originals of condensed outputs
+                    await emit(sink, ToolCallStartEvent(openai_name, tool_id, function_args))
+                    output = self._fetch_tool_output(function_args, conversation.tool_outputs)
+                    await emit(sink, ToolCallEndEvent(openai_name, tool_id, 0.0, output))
+                    tool_responses.append({"tool_call_id": tool_id, "output": output})
+                    continue
+                
                 mcp_name = self.tool_name_mapping.get(openai_name)
                 if not mcp_name: continue
                 
                 # Notify and execute
-                notify_tool_call(mcp_name)
-                # Handle empty string arguments
-                # Handle arguments properly - empty string, properly formatted JSON, or dict
-                if isinstance(function_args, str):
-                    if not function_args.strip():
-                        arguments = {}  # Empty arguments
-                    else:
-                        try:
-                            arguments = json.loads(function_args)
-                        except json.JSONDecodeError:
-                            arguments = {"text": function_args}  # Fallback for invalid JSON
-                else:
-                    arguments = function_args if function_args else {}
-                result = await self.mcp_client.call_tool(mcp_name, arguments)
+                await emit(sink, ToolCallStartEvent(mcp_name, tool_id, function_args))
+                started = time.monotonic()
+                # Parse and check arguments locally; bad calls get an immediate error instead of a round trip
+                arguments, problems = self._prepare_arguments(mcp_name, function_args)
+                if problems:
+                    output = format_validation_error(mcp_name, problems, self.tool_validators.get(mcp_name))
+                    await emit(sink, ToolCallEndEvent(mcp_name, tool_id, time.monotonic() - started, output, True))
+                    tool_responses.append({"tool_call_id": tool_id, "output": output})
+                    continue
+                breaker = self.circuits.get(mcp_name) if self.circuits else None
+                if breaker and not breaker.allow():
+                    # Circuit open: fail fast instead of waiting out another failure
+                    output = breaker.error_message()
+                    await emit(sink, ToolCallEndEvent(mcp_name, tool_id, time.monotonic() - started, output, True))
+                    tool_responses.append({"tool_call_id": tool_id, "output": output})
+                    continue
+                self._calling_sinks[sink] = self._calling_sinks.get(sink, 0) + 1
+                token = f"milady-{next(self._progress_tokens)}"
+                self._progress_sinks[token] = sink
+                context_token = progress_token.set(token)
+                try:
+                    result = await self._call_tool(mcp_name, arguments, turn_results)
+                except Exception as e:
+                    await emit(sink, ToolCallEndEvent(mcp_name, tool_id, time.monotonic() - started, f"Error: {str(e)}", True))
+                    raise
+                finally:
+                    progress_token.reset(context_token)
+                    del self._progress_sinks[token]
+                    self._calling_sinks[sink] -= 1
+                    if not self._calling_sinks[sink]: del self._calling_sinks[sink]
                 
-                # Format response
-                if isinstance(result, str): output = result
-                elif hasattr(result, 'content') and isinstance(result.content, list):
-                    output = " ".join(content.text for content in result.content if hasattr(content, 'text'))
-                else: output = str(result)
+                # Format response; binary and resource content becomes short descriptors
+                policy = getattr(self.config, "content_policy", None) or ContentPolicy()
+                output, attachments = render_tool_result(result, policy, tool_id)
+                output = self._condense_output(mcp_name, tool_id, output, conversation)
                 
+                await emit(sink, ToolCallEndEvent(mcp_name, tool_id, time.monotonic() - started, output,
+                                                  attachments=attachments))
                 tool_responses.append({"tool_call_id": tool_id, "output": output})
             except Exception as e:
                 try:
@@ -226,16 +437,57 @@ class MCPLLMBridge:
         
         return tool_responses
 
-    async def close(self): await self.mcp_client.__aexit__(None, None, None)
+    async def close(self):
+        timeout = getattr(self.config, "shutdown_timeout", None)
+        try:
+            if timeout is None: await self.mcp_client.__aexit__(None, None, None)
+            else: await _within(self.mcp_client.__aexit__(None, None, None), timeout)
+        except TimeoutError: logger.warning("MCP connection didn't close within %gs; abandoning it", timeout)
+        finally:
+            if self.session_store: self.session_store.close()
+            if self.prompt_cache: self.prompt_cache.close()
 
 class BridgeManager:
-    def __init__(self, config):
+    def __init__(self, config, read_stdin=False, mcp_client=None, llm_client=None):
         self.config = config
+        self.mcp_client = mcp_client
+        self.llm_client = llm_client
         self.bridge = None
+        self.read_stdin = read_stdin
+        self.stdin_data = ""
+        self.timings = {}
+
+    async def _timed(self, name, coro):
+        started = time.monotonic()
+        try: return await coro
+        finally: self.timings[name] = time.monotonic() - started
 
     async def __aenter__(self):
-        self.bridge = MCPLLMBridge(self.config)
-        await self.bridge.initialize()
+        """Start the bridge with every independent startup step running at once.
+
+        MCP connect and tool discovery, the LLM endpoint's connection handshake, the
+        optional model preload and reading piped stdin overlap; self.timings records each
+        step, the total and which step was on the critical path. MCP connect runs in this
+        task: its transports' cancel scopes have to be exited by the task that entered them.
+        """
+        started = time.monotonic()
+        self.bridge = MCPLLMBridge(self.config, self.mcp_client, self.llm_client)
+        side_steps = {"llm_prewarm": self.bridge.llm_client.prewarm()}
+        if getattr(self.config.llm_config, "preload", False): side_steps["model_preload"] = self.bridge.llm_client.preload()
+        if self.read_stdin: side_steps["stdin"] = asyncio.to_thread(sys.stdin.read)
+        tasks = {name: asyncio.ensure_future(self._timed(name, step)) for name, step in side_steps.items()}
+        try: await self._timed("initialize", self.bridge.initialize())
+        except BaseException:
+            for task in tasks.values(): task.cancel()
+            raise
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+        
+        if self.read_stdin: self.stdin_data = (results["stdin"] or "").strip()
+        bridge_timings = getattr(self.bridge, "timings", None)
+        if isinstance(bridge_timings, dict): self.timings.update(bridge_timings)
+        self.timings["total"] = time.monotonic() - started
+        self.critical_path = max(["initialize", *side_steps], key=lambda name: self.timings[name])
+        logger.info("Startup %.3fs, critical path: %s", self.timings["total"], self.critical_path)
         return self.bridge
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
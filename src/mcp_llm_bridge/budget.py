@@ -0,0 +1,64 @@
+# src/mcp_llm_bridge/budget.py
+import json
+import time
+from mcp_llm_bridge.llm_client import estimate_tokens, tool_call_parts
+
+def _call_key(tool_call):
+    parts = tool_call_parts(tool_call)
+    if not parts: return None
+    _, name, arguments = parts
+    if isinstance(arguments, str):
+        try: arguments = json.loads(arguments) if arguments.strip() else {}
+        except json.JSONDecodeError: return (name, arguments.strip())
+    try: return (name, json.dumps(arguments or {}, sort_keys=True))
+    except (TypeError, ValueError): return (name, str(arguments))
+
+class ToolLoopBudget:
+    """Tracks one process_message tool loop against a BudgetConfig."""
+
+    def __init__(self, config):
+        self.config = config
+        self.started = time.monotonic()
+        self.turns = 0
+        self.tool_calls = 0
+        self.tokens = 0
+        self.call_counts = {}
+
+    def elapsed(self): return time.monotonic() - self.started
+
+    def record_response(self, response):
+        self.turns += 1
+        self.tokens += estimate_tokens(getattr(response, "content", None))
+        for tool_call in getattr(response, "tool_calls", None) or []:
+            parts = tool_call_parts(tool_call)
+            if parts and isinstance(parts[2], str): self.tokens += estimate_tokens(parts[2])
+
+    def record_tool_outputs(self, tool_responses):
+        for tool_response in tool_responses:
+            self.tokens += estimate_tokens(tool_response.get("output"))
+
+    def check(self, tool_calls):
+        """Return the name of the exhausted limit, or None and count the calls against the budget."""
+        config = self.config
+        if config.max_turns is not None and self.turns > config.max_turns: return "max_turns"
+        if config.max_tool_calls is not None and self.tool_calls + len(tool_calls) > config.max_tool_calls:
+            return "max_tool_calls"
+        keys = [key for key in (_call_key(tc) for tc in tool_calls) if key is not None]
+        if config.max_repeated_calls is not None:
+            pending = {}
+            for key in keys:
+                pending[key] = pending.get(key, 0) + 1
+                if self.call_counts.get(key, 0) + pending[key] > config.max_repeated_calls:
+                    return "max_repeated_calls"
+        if config.max_tokens is not None and self.tokens >= config.max_tokens: return "max_tokens"
+        if config.max_seconds is not None and self.elapsed() >= config.max_seconds: return "max_seconds"
+
+        self.tool_calls += len(tool_calls)
+        for key in keys: self.call_counts[key] = self.call_counts.get(key, 0) + 1
+        return None
+
+    def stop_responses(self, tool_calls, reason):
+        """Synthetic tool results that answer pending calls once the budget is spent."""
+        output = f"Error: tool budget exhausted ({reason}). Answer with the information gathered so far."
+        return [{"tool_call_id": parts[0], "output": output}
+                for parts in (tool_call_parts(tc) for tc in tool_calls) if parts]
@@ -0,0 +1,244 @@
+# src/mcp_llm_bridge/cassette.py
+import gzip
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import deque
+from mcp import types as mcp_types
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from mcp_llm_bridge.mcp_client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+def _dump(value):
+    if hasattr(value, "model_dump"): return value.model_dump(mode="json", by_alias=True, exclude_none=True)
+    return value
+
+def _request_digest(kwargs):
+    # Requests are stored as a digest, not verbatim, to keep cassettes small
+    return hashlib.sha256(json.dumps(kwargs, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+class CassetteError(RuntimeError):
+    pass
+
+class Cassette:
+    """JSON-lines recording of one session's LLM and MCP traffic, optionally gzipped (*.gz).
+
+    mode="record" appends an entry per LLM request (with every streamed chunk and its
+    arrival offset), per tool call (with its result, duration and any notifications that
+    arrived meanwhile) and per tool listing. mode="replay" serves them back in order;
+    `speed` scales recorded delays (2.0 = twice as fast) and 0 replays without waiting.
+    """
+
+    def __init__(self, path, mode="replay", speed=1.0):
+        if mode not in ("record", "replay"): raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._file = None
+        self._entries = {}
+        self._active_calls = []
+        if mode == "replay": self._load()
+
+    def _open(self, mode):
+        return gzip.open(self.path, mode + "t", encoding="utf-8") if self.path.endswith(".gz") \
+            else open(self.path, mode, encoding="utf-8")
+
+    def _load(self):
+        with self._open("r") as f:
+            for line in f:
+                if not line.strip(): continue
+                entry = json.loads(line)
+                if "kind" in entry: self._entries.setdefault(entry["kind"], deque()).append(entry)
+
+    def write(self, entry):
+        if self._file is None:
+            self._file = self._open("w")
+            self._file.write(json.dumps({"cassette": CASSETTE_VERSION, "created": time.time()}) + "\n")
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file: self._file.close()
+        self._file = None
+
+    def next(self, kind, match=None):
+        entries = self._entries.get(kind)
+        if not entries: raise CassetteError(f"Cassette {self.path} has no more {kind} entries")
+        if match:
+            for entry in entries:
+                if match(entry):
+                    entries.remove(entry)
+                    return entry
+        return entries.popleft()
+
+    async def wait(self, seconds):
+        if self.speed and seconds > 0: await asyncio.sleep(seconds / self.speed)
+
+    def attach(self, llm_client):
+        """Substitute LLMClient.client (shared by its forks) with the recording or replay client."""
+        llm_client.client = self.openai_client(llm_client.client)
+        return llm_client
+
+    def openai_client(self, client=None):
+        """The client to put in LLMClient.client: recording around `client`, or a replay stand-in."""
+        return _RecordingOpenAI(client, self) if self.mode == "record" else _ReplayOpenAI(self)
+
+    def mcp_client(self, server_params=None):
+        """An MCPClient whose session is recorded, or one that replays without a server."""
+        return RecordingMCPClient(server_params, self) if self.mode == "record" else ReplayMCPClient(self)
+
+class _Namespace:
+    pass
+
+class _RecordingOpenAI:
+    def __init__(self, client, cassette):
+        self._client = client
+        self._cassette = cassette
+        self.chat = _Namespace()
+        self.chat.completions = _Namespace()
+        self.chat.completions.create = self._create
+
+    def __getattr__(self, name): return getattr(self._client, name)  # models, post, base_url, ...
+
+    async def _create(self, **kwargs):
+        entry = {"kind": "llm", "request": _request_digest(kwargs), "stream": bool(kwargs.get("stream"))}
+        started = time.monotonic()
+        try: response = await self._client.chat.completions.create(**kwargs)
+        except Exception as e:
+            entry.update(duration=time.monotonic() - started, error=str(e))
+            self._cassette.write(entry)
+            raise
+        if not entry["stream"]:
+            entry.update(duration=time.monotonic() - started, response=_dump(response))
+            self._cassette.write(entry)
+            return response
+        return self._record_stream(response, entry, started)
+
+    async def _record_stream(self, stream, entry, started):
+        chunks = entry["chunks"] = []
+        try:
+            async for chunk in stream:
+                chunks.append([round(time.monotonic() - started, 4), _dump(chunk)])
+                yield chunk
+        finally:
+            entry["duration"] = time.monotonic() - started
+            self._cassette.write(entry)
+
+class _ReplayOpenAI:
+    def __init__(self, cassette):
+        self._cassette = cassette
+        self.base_url = "http://cassette.invalid/v1"
+        self.chat = _Namespace()
+        self.chat.completions = _Namespace()
+        self.chat.completions.create = self._create
+        self.models = _Namespace()
+        self.models.list = self._nothing
+
+    async def _nothing(self, *args, **kwargs): return None
+
+    async def post(self, *args, **kwargs): return None
+
+    async def _create(self, **kwargs):
+        entry = self._cassette.next("llm")
+        if entry.get("request") != _request_digest(kwargs):
+            logger.debug("Replayed LLM request differs from the recorded one")
+        if "chunks" in entry: return self._replay_stream(entry)
+        await self._cassette.wait(entry.get("duration", 0))
+        if "error" in entry: raise CassetteError(entry["error"])
+        return ChatCompletion.model_validate(entry["response"])
+
+    async def _replay_stream(self, entry):
+        started = time.monotonic()
+        for offset, chunk in entry["chunks"]:
+            await self._cassette.wait(offset - (time.monotonic() - started) * (self._cassette.speed or 1))
+            yield ChatCompletionChunk.model_validate(chunk)
+
+class _RecordingSession:
+    def __init__(self, session, cassette):
+        self._session = session
+        self._cassette = cassette
+
+    def __getattr__(self, name): return getattr(self._session, name)  # initialize, send_ping, ...
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return await self._session.__aexit__(exc_type, exc_val, exc_tb)
+
+    async def list_tools(self, *args, **kwargs):
+        result = await self._session.list_tools(*args, **kwargs)
+        self._cassette.write({"kind": "list_tools", "result": _dump(result)})
+        return result
+
+    async def call_tool(self, name, arguments=None, *args, **kwargs):
+        entry = {"kind": "tool", "name": name, "arguments": arguments, "notifications": []}
+        entry["started"] = started = time.monotonic()
+        self._cassette._active_calls.append(entry)
+        try:
+            result = await self._session.call_tool(name, arguments, *args, **kwargs)
+            entry["result"] = _dump(result)
+            return result
+        except Exception as e:
+            entry["error"] = str(e)
+            raise
+        finally:
+            self._cassette._active_calls.remove(entry)
+            del entry["started"]
+            entry["duration"] = time.monotonic() - started
+            self._cassette.write(entry)
+
+class RecordingMCPClient(MCPClient):
+    """MCPClient that writes tool listings, tool calls and notifications to a cassette."""
+
+    def __init__(self, server_params, cassette):
+        super().__init__(server_params)
+        self.cassette = cassette
+
+    async def _start_session(self):
+        await super()._start_session()
+        self.session = _RecordingSession(self.session, self.cassette)
+
+    async def _notification_callback(self, message):
+        if isinstance(message, dict) and message.get("method"):
+            # Filed under every call in flight; replay re-emits them at the same offset
+            for entry in self.cassette._active_calls:
+                entry["notifications"].append([round(time.monotonic() - entry["started"], 4),
+                                               message["method"], message.get("params", {})])
+        await super()._notification_callback(message)
+
+class _ReplaySession:
+    def __init__(self, cassette, notification_callback):
+        self._cassette = cassette
+        self._notification_callback = notification_callback
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb): pass
+
+    async def send_ping(self): return None
+
+    async def list_tools(self, *args, **kwargs):
+        return mcp_types.ListToolsResult.model_validate(self._cassette.next("list_tools")["result"])
+
+    async def call_tool(self, name, arguments=None, *args, **kwargs):
+        entry = self._cassette.next("tool", lambda e: e["name"] == name and e.get("arguments") == arguments)
+        if entry["name"] != name: raise CassetteError(f"Cassette expected a call to {entry['name']}, got {name}")
+        started = time.monotonic()
+        for offset, method, params in entry.get("notifications", []):
+            await self._cassette.wait(offset - (time.monotonic() - started) * (self._cassette.speed or 1))
+            await self._notification_callback({"jsonrpc": "2.0", "method": method, "params": params})
+        await self._cassette.wait(entry.get("duration", 0) - (time.monotonic() - started) * (self._cassette.speed or 1))
+        if "error" in entry: raise CassetteError(entry["error"])
+        return mcp_types.CallToolResult.model_validate(entry["result"])
+
+class ReplayMCPClient(MCPClient):
+    """MCPClient served entirely from a cassette; no server is contacted."""
+
+    def __init__(self, cassette):
+        super().__init__(None)
+        self.cassette = cassette
+
+    async def connect(self):
+        self.transport = "cassette"
+        self.session = _ReplaySession(self.cassette, self._notification_callback)
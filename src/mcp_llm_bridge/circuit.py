@@ -0,0 +1,100 @@
+# src/mcp_llm_bridge/circuit.py
+import time
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class CircuitBreaker:
+    """Rolling error rate and latency of one tool, with closed/open/half-open states.
+
+    Closed: calls go through and their outcomes fill a window of the last `window` calls.
+    Open: once `min_calls` are in the window and `error_rate` of them failed, calls are
+    refused for `open_seconds`. Half-open: then one trial call is let through; success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=config.window)  # True for a failed call
+        self.latencies = deque(maxlen=config.window)
+        self.opened_at = None
+        self.rejected = 0
+        self._trial = False
+
+    def retry_in(self):
+        if self.state != OPEN: return 0.0
+        return max(0.0, self.opened_at + self.config.open_seconds - time.monotonic())
+
+    def available(self):
+        """Whether a call would be let through now (without claiming the half-open trial)."""
+        if self.state == OPEN: return self.retry_in() <= 0
+        return not (self.state == HALF_OPEN and self._trial)
+
+    def allow(self):
+        """Claim permission for one call; False means fail fast."""
+        if self.state == OPEN and self.retry_in() <= 0: self.state, self._trial = HALF_OPEN, False
+        if self.state == CLOSED: return True
+        if self.state == HALF_OPEN and not self._trial:
+            self._trial = True
+            return True
+        self.rejected += 1
+        return False
+
+    def cancel(self):
+        """A call was cancelled before it finished; it says nothing about the tool."""
+        self._trial = False
+
+    def record(self, seconds, failed):
+        slow = self.config.slow_call_seconds
+        failed = failed or (slow is not None and seconds > slow)
+        self.latencies.append(seconds)
+        if self.state == HALF_OPEN:
+            self._trial = False
+            if failed: return self._open()
+            logger.warning("Tool %s recovered; circuit closed", self.name)
+            self.state = CLOSED
+            self.outcomes.clear()
+            return
+        self.outcomes.append(failed)
+        if self.state == CLOSED and len(self.outcomes) >= self.config.min_calls \
+                and sum(self.outcomes) / len(self.outcomes) >= self.config.error_rate:
+            self._open()
+
+    def _open(self):
+        logger.warning("Tool %s failing (%d of the last %d calls); circuit open for %.0fs",
+                       self.name, sum(self.outcomes), len(self.outcomes), self.config.open_seconds)
+        self.state, self.opened_at = OPEN, time.monotonic()
+
+    def error_message(self):
+        return (f"Error: tool {self.name} is temporarily disabled after repeated failures "
+                f"({sum(self.outcomes)} of the last {len(self.outcomes)} calls failed). "
+                f"Retry in {self.retry_in():.0f}s or continue without it.")
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {"state": self.state, "calls": len(self.outcomes), "rejected": self.rejected,
+                "error_rate": sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0,
+                "latency_p50": latencies[len(latencies) // 2] if latencies else None,
+                "latency_max": latencies[-1] if latencies else None}
+
+class CircuitBoard:
+    """The circuit breakers of a bridge, one per MCP tool, created on first use."""
+
+    def __init__(self, config):
+        self.config = config
+        self.breakers = {}
+
+    def get(self, name):
+        if name not in self.breakers: self.breakers[name] = CircuitBreaker(name, self.config)
+        return self.breakers[name]
+
+    def available(self, name):
+        breaker = self.breakers.get(name)
+        return breaker is None or breaker.available()
+
+    def stats(self): return {name: breaker.stats() for name, breaker in self.breakers.items()}
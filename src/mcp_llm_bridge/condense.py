@@ -0,0 +1,109 @@
+# src/mcp_llm_bridge/condense.py
+import re
+from collections import OrderedDict
+from mcp_llm_bridge.llm_client import estimate_tokens
+
+FETCH_TOOL_NAME = "fetch_tool_output"
+
+_ANSI = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07]*\x07")
+_TIMESTAMP = re.compile(
+    r"^\s*\[?(?:\d{4}-\d{2}-\d{2}[T ])?\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?\]?\s*"
+)
+_ERROR = re.compile(
+    r"\b(error|errors|fail|failed|failure|exception|traceback|fatal|panic|denied|segfault|"
+    r"exit (?:code|status) [1-9]\d*)\b", re.IGNORECASE)
+_DIGITS = re.compile(r"\d+")
+
+FETCH_TOOL = {
+    "type": "function",
+    "function": {
+        "name": FETCH_TOOL_NAME,
+        "description": "Fetch lines of a tool output that was condensed, by its tool_call_id.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "tool_call_id": {"type": "string"},
+                "offset": {"type": "integer", "description": "First line to return (0-based)"},
+                "limit": {"type": "integer", "description": "Number of lines to return"}
+            },
+            "required": ["tool_call_id"]
+        }
+    }
+}
+
+def _collapse(lines):
+    # Exact repeats become one line with a count; runs that differ only in numbers keep first and last
+    collapsed, i = [], 0
+    while i < len(lines):
+        j = i + 1
+        while j < len(lines) and lines[j] == lines[i]: j += 1
+        if j - i > 1:
+            collapsed.append(f"{lines[i]}  [repeated {j - i} times]")
+            i = j
+            continue
+        key = _DIGITS.sub("#", lines[i])
+        while j < len(lines) and _DIGITS.sub("#", lines[j]) == key: j += 1
+        if j - i > 2:
+            collapsed.extend([lines[i], f"  [... {j - i - 2} similar lines ...]", lines[j - 1]])
+        else:
+            collapsed.extend(lines[i:j])
+        i = j
+    return collapsed
+
+def _window(lines, policy):
+    if len(lines) <= policy.head_lines + policy.tail_lines: return lines
+    head, middle = lines[:policy.head_lines], lines[policy.head_lines:len(lines) - policy.tail_lines]
+    tail = lines[len(lines) - policy.tail_lines:]
+    kept, omitted = [], 0
+    for line in middle:
+        if policy.keep_errors and _ERROR.search(line):
+            if omitted: kept.append(f"  [... {omitted} lines omitted ...]")
+            kept.append(line)
+            omitted = 0
+        else: omitted += 1
+    if omitted: kept.append(f"  [... {omitted} lines omitted ...]")
+    return head + kept + tail
+
+def _cap(text, max_tokens):
+    if estimate_tokens(text) <= max_tokens: return text
+    budget = max_tokens * 4
+    head = text[:budget // 3]
+    tail = text[len(text) - (budget - len(head)):]
+    return f"{head}\n  [... truncated ...]\n{tail}"
+
+def condense(text, policy):
+    """Shrink a log-like tool output according to a CondensePolicy.
+
+    Outputs under policy.min_tokens are returned unchanged.
+    """
+    if not isinstance(text, str) or estimate_tokens(text) <= policy.min_tokens: return text
+    if policy.strip_ansi: text = _ANSI.sub("", text)
+    lines = text.splitlines()
+    if policy.strip_timestamps: lines = [_TIMESTAMP.sub("", line) for line in lines]
+    if policy.collapse_repeats: lines = _collapse(lines)
+    return _cap("\n".join(_window(lines, policy)), policy.max_tokens)
+
+class ToolOutputStore:
+    """Keeps the original text of recently condensed outputs so the model can page through them."""
+
+    def __init__(self, max_entries=32, max_chars=8_000_000):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._outputs = OrderedDict()
+        self._chars = 0
+
+    def put(self, tool_call_id, text):
+        if tool_call_id in self._outputs: self._chars -= len(self._outputs.pop(tool_call_id))
+        self._outputs[tool_call_id] = text
+        self._chars += len(text)
+        while self._outputs and (len(self._outputs) > self.max_entries or self._chars > self.max_chars):
+            self._chars -= len(self._outputs.popitem(last=False)[1])
+
+    def fetch(self, tool_call_id, offset=0, limit=200):
+        text = self._outputs.get(tool_call_id)
+        if text is None: return f"Error: no stored output for tool_call_id {tool_call_id}"
+        lines = text.splitlines()
+        offset, limit = max(int(offset or 0), 0), max(int(limit or 200), 1)
+        page = "\n".join(lines[offset:offset + limit])
+        remaining = len(lines) - offset - limit
+        return page + (f"\n[{remaining} more lines; call again with offset={offset + limit}]" if remaining > 0 else "")
@@ -1,6 +1,6 @@
 # src/mcp_llm_bridge/config.py
-from dataclasses import dataclass
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 from mcp import StdioServerParameters
 
 @dataclass
@@ -8,6 +8,24 @@ class SSEServerParameters:
     url: str
     env: Optional[Dict[str, str]] = None
 
+@dataclass
+class StreamableHTTPServerParameters:
+    url: str
+    headers: Optional[Dict[str, str]] = None
+    fallback_to_sse: bool = True  # Use SSE when the server has no streamable HTTP endpoint
+    sse_url: Optional[str] = None  # Defaults to url with a trailing /mcp replaced by /sse
+    max_connections: int = 20  # Keep-alive pool shared by every client with the same settings
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    terminate_on_close: bool = True
+
+@dataclass
+class RateLimit:
+    # Shared by every client of the same LLM endpoint or MCP server in the process; None disables a limit
+    requests_per_second: Optional[float] = None
+    burst: int = 1  # Requests that may start back to back after an idle spell
+    max_concurrent: Optional[int] = None
+
 @dataclass
 class LLMConfig:
     api_key: str
@@ -15,9 +33,98 @@ class LLMConfig:
     base_url: Optional[str] = None
     temperature: float = 0.7
     max_tokens: int = 2000
+    max_connections: int = 100  # HTTP connection pool shared by all conversations on a bridge
+    keepalive_expiry: float = 60.0  # Seconds an idle pooled connection is kept open
+    keep_reasoning: bool = False  # Store <think> reasoning in history and resend it on later turns
+    preload: bool = False  # Load the model on the server while the bridge starts up
+    keep_alive: Optional[str] = "30m"  # How long Ollama keeps a preloaded model resident
+    rate_limit: Optional[RateLimit] = None  # Per base_url
+
+@dataclass
+class BudgetConfig:
+    # Limits for one process_message tool loop; None disables a limit
+    max_turns: Optional[int] = 10
+    max_tool_calls: Optional[int] = 25
+    max_repeated_calls: Optional[int] = 3
+    max_tokens: Optional[int] = None
+    max_seconds: Optional[float] = 300.0
+
+@dataclass
+class CircuitConfig:
+    # Per-tool circuit breaker; set BridgeConfig.circuit to None to disable
+    window: int = 20  # Recent calls the error rate is taken over
+    min_calls: int = 5  # Calls needed in the window before the circuit can open
+    error_rate: float = 0.5  # Open at or above this share of failed calls
+    slow_call_seconds: Optional[float] = None  # Slower calls count as failures
+    call_timeout: Optional[float] = None  # Abandon a call after this long (a failure)
+    open_seconds: float = 30.0  # Fail fast this long before letting one trial call through
+    hide_open_tools: bool = False  # Leave open tools out of the tool list sent to the LLM
+    count_tool_errors: bool = False  # Also count isError results (e.g. a missing template) as failures, not just exceptions and timeouts
+
+@dataclass
+class SessionConfig:
+    name: str
+    path: Optional[str] = None  # Defaults to ~/.milady/sessions.db (or $MILADY_SESSION_DB)
+    max_bytes: int = 2_000_000  # Per-session cap; oldest turns are dropped beyond it
+    max_age_days: Optional[float] = 30.0  # Sessions idle for longer are compacted away
+
+@dataclass
+class PromptCacheConfig:
+    # Opt-in cache of whole answers, matched by MinHash similarity of the prompt
+    path: Optional[str] = None  # Defaults to ~/.milady/prompt_cache.db (or $MILADY_PROMPT_CACHE_DB)
+    threshold: float = 0.8  # Estimated Jaccard similarity of prompt shingles needed for a hit
+    ttl_seconds: float = 3600.0
+    max_entries: int = 10_000
+    read_only_tools: List[str] = field(default_factory=list)  # Besides tools annotated readOnlyHint
+
+@dataclass
+class CondensePolicy:
+    # How a long tool output is shrunk before it is sent to the LLM
+    min_tokens: int = 400  # Shorter outputs are passed through unchanged
+    max_tokens: int = 2000  # Hard cap after condensation
+    head_lines: int = 40
+    tail_lines: int = 60
+    collapse_repeats: bool = True
+    strip_ansi: bool = True
+    strip_timestamps: bool = True
+    keep_errors: bool = True
+
+@dataclass
+class ContentPolicy:
+    # What non-text MCP content may be sent to the LLM inline
+    inline_binary_bytes: int = 0  # Images/audio/blobs up to this size are inlined as data URLs
+    inline_text_bytes: int = 64_000  # Larger text resources are written to a file with a preview
+    spill_binary: bool = True  # Decode larger binaries into files under spill_dir
+    spill_dir: Optional[str] = None  # Defaults to <tmp>/milady-tool-output
+    spill_max_age_seconds: Optional[float] = 86_400.0  # Spilled files older than this are deleted
+    spill_max_bytes: Optional[int] = 1 << 30  # Beyond this total the oldest spilled files are deleted
+    preview_chars: int = 500
+
+def default_condense_policies():
+    # Only log-producing tools by default: templates and JSON must reach the model verbatim.
+    # Add "*" to condense every tool without its own entry; map a tool to None to send it verbatim
+    return {"execute_command": CondensePolicy(head_lines=20, tail_lines=60),
+            "run_pipeline": CondensePolicy(), "get_pipeline_status": CondensePolicy()}
+
+@dataclass
+class LoadTestConfig:
+    levels: List[int] = field(default_factory=lambda: [1, 2, 4, 8, 16, 32])  # Concurrent conversations per step
+    conversations_per_level: int = 20  # Conversations completed at each step (at least one per worker)
+    timeout: float = 300.0  # Per conversation
+    max_error_rate: float = 0.5  # Stop ramping once a step fails this often
+    stream: bool = True
 
 @dataclass
 class BridgeConfig:
-    mcp_server_params: object  # Either StdioServerParameters or SSEServerParameters
+    mcp_server_params: object  # Server parameters, or a list / {alias: params} dict of them
     llm_config: LLMConfig
-    system_prompt: Optional[str] = None
\ No newline at end of file
+    system_prompt: Optional[str] = None
+    budget: BudgetConfig = field(default_factory=BudgetConfig)
+    circuit: Optional[CircuitConfig] = field(default_factory=CircuitConfig)
+    session: Optional[SessionConfig] = None
+    condense_policies: Dict[str, Optional[CondensePolicy]] = field(default_factory=default_condense_policies)
+    content_policy: ContentPolicy = field(default_factory=ContentPolicy)
+    mcp_rate_limit: Optional[RateLimit] = None  # Applied to each MCP server separately
+    idempotent_tools: List[str] = field(default_factory=list)  # Coalesced like tools annotated read-only/idempotent
+    prompt_cache: Optional[PromptCacheConfig] = None
+    shutdown_timeout: float = 5.0  # Seconds close() waits for the MCP connection before abandoning it
\ No newline at end of file
@@ -0,0 +1,114 @@
+# src/mcp_llm_bridge/content.py
+import os
+import re
+import time
+import binascii
+import tempfile
+import mimetypes
+
+# Multiple of 4 base64 characters, so every slice decodes on its own (~48 KiB of output)
+_B64_CHUNK = 64 * 1024
+_PRUNE_INTERVAL = 60.0
+_last_pruned = {}  # spill directory -> when it was last pruned
+
+def _human_size(size):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024 or unit == "GB": return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def _b64_size(data):
+    data = data.rstrip()
+    return len(data) * 3 // 4 - (len(data) - len(data.rstrip("=")))
+
+def prune_spill_dir(directory, max_age_seconds=None, max_bytes=None):
+    """Delete spilled files older than max_age_seconds, then the oldest beyond max_bytes in total."""
+    files, now = [], time.time()
+    for entry in os.scandir(directory):
+        try:
+            if entry.is_file(): files.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+        except OSError: pass
+    total, removed = 0, 0
+    for mtime, size, path in sorted(files, reverse=True):
+        if (max_age_seconds is not None and now - mtime > max_age_seconds) or \
+                (max_bytes is not None and total + size > max_bytes):
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError: pass
+        else: total += size
+    return removed
+
+def _spill_path(policy, tool_call_id, mime_type):
+    directory = policy.spill_dir or os.path.join(tempfile.gettempdir(), "milady-tool-output")
+    os.makedirs(directory, exist_ok=True)
+    # Keeps a long-running process from filling the disk; checked at most once a minute per directory
+    if time.monotonic() - _last_pruned.get(directory, float("-inf")) >= _PRUNE_INTERVAL:
+        _last_pruned[directory] = time.monotonic()
+        prune_spill_dir(directory, getattr(policy, "spill_max_age_seconds", None), getattr(policy, "spill_max_bytes", None))
+    suffix = (mimetypes.guess_extension(mime_type or "") or ".bin") if mime_type != "text/plain" else ".txt"
+    prefix = re.sub(r"[^A-Za-z0-9_.-]", "_", str(tool_call_id or "tool")) + "-"
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=suffix, dir=directory)
+    return fd, path
+
+def _decode_to_file(data, policy, tool_call_id, mime_type):
+    # Decode slice by slice straight into the file; the full payload is never held decoded
+    fd, path = _spill_path(policy, tool_call_id, mime_type)
+    size = 0
+    with os.fdopen(fd, "wb") as f:
+        for start in range(0, len(data), _B64_CHUNK):
+            size += f.write(binascii.a2b_base64(data[start:start + _B64_CHUNK]))
+    return path, size
+
+def _write_text(text, policy, tool_call_id, mime_type):
+    fd, path = _spill_path(policy, tool_call_id, mime_type or "text/plain")
+    with os.fdopen(fd, "w", encoding="utf-8") as f: f.write(text)
+    return path
+
+def _render_binary(kind, data, mime_type, uri, policy, tool_call_id, attachments):
+    size = _b64_size(data)
+    label = " ".join(part for part in [kind, mime_type, uri] if part)
+    if size <= policy.inline_binary_bytes:
+        attachments.append({"kind": kind, "mime_type": mime_type, "size": size, "uri": uri, "path": None})
+        return f"[{label}, {_human_size(size)}] data:{mime_type or 'application/octet-stream'};base64,{data}"
+    if policy.spill_binary:
+        path, size = _decode_to_file(data, policy, tool_call_id, mime_type)
+        attachments.append({"kind": kind, "mime_type": mime_type, "size": size, "uri": uri, "path": path})
+        return f"[{label}, {_human_size(size)}, saved to {path}]"
+    attachments.append({"kind": kind, "mime_type": mime_type, "size": size, "uri": uri, "path": None})
+    return f"[{label}, {_human_size(size)}, not shown]"
+
+def _render_item(item, policy, tool_call_id, attachments):
+    kind = getattr(item, "type", None)
+    if kind == "image" or kind == "audio":
+        return _render_binary(kind, item.data, getattr(item, "mimeType", None), None, policy, tool_call_id, attachments)
+    if kind == "resource":
+        resource = item.resource
+        uri, mime_type = str(getattr(resource, "uri", "") or ""), getattr(resource, "mimeType", None)
+        if getattr(resource, "blob", None) is not None:
+            return _render_binary("resource", resource.blob, mime_type, uri, policy, tool_call_id, attachments)
+        text = getattr(resource, "text", "") or ""
+        if len(text) <= policy.inline_text_bytes: return f"[resource {uri}]\n{text}" if uri else text
+        path = _write_text(text, policy, tool_call_id, mime_type)
+        attachments.append({"kind": "resource", "mime_type": mime_type, "size": len(text), "uri": uri, "path": path})
+        return (f"[resource {uri}, {_human_size(len(text))} of text, saved to {path}; starts with:]\n"
+                f"{text[:policy.preview_chars]}")
+    if kind == "resource_link":
+        size = getattr(item, "size", None)
+        details = ", ".join(part for part in [getattr(item, "mimeType", None), _human_size(size) if size else None] if part)
+        return f"[resource link {getattr(item, 'name', '')} {item.uri}{', ' + details if details else ''}]"
+    if hasattr(item, "text"): return item.text
+    return f"[{kind or type(item).__name__} content]"
+
+def render_tool_result(result, policy, tool_call_id=None):
+    """Turn an MCP tool result into (text for the LLM, attachment descriptors).
+
+    Text passes through. Images, audio and blob resources never become repr strings:
+    they are inlined only when under policy.inline_binary_bytes, otherwise decoded into a
+    file and described in one line. Large text resources are spilled the same way.
+    """
+    attachments = []
+    if isinstance(result, str): return result, attachments
+    content = getattr(result, "content", None)
+    if not isinstance(content, list): return str(result), attachments
+    parts = [_render_item(item, policy, tool_call_id, attachments) for item in content]
+    return " ".join(part for part in parts if part), attachments
@@ -0,0 +1,160 @@
+# src/mcp_llm_bridge/conversation.py
+import asyncio
+from mcp_llm_bridge.logging_config import dispatch_event
+from mcp_llm_bridge.config import BudgetConfig
+from mcp_llm_bridge.budget import ToolLoopBudget
+from mcp_llm_bridge.condense import ToolOutputStore
+from mcp_llm_bridge.llm_client import tool_call_parts
+from mcp_llm_bridge.usage import UsageTotals
+from mcp_llm_bridge.scheduler import request_context
+from mcp_llm_bridge.events import (
+    emit, EventChannel, TokenEvent, ReasoningTokenEvent, BudgetExceededEvent, FinalAnswerEvent, UsageEvent,
+    CacheHitEvent
+)
+
+class Conversation:
+    """One conversation on a shared MCPLLMBridge.
+
+    A conversation owns its message history, default event sink and a lock that keeps
+    its turns in order. The MCP connection, tool catalog and HTTP client belong to the
+    bridge, so hundreds of conversations can run concurrently in one process.
+    """
+
+    def __init__(self, bridge, llm_client=None, sink=None, priority=None):
+        self.bridge = bridge
+        self._llm_client = llm_client
+        self.sink = sink
+        self.priority = priority  # Scheduler class for its calls; None inherits the caller's
+        self._lock = asyncio.Lock()
+        self.usage = UsageTotals()  # Every LLM request made by this conversation
+        self.last_usage = None  # Usage of the latest process_message call, as a dict
+        self.tool_outputs = ToolOutputStore()  # Originals of this conversation's condensed tool outputs
+
+    @property
+    def llm_client(self): return self._llm_client or self.bridge.llm_client
+
+    @property
+    def messages(self): return self.llm_client.messages
+
+    async def process_message_events(self, message, stream=True, maxsize=256):
+        """Process a message, yielding typed events as they happen.
+
+        Events pass through a bounded queue: when the consumer falls behind, generation
+        waits for it. Closing the generator early cancels the underlying work; an error
+        that ends the work is raised from the generator after the events before it.
+        """
+        channel = EventChannel(maxsize)
+
+        async def run():
+            try: await self.process_message(message, stream, sink=channel.emit)
+            except asyncio.CancelledError: raise  # The consumer left; nobody reads the channel any more
+            except BaseException:
+                await channel.close()  # End the iteration; `await task` re-raises the error to the consumer
+                raise
+            await channel.close()
+
+        task = asyncio.create_task(run())
+        try:
+            async for event in channel: yield event
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+                try: await task
+                except asyncio.CancelledError: pass
+
+    async def process_message(self, message, stream=True, sink=None):
+        sink = sink or self.sink or dispatch_event
+        async with self._lock:
+            totals, trace = UsageTotals(), {"tools": [], "complete": False}
+            # Only a conversation's opening prompt can be answered from the prompt cache
+            cache = getattr(self.bridge, "prompt_cache", None) if not self.messages else None
+            checkpoint = len(self.messages)
+            try:
+                hit = cache.lookup(message, self.bridge._cache_scope()) if cache else None
+                if hit: content = await self._answer_from_cache(message, hit, stream, sink)
+                else:
+                    # Rate-limited calls queue fairly per conversation within the priority class
+                    with request_context(self.priority, self):
+                        content = await self._process_message(message, stream, sink, totals, trace)
+                    if cache and trace["complete"] and all(self.bridge._read_only(name) for name in trace["tools"]):
+                        cache.store(message, content, self.bridge._cache_scope())
+            except (asyncio.CancelledError, KeyboardInterrupt):
+                # Abandoned mid-turn: drop the partial turn (e.g. tool calls without results) so a retry is clean
+                del self.messages[checkpoint:]
+                raise
+            finally:
+                self._close_usage(totals)
+            if totals.requests: await emit(sink, UsageEvent("message", self.last_usage, self.usage.as_dict()))
+        await emit(sink, FinalAnswerEvent(content))
+        return content
+
+    def _close_usage(self, totals):
+        self.last_usage = totals.as_dict()
+        self.usage.merge(totals)
+        session_usage = getattr(self.bridge, "usage", None)
+        if isinstance(session_usage, UsageTotals): session_usage.merge(totals)
+
+    async def _answer_from_cache(self, message, hit, stream, sink):
+        await emit(sink, CacheHitEvent(hit["prompt"], hit["similarity"], hit["age"]))
+        if stream: await emit(sink, TokenEvent(hit["answer"]))
+        self.messages.append({"role": "user", "content": message})
+        self.messages.append({"role": "assistant", "content": hit["answer"]})
+        return hit["answer"]
+
+    async def _account(self, response, totals, sink):
+        turn = totals.add(response)
+        if turn: await emit(sink, UsageEvent("turn", turn))
+
+    async def _process_message(self, message, stream, sink, totals, trace):
+        llm_client = self.llm_client
+        try:
+            # Set up streaming handler if enabled
+            stream_handler = reasoning_handler = None
+            if stream:
+                stream_handler = lambda token: emit(sink, TokenEvent(token))
+                reasoning_handler = lambda token: emit(sink, ReasoningTokenEvent(token))
+
+            budget = ToolLoopBudget(getattr(self.bridge.config, "budget", None) or BudgetConfig())
+
+            # Send message to LLM
+            response = await llm_client.invoke_with_prompt(
+                message, stream, stream_handler, reasoning_handler=reasoning_handler)
+            budget.record_response(response)
+            await self._account(response, totals, sink)
+
+            # Process tool calls until we get a final response
+            reason = None
+            while response.is_tool_call and response.tool_calls:
+                trace["tools"].extend(parts[1] for parts in map(tool_call_parts, response.tool_calls) if parts)
+                reason = budget.check(response.tool_calls)
+                if reason:
+                    # Out of budget: answer the pending calls and force a final answer without tools
+                    await emit(sink, BudgetExceededEvent(reason))
+                    stop_responses = budget.stop_responses(response.tool_calls, reason)
+                    response = await llm_client.invoke(stop_responses, stream, stream_handler, use_tools=False,
+                                                       reasoning_handler=reasoning_handler)
+                    await self._account(response, totals, sink)
+                    break
+
+                tool_responses = await self.bridge._handle_tool_calls(response.tool_calls, sink, self)
+                budget.record_tool_outputs(tool_responses)
+
+                # Properly invoke the LLM with the tool responses
+                try:
+                    response = await llm_client.invoke(tool_responses, stream, stream_handler,
+                                                       reasoning_handler=reasoning_handler)
+                    budget.record_response(response)
+                    await self._account(response, totals, sink)
+                except Exception as e:
+                    # If the LLM has trouble with the tool response, just show it once
+                    if len(tool_responses) == 1:
+                        # Don't print it here as it will be returned and printed later
+                        return tool_responses[0]['output']
+                    else:
+                        output = "\n".join(t['output'] for t in tool_responses)
+                        return output
+
+            trace["complete"] = reason is None
+            return response.content
+        except Exception as e: return f"Error: {str(e)}"
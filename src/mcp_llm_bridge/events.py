@@ -0,0 +1,79 @@
+# src/mcp_llm_bridge/events.py
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+@dataclass
+class TokenEvent:
+    text: str
+
+@dataclass
+class ReasoningTokenEvent:
+    text: str
+
+@dataclass
+class ToolCallStartEvent:
+    tool_name: str
+    tool_call_id: Optional[str] = None
+    arguments: Any = None
+
+@dataclass
+class ToolCallEndEvent:
+    tool_name: str
+    tool_call_id: Optional[str] = None
+    duration: float = 0.0
+    output: str = ""
+    error: bool = False
+    attachments: list = field(default_factory=list)  # Files/descriptors for non-text content
+
+@dataclass
+class MCPNotificationEvent:
+    method: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class BudgetExceededEvent:
+    reason: str
+
+@dataclass
+class UsageEvent:
+    scope: str  # "turn" after each LLM request, "message" once process_message is done
+    usage: Dict[str, Any] = field(default_factory=dict)  # Tokens, prompt_parts and per_tool breakdown
+    session: Optional[Dict[str, Any]] = None  # Running totals for the conversation, on "message"
+
+@dataclass
+class CacheHitEvent:
+    prompt: str  # The earlier prompt whose answer is reused
+    similarity: float = 1.0
+    age: float = 0.0  # Seconds since it was cached
+
+@dataclass
+class FinalAnswerEvent:
+    content: str
+
+async def emit(sink, event):
+    """Deliver an event to a sink, which may be a plain callable or a coroutine function."""
+    result = sink(event)
+    if hasattr(result, "__await__"): await result
+
+class EventChannel:
+    """Bounded queue between a producer and one async consumer.
+
+    emit() waits while the queue is full, so a slow consumer slows the producer down
+    (and, for token events, the HTTP stream) instead of buffering without limit.
+    """
+    _CLOSED = object()
+
+    def __init__(self, maxsize=256):
+        self.queue = asyncio.Queue(maxsize)
+
+    async def emit(self, event): await self.queue.put(event)
+
+    async def close(self): await self.queue.put(self._CLOSED)
+
+    def __aiter__(self): return self
+
+    async def __anext__(self):
+        event = await self.queue.get()
+        if event is self._CLOSED: raise StopAsyncIteration
+        return event
@@ -1,6 +1,47 @@
 # src/mcp_llm_bridge/llm_client.py
 import openai
+import httpx
 import json
+from mcp_llm_bridge.reasoning import ThinkSplitter, split_reasoning
+from mcp_llm_bridge.scheduler import shared_limiter, slot
+from mcp_llm_bridge.request_builder import RequestBuilder
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token) for budgeting and logging."""
+    return (len(text) + 3) // 4 if isinstance(text, str) else 0
+
+async def _close_stream(stream):
+    close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+    try:
+        result = close() if close else None
+        if hasattr(result, "__await__"): await result
+    except Exception: pass
+
+def tool_call_parts(tool_call):
+    """Return (id, name, arguments) for an object- or dict-style tool call, or None."""
+    try:
+        if hasattr(tool_call, 'function'):
+            return tool_call.id, tool_call.function.name, tool_call.function.arguments
+        if isinstance(tool_call, dict):
+            return tool_call['id'], tool_call['function']['name'], tool_call['function']['arguments']
+    except (AttributeError, KeyError, TypeError): pass
+    return None
+
+def _usage(reported, msgs, tools, response):
+    # Server-reported usage when there is any, else an estimate from the request and the reply
+    prompt_tokens = getattr(reported, "prompt_tokens", None)
+    if isinstance(prompt_tokens, int):
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": getattr(reported, "completion_tokens", None) or 0,
+                 "estimated": False}
+    else:
+        completion_tokens = estimate_tokens(response.content) + estimate_tokens(response.reasoning)
+        for tool_call in response.tool_calls or []:
+            parts = tool_call_parts(tool_call)
+            if parts: completion_tokens += estimate_tokens(parts[1]) + estimate_tokens(parts[2])
+        usage = {"prompt_tokens": estimate_tokens(json.dumps([msgs, tools or []], default=str)),
+                 "completion_tokens": completion_tokens, "estimated": True}
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+    return usage
 
 class LLMResponse:
     def __init__(self, completion):
@@ -10,7 +51,11 @@ class LLMResponse:
         self.is_tool_call = self.stop_reason == "tool_calls"
         self.content = self.message.content if self.message.content is not None else ""
         self.tool_calls = self.message.tool_calls if hasattr(self.message, "tool_calls") else None
-        
+        self.reasoning = getattr(self.message, "reasoning_content", None) or ""
+        self.usage = None  # {prompt_tokens, completion_tokens, total_tokens, estimated}
+        self.prompt = []  # The messages and tools this response was generated from (until the next request)
+        self.request_tools = None
+
     def get_message(self):
         # Ensure we properly format the tool_calls
         msg = {"role": "assistant", "content": self.content}
@@ -33,18 +78,68 @@ class LLMResponse:
         return msg
 
 class LLMClient:
-    def __init__(self, config):
+    def __init__(self, config, client=None):
         self.config = config
-        self.client = openai.OpenAI(api_key=config.api_key, base_url=config.base_url)
+        self.client = client or openai.AsyncOpenAI(
+            api_key=config.api_key, base_url=config.base_url,
+            http_client=openai.DefaultAsyncHttpxClient(limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_connections,
+                keepalive_expiry=getattr(config, "keepalive_expiry", 5.0)))
+        )
         self.tools = []
+        self.tool_filter = None  # Optional callable narrowing self.tools per request
+        self.extra_tools = []  # Tools offered to this conversation only (e.g. fetch_tool_output)
         self.messages = []
         self.system_prompt = None
+        self.request_builder = RequestBuilder()
+        self._stream_usage = True  # Cleared for servers that reject stream_options
+        self.limiter = shared_limiter(f"llm:{config.base_url}", getattr(config, "rate_limit", None))
+
+    def fork(self, messages=None):
+        """Client for another conversation: shares the HTTP client, tools and system prompt, not history."""
+        clone = LLMClient(self.config, client=self.client)
+        clone.tools = self.tools  # The same list: the bridge refreshes it in place
+        clone.tool_filter = self.tool_filter
+        clone.system_prompt = self.system_prompt
+        clone._stream_usage = self._stream_usage
+        clone.messages = messages if messages is not None else []
+        return clone
     
-    async def invoke_with_prompt(self, prompt, stream=False, stream_handler=None):
+    async def prewarm(self):
+        """Open a pooled connection to the endpoint (DNS, TCP, TLS) ahead of the first request."""
+        try: await self.client.models.list()
+        except Exception: pass
+    
+    async def preload(self):
+        """Ask the server to load the model now so the first prompt doesn't pay for it.
+
+        Uses Ollama's native keep-alive request, falling back to a one-token completion
+        on servers without it.
+        """
+        base_url = str(self.client.base_url).rstrip("/")
+        root = base_url[:-3] if base_url.endswith("/v1") else base_url
+        try:
+            await self.client.post(f"{root}/api/generate", cast_to=httpx.Response,
+                                   body={"model": self.config.model, "keep_alive": self.config.keep_alive})
+            return
+        except Exception: pass
+        try:
+            await self.client.chat.completions.create(
+                model=self.config.model, messages=[{"role": "user", "content": "ping"}], max_tokens=1)
+        except Exception: pass
+    
+    async def invoke_with_prompt(self, prompt, stream=False, stream_handler=None, reasoning_handler=None):
         self.messages.append({"role": "user", "content": prompt})
-        return await self.invoke([], stream, stream_handler)
+        return await self.invoke([], stream, stream_handler, reasoning_handler=reasoning_handler)
+    
+    async def invoke(self, tool_results=None, stream=False, stream_handler=None, use_tools=True,
+                     reasoning_handler=None):
+        # The endpoint's limiter slot is held until the response (or stream) is complete
+        async with slot(self.limiter):
+            return await self._invoke(tool_results, stream, stream_handler, use_tools, reasoning_handler)
     
-    async def invoke(self, tool_results=None, stream=False, stream_handler=None):
+    async def _invoke(self, tool_results, stream, stream_handler, use_tools, reasoning_handler):
         # Add tool results to conversation
         if tool_results:
             for result in tool_results:
@@ -55,57 +150,80 @@ class LLMClient:
                 }
                 self.messages.append(tool_message)
         
-        # Prepare messages
-        msgs = []
-        if self.system_prompt: msgs.append({"role": "system", "content": self.system_prompt})
-        msgs.extend(self.messages)
+        # Prepare messages: only what was appended since the last request is added
+        tools = [*self.tools, *self.extra_tools] if use_tools else None
+        if tools and self.tool_filter: tools = self.tool_filter(tools) or None
+        tools = self.request_builder.tools(tools) or None
+        msgs = self.request_builder.build(self.system_prompt, self.messages, tools)
+        reported_usage = None
         
         if stream and stream_handler:
-            # Stream mode
-            streaming_completion = self.client.chat.completions.create(
-                model=self.config.model,
-                messages=msgs,
-                tools=self.tools if self.tools else None,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens,
-                stream=True
-            )
+            # Stream mode; usage arrives in a final chunk without choices when the server supports it
+            request = dict(model=self.config.model, messages=msgs, tools=tools,
+                           temperature=self.config.temperature, max_tokens=self.config.max_tokens, stream=True)
+            if self._stream_usage:
+                try: streaming_completion = await self.client.chat.completions.create(
+                    **request, stream_options={"include_usage": True})
+                except openai.BadRequestError:
+                    self._stream_usage = False
+            if not self._stream_usage:
+                streaming_completion = await self.client.chat.completions.create(**request)
             
             collected_content = ""
+            collected_reasoning = ""
+            splitter = ThinkSplitter()
             tool_calls = []
             stop_reason = None
             
-            for chunk in streaming_completion:
-                delta = chunk.choices[0].delta
+            async def deliver(pieces):
+                # Async handlers are awaited so slow consumers apply backpressure
+                nonlocal collected_content, collected_reasoning
+                for is_reasoning, text in pieces:
+                    if is_reasoning: collected_reasoning += text
+                    else: collected_content += text
+                    handler = reasoning_handler if is_reasoning else stream_handler
+                    result = handler(text) if handler else None
+                    if hasattr(result, "__await__"): await result
+            
+            try:
+                async for chunk in streaming_completion:
+                    if getattr(chunk, "usage", None) is not None: reported_usage = chunk.usage
+                    if not chunk.choices: continue
+                    delta = chunk.choices[0].delta
                 
-                # Handle content
-                if delta.content:
-                    collected_content += delta.content
-                    stream_handler(delta.content)
+                    # Reasoning arrives either in a separate field or inline as <think>...</think>
+                    reasoning = getattr(delta, "reasoning_content", None) or getattr(delta, "reasoning", None)
+                    if reasoning: await deliver([(True, reasoning)])
+                    if delta.content: await deliver(splitter.feed(delta.content))
                 
-                # Handle tool calls
-                if hasattr(delta, "tool_calls") and delta.tool_calls:
-                    for tool_call in delta.tool_calls:
-                        if len(tool_calls) <= tool_call.index:
-                            tool_calls.append({
-                                "id": tool_call.id,
-                                "type": "function",
-                                "function": {
-                                    "name": tool_call.function.name,
-                                    "arguments": tool_call.function.arguments
-                                }
-                            })
-                        elif tool_call.function.arguments:
-                            tool_calls[tool_call.index]["function"]["arguments"] += tool_call.function.arguments
+                    # Handle tool calls
+                    if hasattr(delta, "tool_calls") and delta.tool_calls:
+                        for tool_call in delta.tool_calls:
+                            if len(tool_calls) <= tool_call.index:
+                                tool_calls.append({
+                                    "id": tool_call.id,
+                                    "type": "function",
+                                    "function": {
+                                        "name": tool_call.function.name,
+                                        "arguments": tool_call.function.arguments
+                                    }
+                                })
+                            elif tool_call.function.arguments:
+                                tool_calls[tool_call.index]["function"]["arguments"] += tool_call.function.arguments
                 
-                if chunk.choices[0].finish_reason:
-                    stop_reason = chunk.choices[0].finish_reason
+                    if chunk.choices[0].finish_reason:
+                        stop_reason = chunk.choices[0].finish_reason
+                await deliver(splitter.flush())
+            finally:
+                # Closing the response ends generation server-side when the turn is abandoned mid-stream
+                await _close_stream(streaming_completion)
             
             # Create synthetic completion
             completion = type('SyntheticCompletion', (), {
                 'choices': [type('Choice', (), {
                     'message': type('Message', (), {
                         'content': collected_content,
+                        'reasoning_content': collected_reasoning,
                         'tool_calls': tool_calls
                     }),
                     'finish_reason': stop_reason
@@ -114,22 +232,30 @@ class LLMClient:
         else:
             # Non-streaming mode
             try:
-                completion = self.client.chat.completions.create(
+                completion = await self.client.chat.completions.create(
                     model=self.config.model,
                     messages=msgs,
-                    tools=self.tools if self.tools else None,
+                    tools=tools,
                     temperature=self.config.temperature,
                     max_tokens=self.config.max_tokens
                 )
-            
-                response = LLMResponse(completion)
-                self.messages.append(response.get_message())
-                return response
             except Exception as e:
                 print(f"LLM API error: {str(e)}")
                 raise
-            
-        # For streaming mode
+            reported_usage = getattr(completion, "usage", None)
+        
         response = LLMResponse(completion)
-        self.messages.append(response.get_message())
+        response.prompt, response.request_tools = msgs, tools
+        response.usage = _usage(reported_usage, msgs, tools, response)
+        return self._record(response)
+    
+    def _record(self, response):
+        # Separate any reasoning left in the content, then store the turn without it unless asked
+        reasoning, response.content = split_reasoning(response.content)
+        response.reasoning = response.reasoning + reasoning
+        if response.reasoning: response.content = response.content.lstrip()
+        message = response.get_message()
+        if response.reasoning and getattr(self.config, "keep_reasoning", False):
+            message["content"] = f"<think>{response.reasoning}</think>{response.content}"
+        self.messages.append(message)
         return response
\ No newline at end of file
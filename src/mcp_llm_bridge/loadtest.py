@@ -0,0 +1,167 @@
+# src/mcp_llm_bridge/loadtest.py
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import contextlib
+from mcp_llm_bridge.config import LoadTestConfig
+from mcp_llm_bridge.llm_client import estimate_tokens
+from mcp_llm_bridge.events import TokenEvent, ReasoningTokenEvent, ToolCallEndEvent
+from mcp_llm_bridge.scheduler import limiter_stats
+
+def percentile(values, pct):
+    """Nearest-rank percentile; None for no values."""
+    if not values: return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+def _summary(values):
+    return {"p50": percentile(values, 50), "p95": percentile(values, 95), "p99": percentile(values, 99),
+            "mean": sum(values) / len(values) if values else None}
+
+def load_prompts(path):
+    """Prompts from a text file (one per line) or JSON lines with a "prompt" field."""
+    prompts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line: continue
+            if line.startswith("{"): line = json.loads(line).get("prompt", "")
+            if line: prompts.append(line)
+    if not prompts: raise ValueError(f"No prompts in {path}")
+    return prompts
+
+class _Sample:
+    def __init__(self): self.first_token, self.tokens, self.tool_latencies, self.tool_errors = None, 0, [], 0
+
+    def sink(self, started):
+        def on_event(event):
+            if isinstance(event, (TokenEvent, ReasoningTokenEvent)):
+                if self.first_token is None: self.first_token = time.monotonic() - started
+                self.tokens += estimate_tokens(event.text)
+            elif isinstance(event, ToolCallEndEvent):
+                self.tool_latencies.append(event.duration)
+                self.tool_errors += bool(event.error)
+        return on_event
+
+async def _run_level(bridge, prompts, concurrency, config, cursor):
+    results = []
+    total = max(config.conversations_per_level, concurrency)
+
+    async def worker():
+        while len(results) + running[0] < total:
+            running[0] += 1
+            prompt = prompts[cursor[0] % len(prompts)]
+            cursor[0] += 1
+            sample, started, error = _Sample(), time.monotonic(), None
+            try:
+                answer = await asyncio.wait_for(
+                    bridge.conversation(sink=sample.sink(started)).process_message(prompt, config.stream), config.timeout)
+                if isinstance(answer, str) and answer.startswith("Error:"): error = answer
+            except asyncio.TimeoutError: error = "timeout"
+            except Exception as e: error = str(e) or type(e).__name__
+            running[0] -= 1
+            results.append((sample, time.monotonic() - started, error))
+
+    running = [0]
+    started = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    ok = [(sample, latency) for sample, latency, error in results if not error]
+    errors = [error for _, _, error in results if error]
+    tool_latencies = [value for sample, _, _ in results for value in sample.tool_latencies]
+    tool_errors = sum(sample.tool_errors for sample, _, _ in results)
+    latency = _summary([value for _, value in ok])
+    return {
+        "concurrency": concurrency,
+        "conversations": len(results),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(results) if results else 0.0,
+        "error_examples": sorted(set(errors))[:3],
+        "elapsed": elapsed,
+        "throughput": len(ok) / elapsed if elapsed else 0.0,
+        "tokens_per_second": sum(sample.tokens for sample, _ in ok) / elapsed if elapsed else 0.0,
+        "ttft": _summary([sample.first_token for sample, _ in ok if sample.first_token is not None]),
+        "latency": latency,
+        "tool_calls": len(tool_latencies),
+        "tool_latency": _summary(tool_latencies),
+        "tool_error_rate": tool_errors / len(tool_latencies) if tool_latencies else 0.0,
+        # Kleinrock's power: throughput over latency, highest at the knee of the curve
+        "power": (len(ok) / elapsed) / latency["p50"] if elapsed and latency["p50"] else 0.0,
+    }
+
+def find_knee(steps):
+    """Concurrency with the highest power (throughput / median latency), or None."""
+    candidates = [step for step in steps if step["power"] > 0]
+    return max(candidates, key=lambda step: step["power"])["concurrency"] if candidates else None
+
+async def run_load_test(bridge, prompts, config=None, progress=None):
+    """Ramp concurrent conversations on one bridge and measure each step.
+
+    Each level runs `conversations_per_level` fresh conversations with that many in flight.
+    The ramp stops early once a level's error rate exceeds `max_error_rate`. Returns a
+    JSON-serializable report with per-level latency/TTFT percentiles, tokens/s, tool
+    latency and error rates, plus the knee (the level with the best throughput/latency).
+    """
+    config = config or LoadTestConfig()
+    steps, cursor = [], [0]
+    for concurrency in config.levels:
+        step = await _run_level(bridge, prompts, concurrency, config, cursor)
+        steps.append(step)
+        if progress: progress(step)
+        if step["error_rate"] > config.max_error_rate: break
+    knee = find_knee(steps)
+    return {
+        "model": getattr(getattr(bridge.config, "llm_config", None), "model", None),
+        "prompts": len(prompts),
+        "config": {"levels": config.levels, "conversations_per_level": config.conversations_per_level,
+                   "timeout": config.timeout, "max_error_rate": config.max_error_rate, "stream": config.stream},
+        "steps": steps,
+        "knee": knee,
+        "max_throughput": max((step["throughput"] for step in steps), default=0.0),
+        "limiters": limiter_stats(),  # Queue wait behind configured rate limits, if any
+    }
+
+def _print_step(step):
+    ms = lambda value: f"{value * 1000:.0f}ms" if value is not None else "-"
+    print(f"c={step['concurrency']:<4} ok={step['conversations'] - step['errors']:<4} err={step['error_rate']:.0%} "
+          f"ttft p50={ms(step['ttft']['p50'])} latency p50={ms(step['latency']['p50'])} "
+          f"p95={ms(step['latency']['p95'])} p99={ms(step['latency']['p99'])} "
+          f"{step['throughput']:.2f} conv/s {step['tokens_per_second']:.1f} tok/s "
+          f"tool p50={ms(step['tool_latency']['p50'])}", file=sys.stderr, flush=True)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="computer loadtest", description="Ramp concurrent conversations and find the saturation point")
+    parser.add_argument("--corpus", required=True, help="Prompt file: one prompt per line, or JSON lines with a \"prompt\" field")
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--conversations", type=int, default=20, help="Conversations per level")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-conversation timeout in seconds")
+    parser.add_argument("--max-error-rate", type=float, default=0.5, help="Stop ramping above this error rate")
+    parser.add_argument("--no-stream", action="store_true", help="Use non-streaming completions (no TTFT)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+async def main(argv):
+    from mcp_llm_bridge.main import build_config
+    from mcp_llm_bridge.bridge import BridgeManager
+    from mcp_llm_bridge.logging_config import setup_logging
+    args = parse_args(argv)
+    setup_logging()
+    config = LoadTestConfig(levels=[int(level) for level in args.levels.split(",") if level.strip()],
+                            conversations_per_level=args.conversations, timeout=args.timeout,
+                            max_error_rate=args.max_error_rate, stream=not args.no_stream)
+    prompts = load_prompts(args.corpus)
+    manager = BridgeManager(build_config())
+    # Keep stdout for the report: the boot banner goes to stderr
+    with contextlib.redirect_stdout(sys.stderr): bridge = await manager.__aenter__()
+    try: report = await run_load_test(bridge, prompts, config, progress=_print_step)
+    finally: await manager.__aexit__(None, None, None)
+    report["startup"] = manager.timings
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(text + "\n")
+        print(f"knee at concurrency {report['knee']}; report written to {args.output}", file=sys.stderr)
+    else: print(text)
@@ -1,15 +1,23 @@
 # src/mcp_llm_bridge/logging_config.py
 import sys
 import logging
+from mcp_llm_bridge.events import (
+    TokenEvent, ReasoningTokenEvent, ToolCallStartEvent, BudgetExceededEvent, MCPNotificationEvent,
+    UsageEvent, CacheHitEvent
+)
 
 tool_call_callbacks = []
 stream_token_callbacks = []
+reasoning_token_callbacks = []
 mcp_notification_callbacks = {}
+usage_callbacks = []
 
 def setup_logging(): logging.getLogger().setLevel(logging.ERROR)
 
 def register_tool_call_callback(callback): tool_call_callbacks.append(callback)
 def register_stream_token_callback(callback): stream_token_callbacks.append(callback)
+def register_reasoning_token_callback(callback): reasoning_token_callbacks.append(callback)
+def register_usage_callback(callback): usage_callbacks.append(callback)
 
 def register_mcp_notification_callback(method, callback):
     if method not in mcp_notification_callbacks: mcp_notification_callbacks[method] = []
@@ -25,6 +33,16 @@ def notify_stream_token(token):
         try: callback(token); sys.stdout.flush()
         except: pass
 
+def notify_reasoning_token(token):
+    for callback in reasoning_token_callbacks:
+        try: callback(token); sys.stdout.flush()
+        except: pass
+
+def notify_usage(event):
+    for callback in usage_callbacks:
+        try: callback(event)
+        except: pass
+
 async def notify_mcp_notification(method, params):
     if method not in mcp_notification_callbacks: return
     for callback in mcp_notification_callbacks[method]:
@@ -34,6 +52,17 @@ async def notify_mcp_notification(method, params):
             sys.stdout.flush()
         except: pass
 
+async def dispatch_event(event):
+    """Default event sink: feeds bridge events to the registered callbacks."""
+    if isinstance(event, TokenEvent): notify_stream_token(event.text)
+    elif isinstance(event, ReasoningTokenEvent): notify_reasoning_token(event.text)
+    elif isinstance(event, ToolCallStartEvent): notify_tool_call(event.tool_name)
+    elif isinstance(event, BudgetExceededEvent): notify_tool_call(f"budget exhausted: {event.reason}")
+    elif isinstance(event, MCPNotificationEvent): await notify_mcp_notification(event.method, event.params)
+    elif isinstance(event, UsageEvent): notify_usage(event)
+    elif isinstance(event, CacheHitEvent):
+        notify_tool_call(f"cached answer ({event.similarity:.0%} match, {event.age / 60:.0f} min old): {event.prompt}")
+
 class MinimalProgressLogger:
     def __init__(self): self.in_cot_mode = False
     
@@ -47,6 +76,10 @@ class MinimalProgressLogger:
         print(token, end="", flush=True)
         self.in_cot_mode = True
     
+    def on_reasoning_token(self, token):
+        print(f"\033[2m{token}\033[0m", end="", flush=True)
+        self.in_cot_mode = True
+    
     async def on_mcp_notification(self, params):
         if params.get("contentType") == "thinking":
             print(params.get("content", ""), end="", flush=True)
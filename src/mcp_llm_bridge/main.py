@@ -1,11 +1,15 @@
 # src/mcp_llm_bridge/main.py
 import os, sys, asyncio, argparse
 from dotenv import load_dotenv
-from mcp_llm_bridge.config import BridgeConfig, LLMConfig, SSEServerParameters
+from mcp_llm_bridge.config import (
+    BridgeConfig, LLMConfig, StreamableHTTPServerParameters, SessionConfig, PromptCacheConfig
+)
 from mcp_llm_bridge.bridge import BridgeManager
+from mcp_llm_bridge.llm_client import LLMClient
+from mcp_llm_bridge.usage import format_usage
 from mcp_llm_bridge.logging_config import (
     setup_logging, register_tool_call_callback, register_stream_token_callback,
-    register_mcp_notification_callback, MinimalProgressLogger
+    register_reasoning_token_callback, register_mcp_notification_callback, MinimalProgressLogger
 )
 
 def parse_args():
@@ -13,44 +17,71 @@ def parse_args():
     parser.add_argument("prompt", nargs='?', type=str, help="The prompt to send to the LLM")
     parser.add_argument("--prompt", dest="prompt_flag", type=str, help="The prompt to send to the LLM (alternative flag format)")
     parser.add_argument("--template", type=str, help="Template name to update when using piped input")
+    parser.add_argument("--session", type=str, help="Persist the conversation under this name and resume it on later runs")
+    parser.add_argument("--hide-reasoning", action="store_true", help="Don't print the model's <think> reasoning")
+    parser.add_argument("--timings", action="store_true", help="Print startup timings to stderr")
+    parser.add_argument("--cache", action="store_true",
+                        help="Answer prompts nearly identical to a recent one (that only used read-only tools) from a local cache")
+    parser.add_argument("--no-usage", action="store_true", help="Don't print the token usage summary to stderr")
+    parser.add_argument("--profile", metavar="DIR", help="Write CPU, memory and slow-callback profiles of the run to DIR")
+    parser.add_argument("--profile-mode", choices=["cprofile", "sample"], default="cprofile",
+                        help="cProfile (pstats) or low-overhead stack sampling (collapsed stacks)")
+    parser.add_argument("--record", metavar="CASSETTE", help="Record all LLM and MCP traffic to a cassette file (.jsonl or .jsonl.gz)")
+    parser.add_argument("--replay", metavar="CASSETTE", help="Replay LLM and MCP traffic from a cassette instead of contacting servers")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed multiplier; 0 replays as fast as possible")
     return parser.parse_args()
 
-async def main():
-    os.environ['PYTHONUNBUFFERED'] = '1'
-    setup_logging()
-    load_dotenv()
-    
-    args = parse_args()
-    
-    config = BridgeConfig(
-        mcp_server_params=SSEServerParameters(
-            url="http://mcp.miladyos.net/sse",
-            env={}
+def build_config(session=None):
+    """The bridge configuration used by the CLI commands."""
+    return BridgeConfig(
+        mcp_server_params=StreamableHTTPServerParameters(
+            url="http://mcp.miladyos.net/mcp",
+            sse_url="http://mcp.miladyos.net/sse"
         ),
         llm_config=LLMConfig(
             api_key="ollama",
             model="deepseek-r1:1.5b",
-            base_url="https://lmm.miladyos.net/v1"
+            base_url="https://lmm.miladyos.net/v1",
+            preload=True
         ),
-        system_prompt="You are a helpful assistant that can use tools to help answer questions."
+        system_prompt="You are a helpful assistant that can use tools to help answer questions.",
+        session=SessionConfig(name=session) if session else None
     )
+
+async def main(args=None):
+    os.environ['PYTHONUNBUFFERED'] = '1'
+    setup_logging()
+    load_dotenv()
+    
+    args = args or parse_args()
+    
+    config = build_config(args.session)
+    if args.cache: config.prompt_cache = PromptCacheConfig()
     
     logger = MinimalProgressLogger()
     register_tool_call_callback(logger.on_tool_call)
     register_stream_token_callback(logger.on_stream_token)
+    if not args.hide_reasoning: register_reasoning_token_callback(logger.on_reasoning_token)
     register_mcp_notification_callback("notifications/progress", logger.on_mcp_notification)
     
-    # Check if stdin has data (piped input)
-    stdin_data = ""
-    if not sys.stdin.isatty():
-        stdin_data = sys.stdin.read().strip()
+    # Record or replay traffic by swapping the LLM HTTP client and the MCP session
+    cassette, mcp_client, llm_client = None, None, None
+    if args.record or args.replay:
+        from mcp_llm_bridge.cassette import Cassette
+        cassette = Cassette(args.record or args.replay, "record" if args.record else "replay", args.replay_speed)
+        mcp_client = cassette.mcp_client(config.mcp_server_params)
+        llm_client = cassette.attach(LLMClient(config.llm_config))
     
-    # Create the bridge manager
-    bridge_manager = BridgeManager(config)
+    # Create the bridge manager; piped stdin is read while the bridge connects
+    bridge_manager = BridgeManager(config, read_stdin=not sys.stdin.isatty(), mcp_client=mcp_client, llm_client=llm_client)
     
     async with bridge_manager as bridge:
         try:
             logger.on_init_complete()
+            stdin_data = bridge_manager.stdin_data
+            if args.timings:
+                steps = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in bridge_manager.timings.items())
+                print(f"startup: {steps} (critical path: {bridge_manager.critical_path})", file=sys.stderr, flush=True)
             
             # Handle template update from stdin if template flag is provided
             if args.template and stdin_data:
@@ -58,21 +89,49 @@ async def main():
                 print(f"\nTemplate '{args.template}' updated successfully.", flush=True)
                 return
             
-            # Use prompt_flag if provided, otherwise use positional prompt, or stdin data, or fallback to input
-            user_input = args.prompt_flag if args.prompt_flag else args.prompt if args.prompt else stdin_data if stdin_data else input("\nEnter your prompt: ")
+            # Use prompt_flag if provided, otherwise the positional prompt, or stdin data
+            user_input = args.prompt_flag if args.prompt_flag else args.prompt if args.prompt else stdin_data
+            
+            # Without a prompt, keep the bridge open and take prompts until /exit
+            if not user_input and sys.stdin.isatty():
+                from mcp_llm_bridge.repl import Repl
+                await Repl(bridge, show_usage=not args.no_usage).run()
+                return
+            user_input = user_input or ""
             
             if user_input.strip():
                 response = await bridge.process_message(user_input)
                 print(f"\n{response}", flush=True)
+                if bridge.last_usage and bridge.last_usage["requests"] and not args.no_usage:
+                    reuse = bridge.llm_client.request_builder.stats()["reuse_ratio"]
+                    print(f"{format_usage(bridge.last_usage, bridge.usage.as_dict())}; prefix reuse {reuse:.0%}",
+                          file=sys.stderr, flush=True)
             else:
                 print("\nNo input provided. Exiting...", flush=True)
         except KeyboardInterrupt:
             print("\nExiting...", flush=True)
         except Exception as e:
             print(f"\nError: {str(e)}", flush=True)
+        finally:
+            if cassette: cassette.close()
 
 def cli_entry_point():
-    asyncio.run(main())
+    if sys.argv[1:2] == ["loadtest"]:
+        from mcp_llm_bridge import loadtest
+        return asyncio.run(loadtest.main(sys.argv[2:]))
+    args = parse_args()
+    if not args.profile:
+        try: return asyncio.run(main(args))
+        except KeyboardInterrupt:
+            # asyncio.run cancelled main(), which closed the stream, the tool calls and the bridge
+            print("\nInterrupted.", file=sys.stderr, flush=True)
+            sys.exit(130)
+    
+    from mcp_llm_bridge.profiling import Profiler
+    with Profiler(args.profile, args.profile_mode) as profiler:
+        # Debug mode makes the loop report callbacks that block it
+        asyncio.run(profiler.run(main(args)), debug=True)
+    print(f"profile written: {', '.join(profiler.paths.values())}", file=sys.stderr, flush=True)
 
 if __name__ == "__main__":
     cli_entry_point()
\ No newline at end of file
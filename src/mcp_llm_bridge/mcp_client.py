@@ -1,64 +1,176 @@
 # src/mcp_llm_bridge/mcp_client.py
 import json
-from mcp import ClientSession, StdioServerParameters
+import asyncio
+import inspect
+import logging
+import contextvars
+import httpx
+from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 from mcp.client.sse import sse_client
-from mcp_llm_bridge.config import SSEServerParameters
+from mcp_llm_bridge.config import SSEServerParameters, StreamableHTTPServerParameters
+from mcp_llm_bridge.notifications import NotificationDispatcher
+from mcp_llm_bridge.scheduler import slot
+
+try: from mcp.client.streamable_http import streamable_http_client
+except ImportError: streamable_http_client = None
+try: from mcp.client.streamable_http import streamablehttp_client
+except ImportError: streamablehttp_client = None  # mcp releases without streamable HTTP only speak SSE
+
+logger = logging.getLogger(__name__)
+
+# Progress token sent with tool calls made in this context, so the server's progress can be routed back
+progress_token = contextvars.ContextVar("mcp_llm_bridge_progress_token", default=None)
+
+def _accepts_meta(call):
+    try: parameters = inspect.signature(call).parameters
+    except (TypeError, ValueError): return False
+    return "meta" in parameters or any(p.kind is p.VAR_KEYWORD for p in parameters.values())
+
+async def call_cancellable(session, tool_name, arguments, notify_timeout=1.0):
+    """session.call_tool that tells the server when the call is abandoned.
+
+    On cancellation the SDK only stops waiting; a notifications/cancelled for the request
+    lets the server stop the work too. The context's progress_token goes out as
+    _meta.progressToken.
+    """
+    token = progress_token.get()
+    extra = {"meta": {"progressToken": token}} if token is not None and _accepts_meta(session.call_tool) else {}
+    request_id = getattr(session, "_request_id", None)  # The id call_tool's request is sent with
+    try: return await session.call_tool(tool_name, arguments=arguments, **extra)
+    except asyncio.CancelledError:
+        if isinstance(request_id, int):
+            notification = types.ClientNotification(types.CancelledNotification(
+                params=types.CancelledNotificationParams(requestId=request_id, reason="Client cancelled the call")))
+            try: await asyncio.wait_for(session.send_notification(notification), notify_timeout)
+            except Exception as e: logger.debug("Couldn't send cancellation for %s: %s", tool_name, e)
+        raise
+
+# Keep-alive HTTP clients shared by every streamable HTTP connection with the same settings
+_http_clients = {}
+
+def _acquire_http_client(params):
+    key = (tuple(sorted((params.headers or {}).items())), params.max_connections,
+           params.max_keepalive_connections, params.keepalive_expiry)
+    entry = _http_clients.get(key)
+    if entry is None or entry[0].is_closed:
+        limits = httpx.Limits(max_connections=params.max_connections,
+                              max_keepalive_connections=params.max_keepalive_connections,
+                              keepalive_expiry=params.keepalive_expiry)
+        client = httpx.AsyncClient(headers=params.headers, limits=limits, timeout=httpx.Timeout(30.0, read=300.0))
+        entry = _http_clients[key] = [client, 0]
+    entry[1] += 1
+    return key, entry[0]
+
+async def _release_http_client(key):
+    entry = _http_clients.get(key)
+    if entry is None: return
+    entry[1] -= 1
+    if entry[1] <= 0:
+        del _http_clients[key]
+        await entry[0].aclose()
+
+def _sse_url(params):
+    if params.sse_url: return params.sse_url
+    url = params.url.rstrip("/")
+    return url[:-len("/mcp")] + "/sse" if url.endswith("/mcp") else params.url
 
 class MCPClient:
     def __init__(self, server_params):
         self.server_params = server_params
         self.session = None
         self._client = None
-        self._notification_handlers = {}
+        self._http_key = None
+        self.transport = None
+        self.get_session_id = None
+        self.notifications = NotificationDispatcher()
+        self.limiter = None  # Set by the bridge from BridgeConfig.mcp_rate_limit
         
     async def __aenter__(self):
         await self.connect()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session: await self.session.__aexit__(exc_type, exc_val, exc_tb)
-        if self._client: await self._client.__aexit__(exc_type, exc_val, exc_tb)
+        await self.notifications.aclose()
+        await self._close(exc_type, exc_val, exc_tb)
+
+    async def _close(self, exc_type=None, exc_val=None, exc_tb=None):
+        session, client, self.session, self._client = self.session, self._client, None, None
+        http_key, self._http_key = self._http_key, None
+        try:
+            if session: await session.__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            try:
+                if client: await client.__aexit__(exc_type, exc_val, exc_tb)
+            finally:
+                if http_key: await _release_http_client(http_key)
     
     def register_notification_handler(self, method, handler):
-        self._notification_handlers[method] = handler
+        self.notifications.register(method, handler)
     
     async def _notification_callback(self, message):
         if not isinstance(message, dict) or "method" not in message or "jsonrpc" not in message: return
-            
-        method = message.get("method")
-        params = message.get("params", {})
-        
-        # Call registered handler
-        if method in self._notification_handlers:
-            try: await self._notification_handlers[method](params)
-            except: pass
-            
-        # Handle progress notifications
-        if method == "notifications/progress":
-            from mcp_llm_bridge.logging_config import notify_mcp_notification
-            await notify_mcp_notification(method, params)
+        # Only queues: handlers run on the dispatcher's task so they can't stall the session
+        self.notifications.submit(message.get("method"), message.get("params", {}))
 
     async def connect(self):
+        try:
+            await self._open_transport()
+            await self._start_session()
+        except Exception as e:
+            params = self.server_params
+            if not isinstance(params, StreamableHTTPServerParameters) or not params.fallback_to_sse or self.transport == "sse": raise
+            # The server doesn't speak streamable HTTP (or it failed to come up); retry over SSE
+            logger.info("Streamable HTTP unavailable at %s (%s); falling back to SSE", params.url, e)
+            try: await self._close()
+            except Exception: pass
+            await self._open_transport(sse=True)
+            await self._start_session()
+
+    async def _open_transport(self, sse=False):
         # Initialize client based on server parameters type
-        if isinstance(self.server_params, StdioServerParameters):
-            self._client = stdio_client(self.server_params)
+        params = self.server_params
+        if isinstance(params, StdioServerParameters):
+            self.transport = "stdio"
+            self._client = stdio_client(params)
             self.read, self.write = await self._client.__aenter__()
-        elif isinstance(self.server_params, SSEServerParameters):
-            self._client = sse_client(self.server_params.url, self.server_params.env)
+        elif isinstance(params, SSEServerParameters):
+            self.transport = "sse"
+            self._client = sse_client(params.url, params.env)
             self.read, self.write = await self._client.__aenter__()
+        elif isinstance(params, StreamableHTTPServerParameters):
+            if sse or not (streamable_http_client or streamablehttp_client):
+                self.transport = "sse"
+                self._client = sse_client(_sse_url(params), params.headers)
+                self.read, self.write = await self._client.__aenter__()
+                return
+            self.transport = "streamable-http"
+            if streamable_http_client:
+                # Pooled keep-alive connections; the SDK resumes dropped streams with Last-Event-ID
+                self._http_key, http_client = _acquire_http_client(params)
+                self._client = streamable_http_client(params.url, http_client=http_client,
+                                                      terminate_on_close=params.terminate_on_close)
+            else:
+                self._client = streamablehttp_client(params.url, params.headers, terminate_on_close=params.terminate_on_close)
+            self.read, self.write, self.get_session_id = await self._client.__aenter__()
         else: raise ValueError("Unsupported server parameters")
-        
+
+    async def _start_session(self):
         # Create notification-aware session
         class StreamingClientSession(ClientSession):
             def __init__(self, read, write, notification_callback):
                 super().__init__(read, write)
                 self._notification_callback = notification_callback
             
-            async def _handle_message(self, message):
-                if "method" in message and "params" in message:
-                    await self._notification_callback(message)
-                return await super()._handle_message(message)
+            async def _received_notification(self, notification):
+                root = getattr(notification, "root", notification)
+                params = getattr(root, "params", None)
+                await self._notification_callback({
+                    "jsonrpc": "2.0",
+                    "method": getattr(root, "method", None),
+                    "params": params.model_dump(by_alias=True, exclude_none=True) if params is not None else {}
+                })
+                return await super()._received_notification(notification)
         
         # Initialize session
         session = StreamingClientSession(self.read, self.write, self._notification_callback)
@@ -71,4 +183,4 @@ class MCPClient:
 
     async def call_tool(self, tool_name, arguments):
         if not self.session: raise RuntimeError("Not connected to MCP server")
-        return await self.session.call_tool(tool_name, arguments=arguments)
\ No newline at end of file
+        async with slot(self.limiter): return await call_cancellable(self.session, tool_name, arguments)
\ No newline at end of file
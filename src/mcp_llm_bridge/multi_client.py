@@ -0,0 +1,154 @@
+# src/mcp_llm_bridge/multi_client.py
+import os
+import re
+import copy
+import time
+import asyncio
+import logging
+from urllib.parse import urlparse
+from mcp_llm_bridge.mcp_client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_SEPARATOR = "__"
+
+def _alias_for(params, index):
+    # A readable alias from the server parameters: the script/command name or the host name
+    url = getattr(params, "url", None)
+    if url: name = (urlparse(url).hostname or "").split(".")[0]
+    else:
+        args = getattr(params, "args", None) or []
+        name = os.path.splitext(os.path.basename(args[-1] if args else getattr(params, "command", "") or ""))[0]
+    name = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+    return name or f"server{index + 1}"
+
+def sanitize_tool_name(name):
+    """The OpenAI function name for an MCP tool name: hyphens and spaces to underscores, lowercase."""
+    return name.replace("-", "_").replace(" ", "_").lower()
+
+def _renamed(tool, name):
+    if hasattr(tool, "model_copy"): return tool.model_copy(update={"name": name})
+    tool = copy.copy(tool)
+    tool.name = name
+    return tool
+
+class _ToolList:
+    def __init__(self, tools): self.tools = tools
+
+class MultiMCPClient:
+    """MCPClient look-alike that fronts several MCP servers as one.
+
+    Servers are connected concurrently, each owned by its own task (anyio transports must be
+    closed by the task that opened them). Their tool catalogs are merged; a tool name offered
+    by more than one server (after sanitizing) is exposed as `<alias>__<name>` for each of them. call_tool routes
+    to the owning server, so calls to different servers never queue behind each other.
+    A server that fails to connect is logged and kept in `failed` (its tools left out) until
+    retry_failed() or reconnect() brings it back; connect fails only if every server fails.
+    """
+
+    def __init__(self, server_params):
+        items = server_params.items() if isinstance(server_params, dict) else \
+            ((_alias_for(params, index), params) for index, params in enumerate(server_params))
+        self.clients = {}
+        for alias, params in items:
+            unique, n = alias, 2
+            while unique in self.clients: unique, n = f"{alias}{n}", n + 1
+            # Already-connected clients (e.g. pool leases) are accepted in place of parameters
+            self.clients[unique] = params if hasattr(params, "call_tool") else MCPClient(params)
+        self.failed = {}  # alias -> client that couldn't connect, retried later
+        self._order = list(self.clients)
+        self.routes = {}
+        self.timings = {}
+        self.session = None
+        self._tasks = {}
+        self._closing = asyncio.Event()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._closing.set()
+        if self._tasks: await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    async def _hold(self, alias, client, ready):
+        started = time.monotonic()
+        try:
+            await client.connect()
+            self.timings[alias] = time.monotonic() - started
+            ready.set_result(None)
+            await self._closing.wait()
+        except Exception as e:
+            if not ready.done(): ready.set_exception(e)
+        finally:
+            try: await client.__aexit__(None, None, None)
+            except Exception: pass
+
+    async def connect(self, aliases=None):
+        loop = asyncio.get_running_loop()
+        aliases = list(self.clients if aliases is None else aliases)
+        ready = {alias: loop.create_future() for alias in aliases}
+        for alias in aliases:
+            self._tasks[alias] = asyncio.create_task(self._hold(alias, self.clients[alias], ready[alias]))
+        results = await asyncio.gather(*ready.values(), return_exceptions=True)
+        for alias, result in zip(aliases, results):
+            if isinstance(result, Exception):
+                logger.warning("MCP server %s failed to connect: %s", alias, result)
+                self.failed[alias] = self.clients.pop(alias)
+                await self._tasks.pop(alias)
+        if not self.clients: raise next(result for result in results if isinstance(result, Exception))
+        self.session = True
+
+    def _restore(self, aliases):
+        # Move failed clients back, keeping the configured order (it decides namespacing)
+        for alias in aliases: self.clients[alias] = self.failed.pop(alias)
+        self.clients = {alias: self.clients[alias] for alias in self._order if alias in self.clients}
+
+    async def retry_failed(self):
+        """Connect the servers that failed before; returns the aliases that are back."""
+        aliases = list(self.failed)
+        if not aliases: return []
+        self._restore(aliases)
+        await self.connect(aliases)
+        return [alias for alias in aliases if alias in self.clients]
+
+    async def reconnect(self):
+        """Close every server connection and open them all again (failed ones too), each in a new owner task."""
+        await self.__aexit__(None, None, None)
+        self._restore(list(self.failed))
+        self._closing, self.session = asyncio.Event(), None
+        await self.connect()
+
+    def register_notification_handler(self, method, handler):
+        for client in [*self.clients.values(), *self.failed.values()]: client.register_notification_handler(method, handler)
+
+    async def get_available_tools(self):
+        if not self.session: raise RuntimeError("Not connected to MCP server")
+        aliases = list(self.clients)
+        results = await asyncio.gather(*(self.clients[alias].get_available_tools() for alias in aliases))
+        catalogs = {alias: list(getattr(result, "tools", result) or []) for alias, result in zip(aliases, results)}
+        # Collisions are judged on the names the LLM sees, so `view-template` and `view_template` clash too
+        owners = {}
+        for alias, tools in catalogs.items():
+            for tool in tools: owners.setdefault(sanitize_tool_name(tool.name), []).append(alias)
+        taken = {key for key, aliases in owners.items() if len(aliases) == 1}
+        self.routes, merged = {}, []
+        for alias, tools in catalogs.items():
+            for tool in tools:
+                name = tool.name
+                if len(owners[sanitize_tool_name(tool.name)]) > 1:
+                    # Namespaced names must not clash with a real tool or with each other either
+                    name, n = f"{alias}{NAMESPACE_SEPARATOR}{tool.name}", 2
+                    while sanitize_tool_name(name) in taken:
+                        name, n = f"{alias}{n}{NAMESPACE_SEPARATOR}{tool.name}", n + 1
+                    taken.add(sanitize_tool_name(name))
+                self.routes[name] = (alias, tool.name)
+                merged.append(tool if name == tool.name else _renamed(tool, name))
+        return _ToolList(merged)
+
+    async def call_tool(self, tool_name, arguments):
+        if not self.session: raise RuntimeError("Not connected to MCP server")
+        if tool_name not in self.routes: raise ValueError(f"Unknown tool: {tool_name}")
+        alias, name = self.routes[tool_name]
+        return await self.clients[alias].call_tool(name, arguments)
@@ -0,0 +1,73 @@
+# src/mcp_llm_bridge/notifications.py
+import asyncio
+from collections import OrderedDict
+
+PROGRESS_METHOD = "notifications/progress"
+
+def _merge_progress(pending, latest):
+    # Streamed "thinking" text is concatenated; any other progress update simply supersedes the last
+    if pending.get("contentType") == "thinking" and latest.get("contentType") == "thinking":
+        merged = dict(latest)
+        merged["content"] = f"{pending.get('content', '')}{latest.get('content', '')}"
+        return merged
+    return latest
+
+class NotificationDispatcher:
+    """Method-indexed dispatch of MCP server notifications off the receive path.
+
+    submit() never blocks the MCP session: it only queues. A background task runs each
+    registered handler once per notification. Progress updates for the same progress
+    token (or request id) that arrive within `window` seconds are coalesced into one,
+    and when more than `max_pending` notifications are waiting the oldest is dropped.
+    """
+
+    def __init__(self, window=0.05, max_pending=256):
+        self.window = window
+        self.max_pending = max_pending
+        self._handlers = {}
+        self._pending = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.counters = {"received": 0, "dispatched": 0, "coalesced": 0, "dropped": 0, "errors": 0}
+
+    def register(self, method, handler):
+        handlers = self._handlers.setdefault(method, [])
+        if handler not in handlers: handlers.append(handler)
+
+    def submit(self, method, params):
+        self.counters["received"] += 1
+        if method not in self._handlers: return
+        params = params if isinstance(params, dict) else {}
+        token = params.get("progressToken", params.get("requestId")) if method == PROGRESS_METHOD else None
+        key = (method, token) if token is not None else (method, object())
+        if key in self._pending:
+            self._pending[key] = _merge_progress(self._pending[key], params)
+            self.counters["coalesced"] += 1
+        else:
+            self._pending[key] = params
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+                self.counters["dropped"] += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.window: await asyncio.sleep(self.window)
+            while self._pending:
+                (method, _), params = self._pending.popitem(last=False)
+                for handler in list(self._handlers.get(method, [])):
+                    try:
+                        result = handler(params)
+                        if hasattr(result, "__await__"): await result
+                    except Exception: self.counters["errors"] += 1
+                self.counters["dispatched"] += 1
+
+    async def aclose(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try: await self._task
+            except asyncio.CancelledError: pass
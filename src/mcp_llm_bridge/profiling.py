@@ -0,0 +1,122 @@
+# src/mcp_llm_bridge/profiling.py
+import os
+import sys
+import time
+import asyncio
+import cProfile
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+
+PROFILE_MODES = ("cprofile", "sample")
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class Profiler:
+    """CPU, memory and event-loop profiling for one run, written to `directory`.
+
+    - profile.pstats: cProfile of the run (mode="cprofile"), readable with pstats/snakeviz
+    - profile.collapsed: sampled main-thread stacks every `interval` seconds (mode="sample"),
+      one "frame;frame;frame count" line per stack for flamegraph.pl/speedscope
+    - memory.txt: peak traced memory and the `top` allocation sites by size (tracemalloc),
+      from a snapshot taken near the peak
+    - slow_callbacks.log: asyncio debug warnings for callbacks/coroutine steps that held the
+      loop longer than `slow_callback` seconds, naming the coroutine
+
+    Use as a context manager around asyncio.run(profiler.run(coro), debug=True).
+    """
+
+    def __init__(self, directory, mode="cprofile", interval=0.005, top=25, slow_callback=0.05, memory_interval=0.5):
+        if mode not in PROFILE_MODES: raise ValueError(f"Unknown profile mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.interval = interval
+        self.top = top
+        self.slow_callback = slow_callback
+        self.memory_interval = memory_interval
+        self.samples = Counter()
+        self.paths = {}
+        self._profile = None
+        self._sampler = None
+        self._memory_watch = None
+        self._peak_snapshot = (0, None)
+        self._stop = threading.Event()
+        self._log_handler = None
+        self._asyncio_logger_state = None
+
+    def __enter__(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.paths["slow_callbacks"] = os.path.join(self.directory, "slow_callbacks.log")
+        self._log_handler = logging.FileHandler(self.paths["slow_callbacks"], mode="w", encoding="utf-8")
+        self._log_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        asyncio_logger = logging.getLogger("asyncio")
+        self._asyncio_logger_state = (asyncio_logger.level, asyncio_logger.propagate)
+        asyncio_logger.setLevel(logging.WARNING)
+        asyncio_logger.propagate = False
+        asyncio_logger.addHandler(self._log_handler)
+        tracemalloc.start()
+        self._memory_watch = threading.Thread(target=self._watch_memory, daemon=True)
+        self._memory_watch.start()
+        self._started = time.monotonic()
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = threading.Thread(target=self._sample, args=(threading.get_ident(),), daemon=True)
+            self._sampler.start()
+        return self
+
+    def _sample(self, thread_id):
+        while not self._stop.wait(self.interval):
+            frame, stack = sys._current_frames().get(thread_id), []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack: self.samples[";".join(reversed(stack))] += 1
+
+    def _watch_memory(self):
+        # Re-snapshot whenever traced memory grows 10% past the last snapshot, so the report shows the peak
+        while not self._stop.wait(self.memory_interval):
+            current, _ = tracemalloc.get_traced_memory()
+            if current > self._peak_snapshot[0] * 1.1: self._peak_snapshot = (current, tracemalloc.take_snapshot())
+
+    async def run(self, coro):
+        """Await coro with the running loop reporting slow callbacks at our threshold."""
+        asyncio.get_running_loop().slow_callback_duration = self.slow_callback
+        return await coro
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.monotonic() - self._started
+        if self._profile:
+            self._profile.disable()
+            self.paths["pstats"] = os.path.join(self.directory, "profile.pstats")
+            self._profile.dump_stats(self.paths["pstats"])
+        self._stop.set()
+        self._memory_watch.join()
+        if self._sampler:
+            self._sampler.join()
+            self.paths["collapsed"] = os.path.join(self.directory, "profile.collapsed")
+            with open(self.paths["collapsed"], "w", encoding="utf-8") as f:
+                for stack, count in sorted(self.samples.items()): f.write(f"{stack} {count}\n")
+        self._write_memory_report(elapsed)
+        asyncio_logger = logging.getLogger("asyncio")
+        asyncio_logger.removeHandler(self._log_handler)
+        asyncio_logger.setLevel(self._asyncio_logger_state[0])
+        asyncio_logger.propagate = self._asyncio_logger_state[1]
+        self._log_handler.close()
+        return False
+
+    def _write_memory_report(self, elapsed):
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = self._peak_snapshot[1] if self._peak_snapshot[0] > current else tracemalloc.take_snapshot()
+        snapshot_size = max(self._peak_snapshot[0], current)
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        self.paths["memory"] = os.path.join(self.directory, "memory.txt")
+        with open(self.paths["memory"], "w", encoding="utf-8") as f:
+            f.write(f"elapsed: {elapsed:.3f}s\npeak traced: {peak / 1024 / 1024:.1f} MiB\n"
+                    f"current traced: {current / 1024 / 1024:.1f} MiB\n\n"
+                    f"top {self.top} allocation sites at {snapshot_size / 1024 / 1024:.1f} MiB:\n")
+            for stat in snapshot.statistics("lineno")[:self.top]: f.write(f"{stat}\n")
@@ -0,0 +1,113 @@
+# src/mcp_llm_bridge/prompt_cache.py
+import os
+import re
+import time
+import random
+import sqlite3
+import hashlib
+from array import array
+
+DEFAULT_CACHE_PATH = os.path.join("~", ".milady", "prompt_cache.db")
+_PRIME = (1 << 61) - 1
+# Words that rarely change what is being asked; dropped before shingling
+_FILLER = {"a", "an", "the", "me", "please", "pls", "can", "could", "would", "you", "just", "kindly"}
+
+def normalize(text):
+    """Lowercased words without punctuation or filler words, single-spaced."""
+    return " ".join(word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in _FILLER)
+
+def shingles(text, size=4):
+    """Character shingles of the normalized text (the whole text when it is shorter)."""
+    text = normalize(text)
+    return {text[i:i + size] for i in range(max(1, len(text) - size + 1))}
+
+def _hash(value): return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "little")
+
+class MinHash:
+    """MinHash signatures over `num_perm` universal hash permutations, banded for LSH."""
+
+    def __init__(self, num_perm=64, bands=16, seed=1):
+        if num_perm % bands: raise ValueError("num_perm must be a multiple of bands")
+        rng = random.Random(seed)
+        self.permutations = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(num_perm)]
+        self.bands = bands
+        self.rows = num_perm // bands
+
+    def signature(self, items):
+        hashes = [_hash(item) for item in items] or [0]
+        return [min((a * h + b) % _PRIME for h in hashes) for a, b in self.permutations]
+
+    def buckets(self, signature):
+        return [f"{band}:{hashlib.blake2b(array('Q', signature[band * self.rows:(band + 1) * self.rows]).tobytes(), digest_size=8).hexdigest()}"
+                for band in range(self.bands)]
+
+    @staticmethod
+    def similarity(first, second):
+        """Estimated Jaccard similarity of the sets behind two signatures."""
+        return sum(a == b for a, b in zip(first, second)) / len(first)
+
+class PromptCache:
+    """Answers to earlier prompts, found again for prompts that are nearly the same.
+
+    Prompts are normalized, cut into character shingles and MinHashed; an LSH index in
+    SQLite finds candidates, and the most similar one at or above `threshold` (estimated
+    Jaccard) within `ttl_seconds` is a hit. `scope` separates answers that aren't
+    interchangeable (another model, system prompt or tool set).
+    """
+
+    def __init__(self, path=None, threshold=0.8, ttl_seconds=3600.0, max_entries=10_000, num_perm=64, bands=16):
+        self.path = os.path.expanduser(path or os.environ.get("MILADY_PROMPT_CACHE_DB", DEFAULT_CACHE_PATH))
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.minhash = MinHash(num_perm, bands)
+        self.hits = self.misses = 0
+        if os.path.dirname(self.path): os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY, scope TEXT NOT NULL, prompt TEXT NOT NULL, answer TEXT NOT NULL,
+            signature BLOB NOT NULL, created REAL NOT NULL)""")
+        self.db.execute("CREATE TABLE IF NOT EXISTS buckets (bucket TEXT NOT NULL, entry INTEGER NOT NULL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS buckets_bucket ON buckets (bucket)")
+
+    def _signature(self, prompt): return self.minhash.signature(shingles(prompt))
+
+    def lookup(self, prompt, scope=""):
+        """The best cached answer for a similar prompt: {answer, prompt, similarity, age}, or None."""
+        signature = self._signature(prompt)
+        buckets = [f"{scope}:{bucket}" for bucket in self.minhash.buckets(signature)]
+        rows = self.db.execute(
+            f"""SELECT DISTINCT e.id, e.prompt, e.answer, e.signature, e.created FROM buckets b
+                JOIN entries e ON e.id = b.entry WHERE b.bucket IN ({",".join("?" * len(buckets))})
+                AND e.created >= ?""", (*buckets, time.time() - self.ttl_seconds)).fetchall()
+        best = None
+        for _, cached_prompt, answer, blob, created in rows:
+            similarity = MinHash.similarity(signature, array("Q", bytes(blob)))
+            if similarity >= self.threshold and (best is None or similarity > best["similarity"]):
+                best = {"answer": answer, "prompt": cached_prompt, "similarity": similarity, "age": time.time() - created}
+        if best: self.hits += 1
+        else: self.misses += 1
+        return best
+
+    def store(self, prompt, answer, scope=""):
+        signature = self._signature(prompt)
+        with self.db:
+            self.db.execute("BEGIN")
+            entry = self.db.execute("INSERT INTO entries (scope, prompt, answer, signature, created) VALUES (?, ?, ?, ?, ?)",
+                                    (scope, prompt, answer, array("Q", signature).tobytes(), time.time())).lastrowid
+            self.db.executemany("INSERT INTO buckets (bucket, entry) VALUES (?, ?)",
+                                [(f"{scope}:{bucket}", entry) for bucket in self.minhash.buckets(signature)])
+        self.expire()
+
+    def expire(self):
+        """Drop entries past their TTL and the oldest beyond max_entries."""
+        with self.db:
+            self.db.execute("BEGIN")
+            dropped = self.db.execute(
+                "DELETE FROM entries WHERE created < ? OR id <= (SELECT id FROM entries ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (time.time() - self.ttl_seconds, self.max_entries)).rowcount
+            if dropped: self.db.execute("DELETE FROM buckets WHERE entry NOT IN (SELECT id FROM entries)")
+
+    def close(self): self.db.close()
@@ -0,0 +1,61 @@
+# src/mcp_llm_bridge/reasoning.py
+OPEN_TAG = "<think>"
+CLOSE_TAG = "</think>"
+
+def _partial_tag_length(text, tag):
+    # Length of the longest suffix of text that is a proper prefix of tag
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:size]): return size
+    return 0
+
+class ThinkSplitter:
+    """Incremental splitter for <think>...</think> reasoning in streamed model output.
+
+    feed() takes raw chunks and returns (is_reasoning, text) pieces. A chunk ending in
+    what could be the start of a tag is held back until the next chunk decides it, so
+    tags split across chunks (e.g. "</th" + "ink>") are never leaked into either side.
+    """
+
+    def __init__(self, open_tag=OPEN_TAG, close_tag=CLOSE_TAG):
+        self.open_tag = open_tag
+        self.close_tag = close_tag
+        self.in_reasoning = False
+        self._buffer = ""
+
+    def feed(self, text):
+        self._buffer += text
+        pieces = []
+        while self._buffer:
+            tag = self.close_tag if self.in_reasoning else self.open_tag
+            index = self._buffer.find(tag)
+            if index >= 0:
+                if index: pieces.append((self.in_reasoning, self._buffer[:index]))
+                self._buffer = self._buffer[index + len(tag):]
+                self.in_reasoning = not self.in_reasoning
+                continue
+            held = _partial_tag_length(self._buffer, tag)
+            ready = self._buffer[:len(self._buffer) - held]
+            if ready: pieces.append((self.in_reasoning, ready))
+            self._buffer = self._buffer[len(self._buffer) - held:]
+            break
+        return pieces
+
+    def flush(self):
+        pieces = [(self.in_reasoning, self._buffer)] if self._buffer else []
+        self._buffer = ""
+        return pieces
+
+def split_reasoning(text):
+    """Split complete model output into (reasoning, answer).
+
+    Also handles output whose opening tag was part of the prompt template, where only
+    a closing </think> appears in the text.
+    """
+    splitter = ThinkSplitter()
+    pieces = splitter.feed(text or "") + splitter.flush()
+    reasoning = "".join(piece for is_reasoning, piece in pieces if is_reasoning)
+    answer = "".join(piece for is_reasoning, piece in pieces if not is_reasoning)
+    if CLOSE_TAG in answer:
+        orphan, answer = answer.split(CLOSE_TAG, 1)
+        reasoning = orphan + reasoning
+    return reasoning, answer.lstrip() if reasoning else answer
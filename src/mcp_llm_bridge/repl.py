@@ -0,0 +1,213 @@
+# src/mcp_llm_bridge/repl.py
+import sys
+import time
+import signal
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from mcp_llm_bridge.logging_config import dispatch_event
+from mcp_llm_bridge.events import TokenEvent, ReasoningTokenEvent, ToolCallEndEvent
+from mcp_llm_bridge.reasoning import split_reasoning
+from mcp_llm_bridge.usage import format_usage
+
+logger = logging.getLogger(__name__)
+
+PROMPT = "\n› "
+COMMANDS = {
+    "/timing": "where the time of the last turn went",
+    "/clear": "forget the conversation so far",
+    "/compact": "shorten old tool results to free context",
+    "/tools": "reload the tool list from the MCP server",
+    "/exit": "leave (also /quit, Ctrl+D)",
+}
+
+def compact_history(messages, keep_turns=2, max_chars=300):
+    """Shorten tool results (and drop stored reasoning) older than the last `keep_turns` prompts.
+
+    The history is replaced in one assignment, so a persisted session is rewritten once.
+    Returns the number of characters removed.
+    """
+    users = [index for index, message in enumerate(messages) if isinstance(message, dict) and message.get("role") == "user"]
+    cutoff = users[-keep_turns] if keep_turns and len(users) >= keep_turns else (0 if keep_turns else len(messages))
+    compacted, saved = [], 0
+    for index, message in enumerate(messages):
+        content = message.get("content") if isinstance(message, dict) else None
+        if index < cutoff and isinstance(content, str):
+            shorter = content
+            if message.get("role") == "tool" and len(content) > max_chars:
+                shorter = f"{content[:max_chars]}\n[compacted: {len(content) - max_chars} more characters]"
+            elif message.get("role") == "assistant" and "<think>" in content: shorter = split_reasoning(content)[1].lstrip()
+            if len(shorter) < len(content):
+                saved += len(content) - len(shorter)
+                message = dict(message, content=shorter)
+        compacted.append(message)
+    if saved: messages[:] = compacted
+    return saved
+
+def _read_line(prompt):
+    # input() on a daemon thread: the loop keeps running meanwhile and exiting never waits on stdin
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(result, error):
+        if future.done(): return
+        if error: future.set_exception(error)
+        else: future.set_result(result)
+
+    def read():
+        try: line, error = input(prompt), None
+        except Exception as e: line, error = None, e
+        loop.call_soon_threadsafe(settle, line, error)
+
+    threading.Thread(target=read, daemon=True).start()
+    return future
+
+async def _ping(client, timeout):
+    clients = getattr(client, "clients", None)
+    if isinstance(clients, dict):
+        return all(await asyncio.gather(*(_ping(child, timeout) for child in clients.values())))
+    send_ping = getattr(getattr(client, "session", None), "send_ping", None)
+    if send_ping is None: return True
+    try: await asyncio.wait_for(send_ping(), timeout)
+    except Exception: return False
+    return True
+
+@contextmanager
+def _interrupts_cancel(task, interrupted):
+    # Ctrl+C cancels `task` instead of the whole program while the block runs (main thread only)
+    def handler(signum, frame):
+        interrupted.append(True)
+        task.get_loop().call_soon_threadsafe(task.cancel)
+    try: previous = signal.signal(signal.SIGINT, handler)
+    except ValueError: previous = None
+    try: yield
+    finally:
+        if previous is not None: signal.signal(signal.SIGINT, previous)
+
+class TurnTimer:
+    """Event sink wrapper that records where one turn's time went (and what it streamed)."""
+
+    def __init__(self, sink=dispatch_event):
+        self.sink = sink
+        self.started = time.monotonic()
+        self.first_token = None
+        self.tool_calls = 0
+        self.tool_seconds = 0.0
+        self.finished = None
+        self.streamed = []  # Answer tokens shown as they arrived
+
+    async def __call__(self, event):
+        if isinstance(event, TokenEvent): self.streamed.append(event.text)
+        if isinstance(event, (TokenEvent, ReasoningTokenEvent)) and self.first_token is None:
+            self.first_token = time.monotonic() - self.started
+        elif isinstance(event, ToolCallEndEvent):
+            self.tool_calls += 1
+            self.tool_seconds += event.duration
+        await self.sink(event)
+
+    def report(self, usage=None):
+        total = (self.finished or time.monotonic()) - self.started
+        text = f"last turn: {total:.2f}s"
+        if self.first_token is not None: text += f", first token after {self.first_token:.2f}s"
+        requests = usage["requests"] if usage else None
+        text += f"; model {total - self.tool_seconds:.2f}s" + (f" over {requests} request(s)" if requests else "")
+        text += f"; tools {self.tool_seconds:.2f}s over {self.tool_calls} call(s)"
+        if usage and requests: text += f"; {usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion tokens"
+        return text
+
+class Repl:
+    """Prompt loop on one open bridge: the MCP session, tool list and HTTP connections stay warm.
+
+    Follow-ups share the bridge's conversation history; Ctrl+C stops the current answer
+    (closing the LLM stream and cancelling tool calls) and keeps the loop. A background task
+    pings the MCP server(s) and the LLM endpoint every `keepalive` seconds so idle
+    connections aren't dropped; if the MCP session stops answering it is reopened before
+    the next prompt.
+    """
+
+    def __init__(self, bridge, stream=True, show_usage=True, keepalive=20.0, ping_timeout=5.0):
+        self.bridge = bridge
+        self.stream = stream
+        self.show_usage = show_usage
+        self.keepalive = keepalive
+        self.ping_timeout = ping_timeout
+        self.last_turn = None
+        self.mcp_lost = False
+        self.tools_stale = False  # A server that was down came back; reload tools before the next prompt
+        self._keepalive_task = None
+
+    async def _keep_warm(self):
+        while True:
+            await asyncio.sleep(self.keepalive)
+            alive = await _ping(self.bridge.mcp_client, self.ping_timeout)
+            if not alive and not self.mcp_lost: logger.warning("MCP session stopped answering pings")
+            self.mcp_lost = not alive  # A later answered ping means the session recovered on its own
+            retry_failed = getattr(self.bridge.mcp_client, "retry_failed", None)
+            if retry_failed and not self.mcp_lost:
+                try:
+                    if await retry_failed(): self.tools_stale = True
+                except Exception as e: logger.debug("Retrying MCP servers failed: %s", e)
+            await self.bridge.llm_client.prewarm()
+
+    async def run(self):
+        print(f"Type a prompt, or {', '.join(COMMANDS)}.", flush=True)
+        if self.keepalive: self._keepalive_task = asyncio.create_task(self._keep_warm())
+        try:
+            while True:
+                try: line = (await _read_line(PROMPT)).strip()
+                except EOFError: break
+                if not line: continue
+                if line.startswith("/") or line in ("exit", "quit"):
+                    if not await self.command(line): break
+                else: await self.ask(line)
+        finally:
+            if self._keepalive_task:
+                self._keepalive_task.cancel()
+                try: await self._keepalive_task
+                except asyncio.CancelledError: pass
+        print("", flush=True)
+
+    async def ask(self, prompt):
+        if self.mcp_lost:
+            try:
+                await self.bridge.reconnect()
+                self.mcp_lost = self.tools_stale = False
+            except Exception as e: print(f"MCP server unreachable ({e}); answering without fresh tools", flush=True)
+        elif self.tools_stale:
+            self.tools_stale = False
+            await self.bridge.refresh_tools()
+        timer, interrupted = TurnTimer(), []
+        turn = asyncio.ensure_future(self.bridge.process_message(prompt, self.stream, sink=timer))
+        try:
+            with _interrupts_cancel(turn, interrupted): response = await turn
+        except asyncio.CancelledError:
+            if not interrupted: raise
+            print("\nInterrupted; that prompt was left out of the conversation.", flush=True)
+            return
+        finally: timer.finished = time.monotonic()
+        self.last_turn = timer
+        # Errors and budget/fallback answers come back without being streamed; show those
+        shown = "".join(timer.streamed).rstrip().endswith((response or "").strip())
+        print("" if shown else f"\n{response}", flush=True)
+        usage = self.bridge.last_usage
+        if self.show_usage and usage and usage["requests"]: print(format_usage(usage), file=sys.stderr, flush=True)
+
+    async def command(self, line):
+        """Run a /command; False means leave the loop."""
+        name = line.split()[0].lower()
+        if name in ("/exit", "/quit", "exit", "quit"): return False
+        if name == "/timing":
+            print(self.last_turn.report(self.bridge.last_usage) if self.last_turn else "No turn yet.", flush=True)
+        elif name == "/clear":
+            self.bridge.llm_client.messages.clear()
+            print("Context cleared.", flush=True)
+        elif name == "/compact":
+            saved = compact_history(self.bridge.llm_client.messages)
+            print(f"Compacted ~{(saved + 3) // 4} tokens of old tool output." if saved else "Nothing to compact.", flush=True)
+        elif name == "/tools":
+            tools = await self.bridge.refresh_tools()
+            print(f"{len(tools)} tools: {', '.join(tool.name for tool in tools)}", flush=True)
+        else:
+            for command, description in COMMANDS.items(): print(f"{command:<9} {description}", flush=True)
+        return True
@@ -0,0 +1,76 @@
+# src/mcp_llm_bridge/request_builder.py
+import json
+
+def _size(value):
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode())
+
+def canonical_tools(tools):
+    """Tools sorted by name with key-sorted schemas: the same bytes on every request and every run."""
+    ordered = sorted(tools, key=lambda tool: (tool.get("function") or {}).get("name", ""))
+    return json.loads(json.dumps(ordered, sort_keys=True, default=str))
+
+class RequestBuilder:
+    """Append-only message list for one conversation's LLM requests.
+
+    build() keeps the messages of the previous request that are still the same objects
+    at the same place in history and only appends (and sizes) new ones, so a long tool
+    loop doesn't copy and re-encode the whole history every turn; an edited or truncated
+    history is rebuilt from the first difference. Tools are canonicalized once per tool
+    list. The system prompt, tools and earlier turns therefore form a byte-identical
+    prefix from request to request, which llama.cpp/Ollama prefix caching relies on.
+    stats() reports how much of each request repeated the previous one.
+    """
+
+    def __init__(self):
+        self.messages = []  # System prompt then history; reused across requests, don't keep a reference
+        self._ends = []  # Cumulative encoded size through each message
+        self._system = None
+        self._tools_source = None
+        self._tools = None
+        self._tools_size = 0
+        self._last_tools = None
+        self.requests = 0
+        self.reused_bytes = 0
+        self.request_bytes = 0
+        self.last_reuse = 0.0
+
+    def tools(self, tools):
+        """Canonical form of an OpenAI tool list, cached while the list is unchanged."""
+        if not tools: return tools
+        source = tuple(id(tool) for tool in tools)
+        if source != self._tools_source:
+            self._tools_source, self._tools = source, canonical_tools(tools)
+            self._tools_size = _size(self._tools)
+        return self._tools
+
+    def build(self, system_prompt, history, tools=None):
+        """The messages for a request; also records how much of it matches the previous one."""
+        offset = 1 if system_prompt else 0
+        fresh = self.requests == 0 or system_prompt != self._system
+        if fresh:
+            self._system = system_prompt
+            self.messages, self._ends = [], []
+            if system_prompt:
+                self.messages.append({"role": "system", "content": system_prompt})
+                self._ends.append(_size(self.messages[0]))
+        keep, limit = offset, min(len(self.messages), len(history) + offset)
+        while keep < limit and self.messages[keep] is history[keep - offset]: keep += 1
+        reused = self._ends[keep - 1] if keep and not fresh else 0
+        del self.messages[keep:], self._ends[keep:]
+        for message in history[keep - offset:]:
+            self.messages.append(message)
+            self._ends.append((self._ends[-1] if self._ends else 0) + _size(message))
+
+        total = (self._ends[-1] if self._ends else 0) + (self._tools_size if tools else 0)
+        if tools and tools is self._last_tools: reused += self._tools_size
+        self._last_tools = tools
+        self.requests += 1
+        self.reused_bytes += reused
+        self.request_bytes += total
+        self.last_reuse = reused / total if total else 0.0
+        return self.messages
+
+    def stats(self):
+        return {"requests": self.requests, "last_reuse": self.last_reuse,
+                "reuse_ratio": self.reused_bytes / self.request_bytes if self.request_bytes else 0.0,
+                "request_bytes": self.request_bytes}
@@ -0,0 +1,156 @@
+# src/mcp_llm_bridge/scheduler.py
+import time
+import asyncio
+import logging
+import contextlib
+import contextvars
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = {"interactive": 0, "batch": 1}  # Lower runs first
+DEFAULT_PRIORITY = "interactive"
+
+_priority = contextvars.ContextVar("mcp_llm_bridge_priority", default=DEFAULT_PRIORITY)
+_flow = contextvars.ContextVar("mcp_llm_bridge_flow", default=None)
+_limiters = {}
+
+@contextlib.contextmanager
+def request_context(priority=None, flow=None):
+    """Run the enclosed calls at `priority`, queued fairly as `flow` (e.g. a conversation).
+
+    None keeps the enclosing value, so an outer `with request_context("batch")` wins over
+    a conversation's default.
+    """
+    if priority is not None and priority not in PRIORITIES: raise ValueError(f"Unknown priority: {priority}")
+    tokens = [(var, var.set(value)) for var, value in ((_priority, priority), (_flow, flow)) if value is not None]
+    try: yield
+    finally:
+        for var, token in reversed(tokens): var.reset(token)
+
+def current_priority(): return _priority.get()
+
+def _wait_summary(waits):
+    ordered = sorted(waits["recent"])
+    return {"count": waits["count"], "mean": waits["total"] / waits["count"] if waits["count"] else 0.0,
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0, "max": waits["max"]}
+
+class Limiter:
+    """Token bucket on request starts plus a cap on requests in flight, for one endpoint or server.
+
+    Waiting requests are granted strictly by priority class; within a class, flows take
+    turns (round robin), so one busy conversation can't starve the others. Queue wait
+    per priority is kept for stats().
+    """
+
+    def __init__(self, name, requests_per_second=None, burst=1, max_concurrent=None):
+        self.name = name
+        self.rate = requests_per_second
+        self.burst = max(1, burst or 1)
+        self.max_concurrent = max_concurrent
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.active = 0
+        self.started = 0
+        self._queues = {}  # priority -> {flow: deque of futures}
+        self._timer = None
+        self._waits = {}
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate: self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _blocked(self):
+        if self.max_concurrent is not None and self.active >= self.max_concurrent: return "concurrency"
+        self._refill()
+        return "rate" if self.rate and self.tokens < 1 else None
+
+    def _take(self):
+        self.active += 1
+        self.started += 1
+        if self.rate: self.tokens -= 1
+
+    def _next_waiter(self):
+        for priority in sorted(self._queues):
+            flows = self._queues[priority]
+            while flows:
+                flow, waiters = flows.popitem(last=False)
+                waiter = waiters.popleft()
+                if waiters: flows[flow] = waiters  # Back of the line until the other flows have had a turn
+                if not waiter.done(): return waiter
+        return None
+
+    def _dispatch(self):
+        self._timer = None
+        while any(self._queues.values()):
+            blocked = self._blocked()
+            if blocked == "rate":
+                self._timer = asyncio.get_running_loop().call_later((1 - self.tokens) / self.rate, self._dispatch)
+                return
+            if blocked: return
+            waiter = self._next_waiter()
+            if waiter is None: return
+            self._take()
+            waiter.set_result(None)
+
+    def _record_wait(self, priority, seconds):
+        waits = self._waits.setdefault(priority, {"count": 0, "total": 0.0, "max": 0.0, "recent": deque(maxlen=1000)})
+        waits["count"] += 1
+        waits["total"] += seconds
+        waits["max"] = max(waits["max"], seconds)
+        waits["recent"].append(seconds)
+
+    async def acquire(self):
+        priority, flow = current_priority(), _flow.get()
+        started = time.monotonic()
+        if not any(self._queues.values()) and not self._blocked(): self._take()
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            level = self._queues.setdefault(PRIORITIES[priority], OrderedDict())
+            level.setdefault(id(flow) if flow is not None else id(waiter), deque()).append(waiter)
+            if self._timer is None: self._dispatch()
+            try: await waiter
+            except asyncio.CancelledError:
+                # Granted just as we were cancelled: hand the slot on
+                if waiter.done() and not waiter.cancelled(): self.release()
+                raise
+        waited = time.monotonic() - started
+        self._record_wait(priority, waited)
+        if waited > 1.0: logger.debug("%s: %s request queued %.2fs", self.name, priority, waited)
+
+    def release(self):
+        self.active -= 1
+        if self._timer is None: self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try: yield
+        finally: self.release()
+
+    def stats(self):
+        return {"active": self.active, "queued": sum(len(waiters) for level in self._queues.values() for waiters in level.values()),
+                "started": self.started,
+                "queue_wait": {name: _wait_summary(self._waits[name]) for name in PRIORITIES if name in self._waits}}
+
+def shared_limiter(name, rate_limit):
+    """The process-wide Limiter for `name` (e.g. "llm:<base_url>"), or None without a RateLimit."""
+    if rate_limit is None: return None
+    if name not in _limiters:
+        _limiters[name] = Limiter(name, rate_limit.requests_per_second, rate_limit.burst, rate_limit.max_concurrent)
+    return _limiters[name]
+
+def server_key(params):
+    """A name for an MCP server: its URL, or its command line."""
+    url = getattr(params, "url", None)
+    if url: return f"mcp:{url}"
+    return "mcp:" + " ".join([str(getattr(params, "command", "") or "")] + [str(arg) for arg in getattr(params, "args", None) or []])
+
+def slot(limiter):
+    """limiter.slot(), or a no-op when there is no limiter."""
+    return limiter.slot() if limiter else contextlib.nullcontext()
+
+def limiter_stats():
+    """stats() of every shared limiter, by name."""
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
@@ -0,0 +1,228 @@
+# src/mcp_llm_bridge/server_pool.py
+import os
+import asyncio
+import logging
+from mcp_llm_bridge.mcp_client import MCPClient, call_cancellable
+from mcp_llm_bridge.notifications import NotificationDispatcher
+from mcp_llm_bridge.scheduler import slot
+
+logger = logging.getLogger(__name__)
+
+def _children():
+    # Direct children of this process; empty where /proc isn't available
+    try:
+        with open(f"/proc/{os.getpid()}/task/{os.getpid()}/children") as f: return {int(pid) for pid in f.read().split()}
+    except (OSError, ValueError): return set()
+
+def _proc_status(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f: return dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError: return None
+
+class _PooledServer:
+    """One server process, owned by its own task so the stdio transport is entered and exited there."""
+
+    def __init__(self, server_params):
+        self.client = MCPClient(server_params)
+        self.pid = None
+        self.tools = None
+        self.calls = 0
+        self._ready = asyncio.get_running_loop().create_future()
+        self._stop = asyncio.Event()
+        self._task = None
+
+    async def start(self, spawn_lock):
+        self._task = asyncio.create_task(self._run(spawn_lock))
+        await self._ready
+
+    async def _run(self, spawn_lock):
+        try:
+            # Spawns are serialized so the new child pid can be told apart; initialization isn't
+            async with spawn_lock:
+                before = _children()
+                await self.client._open_transport()
+                self.pid = next(iter(_children() - before), None)
+            await self.client._start_session()
+            self.tools = await self.client.get_available_tools()
+            self._ready.set_result(None)
+            await self._stop.wait()
+        except Exception as e:
+            if not self._ready.done(): self._ready.set_exception(e)
+        finally:
+            try: await self.client.__aexit__(None, None, None)
+            except Exception: pass
+
+    def alive(self):
+        if self._task is None or self._task.done(): return False
+        if self.pid is None: return True
+        status = _proc_status(self.pid)
+        return status is not None and not status.get("State", "").strip().startswith(("Z", "X"))
+
+    def rss_mb(self):
+        status = _proc_status(self.pid) if self.pid else None
+        try: return int(status["VmRSS"].split()[0]) / 1024 if status else None
+        except (KeyError, ValueError, IndexError): return None
+
+    async def healthy(self, timeout):
+        if not self.alive(): return False
+        try: await asyncio.wait_for(self.client.session.send_ping(), timeout)
+        except Exception: return False
+        return True
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            try: await self._task
+            except Exception: pass
+
+class PooledMCPClient:
+    """MCPClient stand-in holding a lease on a pooled server; closing it hands the server back."""
+
+    def __init__(self, pool, server):
+        self._pool = pool
+        self._server = server
+        self.server_params = server.client.server_params
+        self.session = server.client.session
+        self.notifications = server.client.notifications
+        self.pid = server.pid
+        self.limiter = None
+
+    async def __aenter__(self): return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb): await self.release()
+
+    async def connect(self): pass  # Already connected and initialized by the pool
+
+    def register_notification_handler(self, method, handler): self.notifications.register(method, handler)
+
+    async def get_available_tools(self):
+        if self._server is None: raise RuntimeError("Pooled MCP server already released")
+        return self._server.tools
+
+    async def call_tool(self, tool_name, arguments):
+        if self._server is None: raise RuntimeError("Pooled MCP server already released")
+        self._server.calls += 1
+        async with slot(self.limiter): return await call_cancellable(self.session, tool_name, arguments)
+
+    async def release(self):
+        server, self._server = self._server, None
+        if server: await self._pool.release(server)
+
+class StdioServerPool:
+    """Keeps `size` stdio MCP servers spawned, initialized and idle, ready to hand to bridges.
+
+    acquire() returns a PooledMCPClient in milliseconds: the process is already running and
+    its tool list cached. A server goes back to the pool on release unless it has served
+    `max_calls` tool calls or its RSS exceeds `max_rss_mb`, in which case it's replaced.
+    Idle servers are checked every `check_interval` seconds and crashed ones restarted.
+    """
+
+    def __init__(self, server_params, size=2, max_calls=None, max_rss_mb=None, check_interval=5.0, ping_timeout=2.0):
+        self.server_params = server_params
+        self.size = size
+        self.max_calls = max_calls
+        self.max_rss_mb = max_rss_mb
+        self.check_interval = check_interval
+        self.ping_timeout = ping_timeout
+        self._idle = []
+        self._leased = set()
+        self._spawning = 0
+        self._spawn_lock = asyncio.Lock()
+        self._background = set()
+        self._maintainer = None
+        self._closed = False
+        self.counters = {"spawned": 0, "recycled": 0, "restarted": 0, "acquired": 0}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb): await self.close()
+
+    async def start(self):
+        await self._refill()
+        if self.check_interval: self._maintainer = asyncio.create_task(self._maintain())
+
+    async def _spawn(self):
+        server = _PooledServer(self.server_params)
+        await server.start(self._spawn_lock)
+        self.counters["spawned"] += 1
+        logger.debug("Spawned pooled MCP server pid=%s", server.pid)
+        return server
+
+    async def _refill(self):
+        missing = self.size - len(self._idle) - self._spawning
+        if missing <= 0 or self._closed: return
+        self._spawning += missing
+        try: results = await asyncio.gather(*(self._spawn() for _ in range(missing)), return_exceptions=True)
+        finally: self._spawning -= missing
+        for result in results:
+            if isinstance(result, Exception): logger.warning("Failed to spawn MCP server: %s", result)
+            elif self._closed: self._retire(result)
+            else: self._idle.append(result)
+
+    def _in_background(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _retire(self, server): self._in_background(server.stop())
+
+    def _worn_out(self, server):
+        if self.max_calls and server.calls >= self.max_calls: return "max_calls"
+        rss = server.rss_mb() if self.max_rss_mb else None
+        if rss is not None and rss > self.max_rss_mb: return f"rss {rss:.0f} MB"
+        return None
+
+    async def acquire(self):
+        """Lease a healthy server, spawning one on the spot only if none is idle."""
+        if self._closed: raise RuntimeError("Server pool is closed")
+        server = None
+        while self._idle and server is None:
+            candidate = self._idle.pop()
+            if await candidate.healthy(self.ping_timeout): server = candidate
+            else:
+                self.counters["restarted"] += 1
+                self._retire(candidate)
+        if server is None: server = await self._spawn()
+        self._leased.add(server)
+        self.counters["acquired"] += 1
+        self._in_background(self._refill())
+        return PooledMCPClient(self, server)
+
+    async def release(self, server):
+        self._leased.discard(server)
+        # Fresh dispatcher so the next lease doesn't inherit this one's notification handlers
+        await server.client.notifications.aclose()
+        server.client.notifications = NotificationDispatcher()
+        reason = "closed" if self._closed else ("crashed" if not server.alive() else self._worn_out(server))
+        if reason or len(self._idle) >= self.size:
+            if reason and reason != "closed":
+                logger.info("Recycling MCP server pid=%s (%s)", server.pid, reason)
+                self.counters["recycled"] += 1
+            self._retire(server)
+            await self._refill()
+        else:
+            self._idle.append(server)
+
+    async def _maintain(self):
+        while not self._closed:
+            await asyncio.sleep(self.check_interval)
+            for server in list(self._idle):
+                reason = "crashed" if not server.alive() else self._worn_out(server)
+                if reason:
+                    self._idle.remove(server)
+                    self.counters["restarted" if reason == "crashed" else "recycled"] += 1
+                    self._retire(server)
+            await self._refill()
+
+    async def close(self):
+        self._closed = True
+        if self._maintainer:
+            self._maintainer.cancel()
+            try: await self._maintainer
+            except asyncio.CancelledError: pass
+        for server in self._idle + list(self._leased): self._retire(server)
+        self._idle.clear()
+        self._leased.clear()
+        while self._background: await asyncio.gather(*self._background, return_exceptions=True)
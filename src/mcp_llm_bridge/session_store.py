@@ -0,0 +1,198 @@
+# src/mcp_llm_bridge/session_store.py
+import os
+import json
+import time
+import zlib
+import sqlite3
+from collections.abc import MutableSequence
+
+DEFAULT_SESSION_PATH = os.path.join("~", ".milady", "sessions.db")
+_COMPRESS_THRESHOLD = 512
+
+def _encode(message):
+    data = json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(data) > _COMPRESS_THRESHOLD: return b"z" + zlib.compress(data)
+    return b"j" + data
+
+def _decode(blob):
+    blob = bytes(blob)
+    data = zlib.decompress(blob[1:]) if blob[:1] == b"z" else blob[1:]
+    return json.loads(data)
+
+class SessionStore:
+    """Append-only conversation log in a single SQLite (WAL) file, one row per message."""
+
+    def __init__(self, path=None, max_bytes=2_000_000, max_age_days=30.0):
+        self.path = os.path.expanduser(path or os.environ.get("MILADY_SESSION_DB", DEFAULT_SESSION_PATH))
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        if os.path.dirname(self.path): os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path, isolation_level=None)
+        self.db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS messages (
+            session TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT, size INTEGER NOT NULL,
+            data BLOB NOT NULL, PRIMARY KEY (session, seq)) WITHOUT ROWID""")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS sessions (
+            name TEXT PRIMARY KEY, updated REAL NOT NULL, bytes INTEGER NOT NULL DEFAULT 0)""")
+
+    def open(self, name):
+        """Return the history for a session; messages are only read when first accessed."""
+        if self.max_age_days is not None: self.compact()
+        return SessionHistory(self, name)
+
+    def sessions(self):
+        return [row[0] for row in self.db.execute("SELECT name FROM sessions ORDER BY updated DESC")]
+
+    def delete(self, name):
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("DELETE FROM messages WHERE session = ?", (name,))
+            self.db.execute("DELETE FROM sessions WHERE name = ?", (name,))
+
+    def compact(self, max_age_days=None):
+        """Drop sessions idle for longer than max_age_days and give the space back to the filesystem."""
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        cutoff = time.time() - max_age_days * 86400
+        stale = [row[0] for row in self.db.execute("SELECT name FROM sessions WHERE updated < ?", (cutoff,))]
+        for name in stale: self.delete(name)
+        if stale:
+            self.db.execute("PRAGMA incremental_vacuum")
+            self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return stale
+
+    def close(self): self.db.close()
+
+class SessionHistory(MutableSequence):
+    """List-like message history backed by a SessionStore.
+
+    Appends are written straight to the log without reading it; the full history is
+    decoded lazily on first read. Once a session exceeds the store's max_bytes the oldest
+    turns are dropped, always cutting at a user message so tool results stay paired.
+    """
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        self._items = None
+        self._seqs = None
+        row = store.db.execute(
+            "SELECT COALESCE(MAX(seq), -1), COALESCE(SUM(size), 0) FROM messages WHERE session = ?", (name,)
+        ).fetchone()
+        self._next_seq, self.bytes = row[0] + 1, row[1]
+
+    def _load(self):
+        if self._items is None:
+            rows = self.store.db.execute(
+                "SELECT seq, data FROM messages WHERE session = ? ORDER BY seq", (self.name,)
+            ).fetchall()
+            self._seqs = [row[0] for row in rows]
+            self._items = [_decode(row[1]) for row in rows]
+        return self._items
+
+    def _touch(self):
+        self.store.db.execute(
+            "INSERT INTO sessions (name, updated, bytes) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET updated = excluded.updated, bytes = excluded.bytes",
+            (self.name, time.time(), self.bytes))
+
+    def _write(self, messages):
+        rows = []
+        for message in messages:
+            blob = _encode(message)
+            rows.append((self.name, self._next_seq, message.get("role") if isinstance(message, dict) else None,
+                         len(blob), blob))
+            if self._seqs is not None: self._seqs.append(self._next_seq)
+            self._next_seq += 1
+            self.bytes += len(blob)
+        with self.store.db:
+            self.store.db.execute("BEGIN")
+            self.store.db.executemany(
+                "INSERT INTO messages (session, seq, role, size, data) VALUES (?, ?, ?, ?, ?)", rows)
+            self._touch()
+
+    def append(self, message):
+        if self._items is not None: self._items.append(message)
+        self._write([message])
+        if self.store.max_bytes and self.bytes > self.store.max_bytes: self._trim()
+
+    def extend(self, messages):
+        messages = list(messages)
+        if self._items is not None: self._items.extend(messages)
+        self._write(messages)
+        if self.store.max_bytes and self.bytes > self.store.max_bytes: self._trim()
+
+    def _trim(self):
+        rows = self.store.db.execute(
+            "SELECT seq, role, size FROM messages WHERE session = ? ORDER BY seq", (self.name,)
+        ).fetchall()
+        # Trim to 3/4 of the cap so a busy session doesn't compact on every append
+        target, remaining, cut = self.store.max_bytes * 3 // 4, self.bytes, None
+        user_seqs = [seq for seq, role, _ in rows if role == "user"]
+        for seq, role, size in rows:
+            if remaining <= target: break
+            remaining -= size
+            cut = seq
+        if cut is None: return
+        # Start the kept history at the next user turn, but never drop the latest one
+        keep_from = next((seq for seq in user_seqs if seq > cut), None)
+        if keep_from is None: keep_from = user_seqs[-1] if user_seqs else cut + 1
+        if keep_from <= rows[0][0]: return
+        dropped = sum(size for seq, _, size in rows if seq < keep_from)
+        with self.store.db:
+            self.store.db.execute("BEGIN")
+            self.store.db.execute("DELETE FROM messages WHERE session = ? AND seq < ?", (self.name, keep_from))
+            self.bytes -= dropped
+            self._touch()
+        if self._items is not None:
+            count = sum(1 for seq in self._seqs if seq < keep_from)
+            del self._items[:count], self._seqs[:count]
+
+    def _rewrite(self):
+        items = self._items
+        with self.store.db:
+            self.store.db.execute("BEGIN")
+            self.store.db.execute("DELETE FROM messages WHERE session = ?", (self.name,))
+        self._items, self._seqs, self._next_seq, self.bytes = [], [], 0, 0
+        self.extend(items)
+
+    def __len__(self): return len(self._load())
+    def __iter__(self): return iter(self._load())
+    def __getitem__(self, index): return self._load()[index]
+
+    def __setitem__(self, index, value):
+        self._load()[index] = value
+        self._rewrite()
+
+    def __delitem__(self, index):
+        items = self._load()
+        start = index.start if isinstance(index, slice) else index
+        if isinstance(index, slice) and index.step in (None, 1) and index.stop is None and start is not None:
+            # Truncating the tail (e.g. rolling back a failed turn) only deletes those rows
+            start = len(items) + start if start < 0 else start
+            if start >= len(self._seqs): return
+            first_seq = self._seqs[start]
+            with self.store.db:
+                self.store.db.execute("BEGIN")
+                dropped = self.store.db.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM messages WHERE session = ? AND seq >= ?",
+                    (self.name, first_seq)).fetchone()[0]
+                self.store.db.execute("DELETE FROM messages WHERE session = ? AND seq >= ?", (self.name, first_seq))
+                self.bytes -= dropped
+                self._touch()
+            del items[start:], self._seqs[start:]
+            return
+        del items[index]
+        self._rewrite()
+
+    def insert(self, index, value):
+        self._load().insert(index, value)
+        self._rewrite()
+
+    def clear(self):
+        with self.store.db:
+            self.store.db.execute("BEGIN")
+            self.store.db.execute("DELETE FROM messages WHERE session = ?", (self.name,))
+        self._items, self._seqs, self.bytes = [], [], 0
+        self._touch()
@@ -0,0 +1,38 @@
+# src/mcp_llm_bridge/singleflight.py
+import json
+import asyncio
+
+def call_key(name, arguments):
+    """Tool name plus canonical JSON arguments, or None for unencodable arguments."""
+    try: return name, json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError): return None
+
+def is_idempotent(tool):
+    """Whether an MCP tool is annotated read-only or idempotent."""
+    annotations = getattr(tool, "annotations", None)
+    return getattr(annotations, "readOnlyHint", None) is True or getattr(annotations, "idempotentHint", None) is True
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one.
+
+    The first caller starts the call in its own task; callers arriving while it runs wait
+    for the same result (or exception). A waiter that is cancelled doesn't cancel the call
+    unless it was the last one waiting. saved_calls counts the calls that never went out.
+    """
+
+    def __init__(self):
+        self.calls = {}  # key -> [task, waiters]
+        self.saved_calls = 0
+
+    async def do(self, key, call):
+        entry = self.calls.get(key)
+        if entry: self.saved_calls += 1
+        else:
+            entry = self.calls[key] = [asyncio.ensure_future(call()), 0]
+            entry[0].add_done_callback(lambda _: self.calls.pop(key) if self.calls.get(key) is entry else None)
+        entry[1] += 1
+        try: return await asyncio.shield(entry[0])
+        except asyncio.CancelledError:
+            if entry[1] == 1 and not entry[0].done(): entry[0].cancel()
+            raise
+        finally: entry[1] -= 1
@@ -0,0 +1,95 @@
+# src/mcp_llm_bridge/usage.py
+import json
+from mcp_llm_bridge.llm_client import estimate_tokens, tool_call_parts
+
+PROMPT_PARTS = ("system", "tool_schemas", "tool_results", "history")
+
+def _tokens(value):
+    return estimate_tokens(value if isinstance(value, str) else json.dumps(value, default=str))
+
+def _tool_entry(per_tool, name): return per_tool.setdefault(name, {"schema": 0, "results": 0})
+
+def prompt_breakdown(messages, tools=None, prompt_tokens=None):
+    """Split a request's prompt tokens into PROMPT_PARTS, plus schema/result tokens per tool.
+
+    Shares are estimated from text length; when the server reported `prompt_tokens`
+    they are scaled to add up to it.
+    """
+    parts, per_tool, call_names = dict.fromkeys(PROMPT_PARTS, 0), {}, {}
+    for tool in tools or []:
+        tokens = _tokens(tool)
+        parts["tool_schemas"] += tokens
+        _tool_entry(per_tool, (tool.get("function") or {}).get("name", "?"))["schema"] += tokens
+    for message in messages or []:
+        if not isinstance(message, dict): continue
+        tokens = _tokens(message.get("content") or "")
+        for tool_call in message.get("tool_calls") or []:
+            call = tool_call_parts(tool_call)
+            if not call: continue
+            call_names[call[0]] = call[1]
+            tokens += estimate_tokens(call[1]) + _tokens(call[2] or "")
+        role = message.get("role")
+        if role == "system": parts["system"] += tokens
+        elif role == "tool":
+            parts["tool_results"] += tokens
+            _tool_entry(per_tool, call_names.get(message.get("tool_call_id"), "?"))["results"] += tokens
+        else: parts["history"] += tokens
+    estimated = sum(parts.values())
+    if prompt_tokens and estimated:
+        scale = prompt_tokens / estimated
+        parts = {name: round(tokens * scale) for name, tokens in parts.items()}
+        per_tool = {name: {key: round(tokens * scale) for key, tokens in entry.items()} for name, entry in per_tool.items()}
+    return {"prompt_parts": parts, "per_tool": per_tool}
+
+class UsageTotals:
+    """Token usage summed over LLM requests: a turn, a process_message call or a session."""
+
+    def __init__(self):
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.estimated = False  # True once any request's usage had to be estimated
+        self.prompt_parts = dict.fromkeys(PROMPT_PARTS, 0)
+        self.per_tool = {}
+
+    def add(self, response):
+        """Count one LLMResponse; returns its usage with the prompt breakdown, or None without usage."""
+        usage = getattr(response, "usage", None)
+        if not isinstance(usage, dict): return None
+        turn = dict(usage, requests=1, **prompt_breakdown(
+            getattr(response, "prompt", None), getattr(response, "request_tools", None), usage.get("prompt_tokens")))
+        self.merge(turn)
+        return turn
+
+    def merge(self, usage):
+        """Add a turn dict or another UsageTotals (or its as_dict())."""
+        if isinstance(usage, UsageTotals): usage = usage.as_dict()
+        self.requests += usage.get("requests", 1)
+        self.prompt_tokens += usage.get("prompt_tokens") or 0
+        self.completion_tokens += usage.get("completion_tokens") or 0
+        self.total_tokens += usage.get("total_tokens") or 0
+        self.estimated = self.estimated or bool(usage.get("estimated"))
+        for name, tokens in (usage.get("prompt_parts") or {}).items():
+            self.prompt_parts[name] = self.prompt_parts.get(name, 0) + tokens
+        for name, entry in (usage.get("per_tool") or {}).items():
+            totals = _tool_entry(self.per_tool, name)
+            for key, tokens in entry.items(): totals[key] = totals.get(key, 0) + tokens
+
+    def as_dict(self):
+        return {"requests": self.requests, "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens, "total_tokens": self.total_tokens,
+                "estimated": self.estimated, "prompt_parts": dict(self.prompt_parts),
+                "per_tool": {name: dict(entry) for name, entry in self.per_tool.items()}}
+
+def format_usage(usage, session=None, top=5):
+    """One-line summary of a usage dict, the costliest tools in context and the session total."""
+    parts = usage["prompt_parts"]
+    text = (f"tokens: prompt {usage['prompt_tokens']} (system {parts.get('system', 0)}, "
+            f"tool schemas {parts.get('tool_schemas', 0)}, tool results {parts.get('tool_results', 0)}, "
+            f"history {parts.get('history', 0)}) + completion {usage['completion_tokens']} "
+            f"= {usage['total_tokens']} over {usage['requests']} request(s)")
+    tools = sorted(usage["per_tool"].items(), key=lambda item: -sum(item[1].values()))[:top]
+    if tools: text += "; tools in context: " + ", ".join(f"{name} {sum(entry.values())}" for name, entry in tools)
+    if session and session.get("requests", 0) > usage["requests"]: text += f"; session {session['total_tokens']}"
+    return text + (" (estimated)" if usage["estimated"] else "")
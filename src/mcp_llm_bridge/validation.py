@@ -0,0 +1,169 @@
+# src/mcp_llm_bridge/validation.py
+import re
+import ast
+import json
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+_LITERALS = {"true": "True", "false": "False", "null": "None"}
+_TYPE_NAMES = {"string": "a string", "integer": "an integer", "number": "a number", "boolean": "a boolean",
+               "object": "an object", "array": "an array", "null": "null"}
+
+def _pythonize(text):
+    # Map JSON's bare true/false/null to Python literals, leaving quoted strings alone
+    out, i, quote = [], 0, None
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            out.append(ch)
+            if ch == "\\" and i + 1 < len(text): out.append(text[i + 1]); i += 1
+            elif ch == quote: quote = None
+        elif ch in "\"'":
+            quote = ch
+            out.append(ch)
+        elif ch.isalpha():
+            j = i
+            while j < len(text) and (text[j].isalnum() or text[j] == "_"): j += 1
+            word = text[i:j]
+            out.append(_LITERALS.get(word, word))
+            i = j
+            continue
+        else: out.append(ch)
+        i += 1
+    return "".join(out)
+
+def parse_arguments(text):
+    """Parse tool call arguments, repairing common small-model JSON mistakes.
+
+    Returns (value, repairs). Raises ValueError if the text can't be recovered.
+    """
+    if not text or not text.strip(): return {}, []
+    try: return json.loads(text), []
+    except json.JSONDecodeError as e: error = e
+    candidate = _FENCE.sub("", text.strip())
+    repairs = ["stripped code fence"] if candidate != text.strip() else []
+    try: return json.loads(candidate), repairs
+    except json.JSONDecodeError: pass
+    without_commas = _TRAILING_COMMA.sub(r"\1", candidate)
+    if without_commas != candidate:
+        try: return json.loads(without_commas), repairs + ["removed trailing commas"]
+        except json.JSONDecodeError: pass
+    try:
+        value = ast.literal_eval(_pythonize(without_commas))
+        if isinstance(value, (dict, list)): return value, repairs + ["converted single-quoted JSON"]
+    except (ValueError, SyntaxError, MemoryError, RecursionError): pass
+    raise ValueError(f"Could not parse arguments as JSON: {error.msg} at position {error.pos}")
+
+def _type_matches(value, expected):
+    if expected == "integer": return isinstance(value, int) and not isinstance(value, bool)
+    if expected == "number": return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if expected == "boolean": return isinstance(value, bool)
+    if expected == "string": return isinstance(value, str)
+    if expected == "object": return isinstance(value, dict)
+    if expected == "array": return isinstance(value, list)
+    if expected == "null": return value is None
+    return True
+
+def _coerce(value, expected):
+    # Cheap fixes for values of the wrong JSON type; returns the original value when nothing fits
+    if isinstance(value, str):
+        stripped = value.strip()
+        if expected == "integer" and re.fullmatch(r"[-+]?\d+", stripped): return int(stripped)
+        if expected == "number" and re.fullmatch(r"[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?", stripped):
+            number = float(stripped)
+            return int(number) if number.is_integer() and "." not in stripped else number
+        if expected == "boolean" and stripped.lower() in ("true", "false"): return stripped.lower() == "true"
+        if expected in ("object", "array") and stripped[:1] in "{[":
+            try:
+                parsed, _ = parse_arguments(stripped)
+                if _type_matches(parsed, expected): return parsed
+            except ValueError: pass
+    elif expected == "string" and isinstance(value, (int, float)) and not isinstance(value, bool): return str(value)
+    elif expected == "array" and value is not None and not isinstance(value, (list, dict)): return [value]
+    return value
+
+def _join(path, name): return f"{path}.{name}" if path else str(name)
+
+def _compile(schema):
+    if not isinstance(schema, dict): return lambda value, path, problems, repairs: value
+    types = schema.get("type")
+    types = [types] if isinstance(types, str) else list(types or [])
+    enum = schema.get("enum")
+    properties = {name: _compile(sub) for name, sub in (schema.get("properties") or {}).items()
+                  if isinstance(sub, dict)}
+    defaults = {name: sub["default"] for name, sub in (schema.get("properties") or {}).items()
+                if isinstance(sub, dict) and "default" in sub}
+    required = [name for name in schema.get("required") or [] if isinstance(name, str)]
+    closed = schema.get("additionalProperties") is False
+    items = _compile(schema["items"]) if isinstance(schema.get("items"), dict) else None
+
+    def validate(value, path, problems, repairs):
+        if types and not any(_type_matches(value, expected) for expected in types):
+            for expected in types:
+                coerced = _coerce(value, expected)
+                if _type_matches(coerced, expected):
+                    repairs.append(f"converted {path or 'arguments'} to {expected}")
+                    value = coerced
+                    break
+            else:
+                expected = " or ".join(_TYPE_NAMES.get(t, t) for t in types)
+                problems.append(f"Invalid type for {path or 'arguments'}: expected {expected}, got {type(value).__name__}")
+                return value
+        if enum is not None and value not in enum:
+            problems.append(f"Invalid value for {path or 'arguments'}: must be one of {json.dumps(enum)}")
+        if isinstance(value, dict) and (properties or required or closed or defaults):
+            value = dict(value)
+            for name in list(value):
+                if value[name] is None and name not in required and name in properties:
+                    del value[name]
+                    repairs.append(f"dropped null optional field {_join(path, name)}")
+                elif closed and name not in properties:
+                    del value[name]
+                    repairs.append(f"dropped unknown field {_join(path, name)}")
+            for name, default in defaults.items():
+                if name not in value:
+                    value[name] = default
+                    repairs.append(f"filled default for {_join(path, name)}")
+            for name in required:
+                if name not in value: problems.append(f"Missing required parameter: {_join(path, name)}")
+            for name, check in properties.items():
+                if name in value: value[name] = check(value[name], _join(path, name), problems, repairs)
+        if isinstance(value, list) and items:
+            value = [items(item, _join(path, index), problems, repairs) for index, item in enumerate(value)]
+        return value
+
+    return validate
+
+class ToolArgumentValidator:
+    """Validator for one tool, compiled once from its inputSchema."""
+
+    def __init__(self, schema):
+        self.schema = schema if isinstance(schema, dict) else {}
+        self._validate = _compile(self.schema)
+
+    def validate(self, arguments):
+        """Return (repaired arguments, problems, repairs)."""
+        problems, repairs = [], []
+        value = self._validate(arguments, "", problems, repairs)
+        return value, problems, repairs
+
+    def describe(self):
+        properties = self.schema.get("properties") or {}
+        return {
+            "required": self.schema.get("required") or [],
+            "properties": {name: sub.get("type", "any") for name, sub in properties.items() if isinstance(sub, dict)},
+        }
+
+_cache = {}
+
+def compile_validator(schema):
+    """Compile (or fetch from cache) the validator for a JSON schema."""
+    try: key = json.dumps(schema, sort_keys=True)
+    except (TypeError, ValueError): return None
+    if key not in _cache: _cache[key] = ToolArgumentValidator(schema)
+    return _cache[key]
+
+def format_validation_error(tool_name, problems, validator=None):
+    details = {"error": "invalid_arguments", "tool": tool_name, "problems": problems}
+    if validator: details["expected"] = validator.describe()
+    return f"Error: {'; '.join(problems)}\n{json.dumps(details)}"
@@ -0,0 +1,40 @@
+# tests/standin_server.py
+"""Minimal MCP server used by tests that need a real server process.
+
+    python standin_server.py                       # stdio
+    python standin_server.py streamable-http 8765  # HTTP, endpoint at /mcp
+    python standin_server.py sse 8765              # SSE only, endpoint at /sse
+"""
+import os
+import sys
+import asyncio
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("standin", port=int(sys.argv[2]) if len(sys.argv) > 2 else 8000, log_level="WARNING")
+
+@server.tool()
+def echo(text: str) -> str:
+    """Return the text unchanged."""
+    return text
+
+@server.tool()
+def whoami() -> str:
+    """Return this server's process id."""
+    return str(os.getpid())
+
+@server.tool()
+async def wait(seconds: float, marker: str = "") -> str:
+    """Sleep for `seconds`; writes "started" and then "done" or "cancelled" to `marker` if given."""
+    def note(text):
+        if marker:
+            with open(marker, "w") as f: f.write(text)
+    note("started")
+    try: await asyncio.sleep(seconds)
+    except asyncio.CancelledError:
+        note("cancelled")
+        raise
+    note("done")
+    return "done"
+
+if __name__ == "__main__":
+    server.run(sys.argv[1] if len(sys.argv) > 1 else "stdio")
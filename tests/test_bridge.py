@@ -938,4 +938,1441 @@ async def test_streaming_mode(mock_config, all_mock_tools):
         # Verify stream handler was passed
         mock_llm_instance.invoke_with_prompt.assert_called_once()
         assert mock_llm_instance.invoke_with_prompt.call_args[0][1] is True  # stream=True
-        assert mock_llm_instance.invoke_with_prompt.call_args[0][2] is not None  # stream_handler is not None
\ No newline at end of file
+        assert mock_llm_instance.invoke_with_prompt.call_args[0][2] is not None  # stream_handler is not None
+@pytest.mark.asyncio
+async def test_tool_loop_budget_forces_final_answer(mock_config):
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient, \
+         patch('mcp_llm_bridge.bridge.LLMClient') as MockLLMClient, \
+         patch('mcp_llm_bridge.logging_config.notify_tool_call') as mock_notify:
+        
+        # Setup mocks: the model keeps asking for the same template
+        mock_mcp_instance = AsyncMock()
+        mock_mcp_instance.call_tool.return_value = "Template content"
+        
+        view_tool_call = MagicMock()
+        view_tool_call.id = "call_view"
+        view_tool_call.function = MagicMock()
+        view_tool_call.function.name = "view_template"
+        view_tool_call.function.arguments = '{"template_name": "example.yaml"}'
+        
+        looping_response = MagicMock()
+        looping_response.is_tool_call = True
+        looping_response.tool_calls = [view_tool_call]
+        looping_response.content = ""
+        
+        final_response = MagicMock()
+        final_response.is_tool_call = False
+        final_response.content = "Forced final answer"
+        
+        mock_llm_instance = AsyncMock()
+        mock_llm_instance.invoke_with_prompt.return_value = looping_response
+        mock_llm_instance.invoke.side_effect = [looping_response, looping_response, final_response]
+        
+        MockMCPClient.return_value = mock_mcp_instance
+        MockLLMClient.return_value = mock_llm_instance
+        
+        # Create bridge with a tight repeat limit
+        mock_config.budget.max_repeated_calls = 2
+        bridge = MCPLLMBridge(mock_config)
+        bridge.tool_name_mapping = {"view_template": "view_template"}
+        
+        response = await bridge.process_message("Loop forever")
+        
+        # Verify the third identical call was refused and tools were disabled
+        assert response == "Forced final answer"
+        assert mock_mcp_instance.call_tool.call_count == 2
+        last_call = mock_llm_instance.invoke.call_args
+        assert last_call.kwargs["use_tools"] is False
+        assert "budget exhausted" in last_call.args[0][0]["output"]
+        mock_notify.assert_any_call("budget exhausted: max_repeated_calls")
+
+def test_session_store_resume_and_size_cap(tmp_path):
+    from mcp_llm_bridge.session_store import SessionStore
+    
+    db_path = str(tmp_path / "sessions.db")
+    store = SessionStore(db_path, max_bytes=4000)
+    history = store.open("work")
+    history.append({"role": "user", "content": "show the build template"})
+    history.append({"role": "assistant", "content": "", "tool_calls": [
+        {"id": "call_view", "type": "function", "function": {"name": "view_template", "arguments": "{}"}}
+    ]})
+    history.append({"role": "tool", "content": "pipeline { }", "tool_call_id": "call_view"})
+    store.close()
+    
+    # Resuming does not decode anything until the history is read
+    store = SessionStore(db_path, max_bytes=4000)
+    history = store.open("work")
+    assert history._items is None
+    assert len(history) == 3
+    assert history[2]["tool_call_id"] == "call_view"
+    
+    # Exceeding the cap drops whole turns from the front, cutting at a user message
+    for i in range(20):
+        history.append({"role": "user", "content": f"question {i} " + "x" * 300})
+        history.append({"role": "assistant", "content": f"answer {i}"})
+    assert history.bytes <= 4000
+    assert history[0]["role"] == "user"
+    assert history[-1]["content"] == "answer 19"
+    
+    # Rolling back the tail only removes those messages
+    del history[len(history) - 1:]
+    assert SessionStore(db_path).open("work")[-1]["content"].startswith("question 19")
+    
+    # Idle sessions are compacted away
+    assert store.compact(max_age_days=-1) == ["work"]
+    assert len(store.open("work")) == 0
+
+@pytest.mark.asyncio
+async def test_process_message_events(mock_config):
+    from mcp_llm_bridge.events import (
+        TokenEvent, ToolCallStartEvent, ToolCallEndEvent, FinalAnswerEvent
+    )
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient, \
+         patch('mcp_llm_bridge.bridge.LLMClient') as MockLLMClient:
+        
+        # Setup mocks: one tool call, then a streamed final answer
+        mock_mcp_instance = AsyncMock()
+        mock_mcp_instance.call_tool.return_value = "Hello from MiladyOS!"
+        
+        hello_tool_call = MagicMock()
+        hello_tool_call.id = "call_hello"
+        hello_tool_call.function = MagicMock()
+        hello_tool_call.function.name = "hello_world"
+        hello_tool_call.function.arguments = '{}'
+        
+        first_response = MagicMock()
+        first_response.is_tool_call = True
+        first_response.tool_calls = [hello_tool_call]
+        first_response.content = ""
+        
+        final_response = MagicMock()
+        final_response.is_tool_call = False
+        final_response.content = "Hi!"
+        
+        async def invoke(tool_results, stream, stream_handler, **kwargs):
+            for token in ["H", "i", "!"]: await stream_handler(token)
+            return final_response
+        
+        mock_llm_instance = AsyncMock()
+        mock_llm_instance.invoke_with_prompt.return_value = first_response
+        mock_llm_instance.invoke.side_effect = invoke
+        
+        MockMCPClient.return_value = mock_mcp_instance
+        MockLLMClient.return_value = mock_llm_instance
+        
+        bridge = MCPLLMBridge(mock_config)
+        bridge.tool_name_mapping = {"hello_world": "hello_world"}
+        
+        # A queue of one forces the producer to wait on the consumer
+        events = [event async for event in bridge.process_message_events("Say hi", maxsize=1)]
+        
+        assert [type(event) for event in events] == [
+            ToolCallStartEvent, ToolCallEndEvent, TokenEvent, TokenEvent, TokenEvent, FinalAnswerEvent
+        ]
+        assert events[1].tool_name == "hello_world" and events[1].duration >= 0
+        assert "".join(event.text for event in events[2:5]) == "Hi!"
+        assert events[-1].content == "Hi!"
+        
+        # Errors outside the tool loop, like a locked cache database, reach the consumer
+        import sqlite3
+        mock_llm_instance.messages = []
+        bridge.prompt_cache = MagicMock()
+        bridge.prompt_cache.lookup.side_effect = sqlite3.OperationalError("database is locked")
+        with pytest.raises(sqlite3.OperationalError):
+            async for event in bridge.process_message_events("Say hi again"): pass
+
+@pytest.mark.asyncio
+async def test_conversations_share_bridge_but_not_history(mock_config):
+    import asyncio
+    from types import SimpleNamespace
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        MockMCPClient.return_value = AsyncMock()
+        bridge = MCPLLMBridge(mock_config)
+        
+        # Fake completions endpoint that answers with the latest user message
+        async def create(**kwargs):
+            await asyncio.sleep(0.01)
+            prompt = [m for m in kwargs["messages"] if m["role"] == "user"][-1]["content"]
+            message = SimpleNamespace(content=f"echo: {prompt}", tool_calls=None)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+        bridge.llm_client.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+        
+        first, second = bridge.conversation(), bridge.conversation()
+        answers = await asyncio.gather(
+            first.process_message("one", stream=False),
+            second.process_message("two", stream=False),
+        )
+        
+        assert answers == ["echo: one", "echo: two"]
+        assert [m["content"] for m in first.messages] == ["one", "echo: one"]
+        assert [m["content"] for m in second.messages] == ["two", "echo: two"]
+        assert bridge.llm_client.messages == []
+        assert first.llm_client.client is second.llm_client.client is bridge.llm_client.client
+
+@pytest.mark.asyncio
+async def test_tool_progress_reaches_only_the_calling_conversation(mock_config):
+    import asyncio
+    from types import SimpleNamespace
+    from mcp_llm_bridge.events import MCPNotificationEvent
+    from mcp_llm_bridge.mcp_client import progress_token, call_cancellable
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        mock_mcp = AsyncMock()
+        MockMCPClient.return_value = mock_mcp
+        bridge = MCPLLMBridge(mock_config)
+        bridge.tool_name_mapping = {"run_pipeline": "run_pipeline"}
+        arrived, both_calling, both_reported = [], asyncio.Event(), asyncio.Event()
+        
+        # The server reports progress against the token its call was sent with, while both calls run
+        async def run_pipeline(name, arguments):
+            arrived.append(name)
+            if len(arrived) == 2: both_calling.set()
+            await both_calling.wait()
+            await bridge._on_progress_notification({"progressToken": progress_token.get(), "content": arguments["name"]})
+            await bridge._on_progress_notification({"content": "untagged"})
+            arrived.append(name)
+            if len(arrived) == 4: both_reported.set()
+            await both_reported.wait()
+            return arguments["name"]
+        mock_mcp.call_tool.side_effect = run_pipeline
+        
+        received = {"a": [], "b": []}
+        async def call(name):
+            async def sink(event):
+                if isinstance(event, MCPNotificationEvent): received[name].append(event.params["content"])
+            tool_call = {"id": f"call_{name}", "function": {"name": "run_pipeline", "arguments": f'{{"name": "{name}"}}'}}
+            return await bridge._handle_tool_calls([tool_call], sink)
+        
+        with patch('mcp_llm_bridge.bridge.dispatch_event', AsyncMock()) as global_callbacks:
+            await asyncio.gather(call("a"), call("b"))
+        # Untagged progress can't be attributed while two conversations are calling
+        assert received == {"a": ["a"], "b": ["b"]} and global_callbacks.await_count == 2
+        assert bridge._progress_sinks == {} and bridge._calling_sinks == {}
+        
+        # Late progress for a's finished call (e.g. held back by coalescing) isn't given to b, the only caller now
+        async def late_progress(name, arguments):
+            await bridge._on_progress_notification({"progressToken": "milady-1", "content": "late a"})  # a's call went first
+            return arguments["name"]
+        mock_mcp.call_tool.side_effect = late_progress
+        with patch('mcp_llm_bridge.bridge.dispatch_event', AsyncMock()) as global_callbacks:
+            await call("b")
+        assert received["b"] == ["b"] and global_callbacks.await_args.args[0].params["content"] == "late a"
+    
+    # The token goes out as the request's _meta.progressToken
+    calls = []
+    async def call_tool(name, arguments=None, meta=None): calls.append(meta)
+    context = progress_token.set("milady-7")
+    try: await call_cancellable(SimpleNamespace(call_tool=call_tool), "run_pipeline", {})
+    finally: progress_token.reset(context)
+    assert calls == [{"progressToken": "milady-7"}]
+
+def test_think_splitter_handles_tags_split_across_chunks():
+    from mcp_llm_bridge.reasoning import ThinkSplitter, split_reasoning
+    
+    splitter = ThinkSplitter()
+    pieces = []
+    for chunk in ["<th", "ink>plan the", " call</", "thi", "nk>\n\nThe answer <", "b>"]:
+        pieces.extend(splitter.feed(chunk))
+    pieces.extend(splitter.flush())
+    
+    assert "".join(text for is_reasoning, text in pieces if is_reasoning) == "plan the call"
+    assert "".join(text for is_reasoning, text in pieces if not is_reasoning) == "\n\nThe answer <b>"
+    
+    # Templates that put the opening tag in the prompt leave only the closing tag
+    assert split_reasoning("hmm</think>\nDone") == ("hmm", "Done")
+    assert split_reasoning("No reasoning") == ("", "No reasoning")
+
+@pytest.mark.asyncio
+async def test_streamed_reasoning_is_routed_and_not_stored(mock_config):
+    from types import SimpleNamespace
+    from mcp_llm_bridge.llm_client import LLMClient
+    
+    def chunk(content, finish_reason=None):
+        delta = SimpleNamespace(content=content, tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+    
+    async def create(**kwargs):
+        async def stream():
+            for part in ["<think>Let me", " think</th", "ink>Hello", None]:
+                yield chunk(part, "stop" if part is None else None)
+        return stream()
+    
+    llm_client = LLMClient(mock_config.llm_config)
+    llm_client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    answer, reasoning = [], []
+    
+    response = await llm_client.invoke_with_prompt(
+        "Hi", True, answer.append, reasoning_handler=reasoning.append)
+    
+    assert "".join(answer) == "Hello"
+    assert "".join(reasoning) == "Let me think"
+    assert response.content == "Hello"
+    assert llm_client.messages[-1] == {"role": "assistant", "content": "Hello"}
+
+@pytest.mark.asyncio
+async def test_long_tool_output_is_condensed_and_fetchable(mock_config):
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        
+        # Setup mocks: a noisy build log with one real error in the middle
+        log_lines = [f"2024-05-01T10:00:{i % 60:02d}Z \x1b[32mStep {i}/500\x1b[0m compiling module" for i in range(250)]
+        log_lines += ["npm ERR! missing script: build"]
+        log_lines += ["Downloading dependencies..."] * 200
+        log_lines += [f"Step {i}/500 compiling module" for i in range(250, 500)]
+        build_log = "\n".join(log_lines)
+        
+        mock_mcp_instance = AsyncMock()
+        mock_mcp_instance.call_tool.return_value = build_log
+        MockMCPClient.return_value = mock_mcp_instance
+        
+        tool_call = MagicMock()
+        tool_call.id = "call_exec"
+        tool_call.function = MagicMock()
+        tool_call.function.name = "execute_command"
+        tool_call.function.arguments = '{"command": "npm run build"}'
+        
+        bridge = MCPLLMBridge(mock_config)
+        bridge.tool_name_mapping = {"execute_command": "execute_command"}
+        
+        tool_responses = await bridge._handle_tool_calls([tool_call])
+        output = tool_responses[0]["output"]
+        
+        # Verify the log was condensed but the error survived
+        assert len(output) < len(build_log) / 5
+        assert "npm ERR! missing script: build" in output
+        assert "\x1b[" not in output and "2024-05-01T" not in output
+        assert "fetch_tool_output" in output
+        
+        # The full original can be paged back on demand
+        fetch_call = {"id": "call_fetch", "function": {
+            "name": "fetch_tool_output",
+            "arguments": '{"tool_call_id": "call_exec", "offset": 250, "limit": 1}'
+        }}
+        fetched = await bridge._handle_tool_calls([fetch_call])
+        assert fetched[0]["output"].startswith("npm ERR! missing script: build")
+        assert mock_mcp_instance.call_tool.call_count == 1
+        
+        # Tools without a policy, like templates, are passed through verbatim by default
+        template = "\n".join(f"stage('Step {i}') {{ sh 'make step-{i}' }}" for i in range(400))
+        mock_mcp_instance.call_tool.return_value = template
+        tool_call.id, tool_call.function.name = "call_view", "view_template"
+        bridge.tool_name_mapping["view_template"] = "view_template"
+        assert (await bridge._handle_tool_calls([tool_call]))[0]["output"] == template
+
+@pytest.mark.asyncio
+async def test_bridge_manager_starts_steps_concurrently(mock_config):
+    import asyncio, io
+    with patch('mcp_llm_bridge.bridge.MCPLLMBridge') as MockBridge, \
+         patch('sys.stdin', io.StringIO("piped template\n")):
+        
+        # Setup mock: each startup step takes 0.2s on its own
+        async def slow_step(): await asyncio.sleep(0.2)
+        mock_bridge_instance = MagicMock()
+        mock_bridge_instance.initialize = slow_step
+        mock_bridge_instance.llm_client.prewarm = slow_step
+        mock_bridge_instance.llm_client.preload = slow_step
+        mock_bridge_instance.timings = {"mcp_connect": 0.1}
+        mock_bridge_instance.close = AsyncMock()
+        MockBridge.return_value = mock_bridge_instance
+        
+        mock_config.llm_config.preload = True
+        bridge_manager = BridgeManager(mock_config, read_stdin=True)
+        async with bridge_manager as bridge:
+            assert bridge is mock_bridge_instance
+        
+        # Verify the steps overlapped and were all timed
+        assert bridge_manager.stdin_data == "piped template"
+        assert bridge_manager.timings["total"] < 0.5
+        for step in ["initialize", "llm_prewarm", "model_preload", "stdin", "mcp_connect"]:
+            assert step in bridge_manager.timings
+        assert bridge_manager.critical_path in ["initialize", "llm_prewarm", "model_preload"]
+
+@pytest.mark.asyncio
+async def test_bridge_manager_enters_and_exits_a_real_server():
+    import sys
+    pytest.importorskip("mcp.server.fastmcp")
+    
+    params = StdioServerParameters(command=sys.executable, args=[os.path.join(os.path.dirname(__file__), "standin_server.py")])
+    config = BridgeConfig(mcp_server_params=params, llm_config=LLMConfig(api_key="test", model="test", base_url="http://127.0.0.1:9/v1"))
+    # The transport is entered and exited by the same task, so leaving the context doesn't raise
+    async with BridgeManager(config) as bridge:
+        assert "echo" in bridge.tool_name_mapping
+        assert (await bridge.mcp_client.call_tool("echo", {"text": "hi"})).content[0].text == "hi"
+    assert bridge.mcp_client.session is None
+
+@pytest.mark.asyncio
+async def test_binary_tool_content_is_spilled_to_files(mock_config, tmp_path):
+    import base64
+    from mcp.types import CallToolResult, TextContent, ImageContent, EmbeddedResource, BlobResourceContents
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        
+        # Setup mocks: a screenshot plus a binary artifact alongside some text
+        png_bytes = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 400
+        artifact = bytes(100_000)
+        mock_mcp_instance = AsyncMock()
+        mock_mcp_instance.call_tool.return_value = CallToolResult(content=[
+            TextContent(type="text", text="Build finished."),
+            ImageContent(type="image", data=base64.b64encode(png_bytes).decode(), mimeType="image/png"),
+            EmbeddedResource(type="resource", resource=BlobResourceContents(
+                uri="file:///dist/app.tar", mimeType="application/x-tar",
+                blob=base64.b64encode(artifact).decode())),
+        ])
+        MockMCPClient.return_value = mock_mcp_instance
+        
+        tool_call = MagicMock()
+        tool_call.id = "call_run"
+        tool_call.function = MagicMock()
+        tool_call.function.name = "run_pipeline"
+        tool_call.function.arguments = '{"pipeline_id": "build"}'
+        
+        mock_config.content_policy.spill_dir = str(tmp_path)
+        bridge = MCPLLMBridge(mock_config)
+        bridge.tool_name_mapping = {"run_pipeline": "run_pipeline"}
+        
+        tool_responses = await bridge._handle_tool_calls([tool_call])
+        output = tool_responses[0]["output"]
+        
+        # Verify the LLM only sees short descriptors and the payloads landed on disk intact
+        assert output.startswith("Build finished.")
+        assert len(output) < 500
+        assert "image image/png" in output and "resource application/x-tar file:///dist/app.tar" in output
+        saved = sorted(tmp_path.iterdir(), key=lambda path: path.suffix)
+        assert [path.suffix for path in saved] == [".png", ".tar"]
+        assert saved[0].read_bytes() == png_bytes
+        assert saved[1].read_bytes() == artifact
+    
+    # Spilled files past the age or total size cap are pruned, oldest first
+    import time
+    from mcp_llm_bridge.content import prune_spill_dir
+    day_old = time.time() - 2 * 86_400
+    os.utime(saved[1], (day_old, day_old))
+    newer = tmp_path / "newer.bin"
+    newer.write_bytes(bytes(1000))
+    assert prune_spill_dir(str(tmp_path), max_age_seconds=86_400) == 1 and not saved[1].exists()
+    os.utime(saved[0], (day_old + 10, day_old + 10))
+    assert prune_spill_dir(str(tmp_path), max_bytes=len(png_bytes)) == 1
+    assert [path.name for path in tmp_path.iterdir()] == ["newer.bin"]
+
+@pytest.mark.asyncio
+async def test_mcp_notifications_dispatched_once_and_coalesced():
+    import asyncio
+    from mcp_llm_bridge.mcp_client import MCPClient
+    from mcp_llm_bridge import logging_config
+    
+    client = MCPClient(StdioServerParameters(command="uvx", args=["mcp-server"]))
+    received = []
+    client.register_notification_handler("notifications/progress", received.append)
+    
+    with patch.object(logging_config, 'notify_mcp_notification') as mock_global:
+        # A burst of thinking tokens for one tool call, plus a progress update for another
+        for token in ["Look", "ing ", "at ", "logs"]:
+            await client._notification_callback({"jsonrpc": "2.0", "method": "notifications/progress", "params": {
+                "progressToken": "run-1", "contentType": "thinking", "content": token}})
+        for progress in [10, 50, 90]:
+            await client._notification_callback({"jsonrpc": "2.0", "method": "notifications/progress", "params": {
+                "progressToken": "run-2", "progress": progress, "total": 100}})
+        await asyncio.sleep(0.1)
+        
+        # Verify one coalesced dispatch per token and no direct global dispatch
+        assert received == [
+            {"progressToken": "run-1", "contentType": "thinking", "content": "Looking at logs"},
+            {"progressToken": "run-2", "progress": 90, "total": 100},
+        ]
+        mock_global.assert_not_called()
+        assert client.notifications.counters["coalesced"] == 5
+    
+    # When the handler falls behind, the oldest pending notifications are dropped
+    client.notifications.max_pending = 2
+    for request_id in range(5):
+        client.notifications.submit("notifications/progress", {"requestId": request_id})
+    await asyncio.sleep(0.1)
+    assert [params["requestId"] for params in received[2:]] == [3, 4]
+    assert client.notifications.counters["dropped"] == 3
+    await client.notifications.aclose()
+
+@pytest.mark.asyncio
+async def test_tool_arguments_validated_and_repaired_locally(mock_config, mock_list_pipeline_runs_tool):
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        
+        # Setup mocks
+        mock_mcp_instance = AsyncMock()
+        mock_mcp_instance.call_tool.return_value = "runs"
+        MockMCPClient.return_value = mock_mcp_instance
+        
+        mock_list_pipeline_runs_tool.inputSchema["properties"]["status"] = {
+            "type": "string", "enum": ["success", "failure"], "default": "failure"
+        }
+        bridge = MCPLLMBridge(mock_config)
+        bridge._convert_mcp_tools_to_openai_format([mock_list_pipeline_runs_tool])
+        
+        def tool_call(call_id, arguments):
+            return {"id": call_id, "function": {"name": "list_pipeline_runs", "arguments": arguments}}
+        
+        # Single quotes, a trailing comma and a string-encoded number are all fixed up
+        tool_responses = await bridge._handle_tool_calls([
+            tool_call("call_1", "{'pipeline_id': 'data-etl', 'limit': '5',}")
+        ])
+        assert tool_responses[0]["output"] == "runs"
+        mock_mcp_instance.call_tool.assert_called_once_with(
+            "list_pipeline_runs", {"pipeline_id": "data-etl", "limit": 5, "status": "failure"}
+        )
+        
+        # Calls that can't be repaired never reach the server
+        tool_responses = await bridge._handle_tool_calls([
+            tool_call("call_2", '{"limit": "five", "status": "running"}')
+        ])
+        output = tool_responses[0]["output"]
+        assert output.startswith("Error: ")
+        details = json.loads(output.split("\n", 1)[1])
+        assert details["error"] == "invalid_arguments"
+        assert "Missing required parameter: pipeline_id" in details["problems"]
+        assert any("limit" in problem and "integer" in problem for problem in details["problems"])
+        assert any("status" in problem for problem in details["problems"])
+        assert details["expected"]["required"] == ["pipeline_id"]
+        assert mock_mcp_instance.call_tool.call_count == 1
+
+@pytest.mark.asyncio
+async def test_stdio_server_pool_recycles_and_restarts_servers():
+    import sys
+    import signal
+    import asyncio
+    pytest.importorskip("mcp.server.fastmcp")
+    from mcp_llm_bridge.server_pool import StdioServerPool
+    
+    params = StdioServerParameters(command=sys.executable, args=[os.path.join(os.path.dirname(__file__), "standin_server.py")])
+    async with StdioServerPool(params, size=1, max_calls=2, check_interval=None) as pool:
+        # The lease is connected and its tool list cached already
+        lease = await pool.acquire()
+        tools = await lease.get_available_tools()
+        assert {tool.name for tool in tools.tools} == {"echo", "whoami", "wait"}
+        first_pid = (await lease.call_tool("whoami", {})).content[0].text
+        assert first_pid == str(lease.pid)
+        
+        # A bridge uses the lease instead of spawning its own server
+        bridge = MCPLLMBridge(BridgeConfig(mcp_server_params=params, llm_config=LLMConfig(
+            api_key="test", model="test", base_url=None)), lease)
+        await bridge._connect_and_discover()
+        assert "whoami" in bridge.tool_name_mapping
+        await lease.call_tool("echo", {"text": "hi"})
+        await bridge.close()
+        
+        # Two calls hit max_calls, so the next lease gets a fresh process
+        lease = await pool.acquire()
+        second_pid = (await lease.call_tool("whoami", {})).content[0].text
+        assert second_pid != first_pid
+        await lease.release()
+        assert pool.counters["recycled"] == 1
+        
+        # A crashed idle server is detected and replaced on acquire
+        await asyncio.sleep(0.1)
+        idle_pid = pool._idle[0].pid
+        os.kill(idle_pid, signal.SIGKILL)
+        await asyncio.sleep(0.2)
+        lease = await pool.acquire()
+        assert (await lease.call_tool("whoami", {})).content[0].text not in (first_pid, second_pid, str(idle_pid))
+        assert pool.counters["restarted"] == 1
+        await lease.release()
+
+@pytest.mark.asyncio
+async def test_streamable_http_transport_with_sse_fallback():
+    import sys
+    import socket
+    import asyncio
+    import subprocess
+    pytest.importorskip("mcp.server.fastmcp")
+    from mcp_llm_bridge import mcp_client
+    from mcp_llm_bridge.mcp_client import MCPClient
+    from mcp_llm_bridge.config import StreamableHTTPServerParameters
+    if mcp_client.streamable_http_client is None: pytest.skip("mcp without streamable HTTP")
+    
+    async def start_server(transport):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        process = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), "standin_server.py"),
+                                    transport, str(port)], stderr=subprocess.DEVNULL)
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError: await asyncio.sleep(0.1)
+        return process, f"http://127.0.0.1:{port}/mcp"
+    
+    # Two clients against a streamable HTTP server share one keep-alive HTTP client
+    process, url = await start_server("streamable-http")
+    try:
+        params = StreamableHTTPServerParameters(url=url)
+        async with MCPClient(params) as first, MCPClient(params) as second:
+            assert first.transport == second.transport == "streamable-http"
+            assert len(mcp_client._http_clients) == 1
+            results = await asyncio.gather(*(client.call_tool("echo", {"text": "hi"}) for client in (first, second)))
+            assert [result.content[0].text for result in results] == ["hi", "hi"]
+        assert mcp_client._http_clients == {}
+    finally: process.terminate()
+    
+    # A server that only offers SSE is reached through the derived /sse endpoint
+    process, url = await start_server("sse")
+    try:
+        async with MCPClient(StreamableHTTPServerParameters(url=url)) as client:
+            assert client.transport == "sse"
+            assert (await client.call_tool("echo", {"text": "hello"})).content[0].text == "hello"
+    finally: process.terminate()
+
+@pytest.mark.asyncio
+async def test_bridge_aggregates_multiple_mcp_servers():
+    import sys
+    import time
+    import asyncio
+    from types import SimpleNamespace
+    pytest.importorskip("mcp.server.fastmcp")
+    
+    class SlowServer:
+        # Stands in for a remote server that is slow to connect and to answer
+        def __init__(self): self.calls = []
+        async def connect(self): await asyncio.sleep(0.5)
+        async def __aexit__(self, *exc): pass
+        def register_notification_handler(self, method, handler): pass
+        async def get_available_tools(self):
+            return [SimpleNamespace(name=name, description=name, inputSchema={"type": "object"}) for name in ["echo", "deploy"]]
+        async def call_tool(self, name, arguments):
+            self.calls.append(name)
+            await asyncio.sleep(0.5)
+            return f"slow {name}"
+    
+    slow = SlowServer()
+    standin = StdioServerParameters(command=sys.executable, args=[os.path.join(os.path.dirname(__file__), "standin_server.py")])
+    config = BridgeConfig(mcp_server_params={"local": standin, "pipelines": slow},
+                          llm_config=LLMConfig(api_key="test", model="test", base_url=None))
+    bridge = MCPLLMBridge(config)
+    await bridge._connect_and_discover()
+    # Connected concurrently: total connect time is the slowest server's, not the sum
+    assert bridge.timings["mcp_connect"] < max(bridge.timings["mcp_connect:local"], bridge.timings["mcp_connect:pipelines"]) + 0.2
+    try:
+        # The colliding name is namespaced per server, unique names are kept
+        assert set(bridge.tool_name_mapping) >= {"local__echo", "pipelines__echo", "whoami", "deploy"}
+        
+        # Calls are routed to the owning server and a slow server doesn't hold up the other
+        slow_call = asyncio.ensure_future(bridge.mcp_client.call_tool("deploy", {}))
+        started = time.monotonic()
+        result = await bridge.mcp_client.call_tool("local__echo", {"text": "hi"})
+        assert result.content[0].text == "hi" and time.monotonic() - started < 0.4
+        assert await slow_call == "slow deploy"
+        assert await bridge.mcp_client.call_tool("pipelines__echo", {}) == "slow echo"
+        assert slow.calls == ["deploy", "echo"]
+    finally: await bridge.close()
+
+@pytest.mark.asyncio
+async def test_tool_names_stay_unique_after_sanitizing_and_namespacing():
+    from types import SimpleNamespace
+    from mcp_llm_bridge.multi_client import MultiMCPClient
+    
+    class Server:
+        def __init__(self, names): self.names = names
+        async def connect(self): pass
+        async def __aexit__(self, *exc): pass
+        def register_notification_handler(self, method, handler): pass
+        async def get_available_tools(self):
+            return [SimpleNamespace(name=name, description=name, inputSchema={"type": "object"}) for name in self.names]
+        async def call_tool(self, name, arguments): return name
+    
+    # `view-template` and `view_template` reach the LLM under the same name, and `b__view_template` is taken
+    config = BridgeConfig(mcp_server_params={"a": Server(["view-template", "b__view_template"]), "b": Server(["view_template"])},
+                          llm_config=LLMConfig(api_key="test", model="test", base_url=None))
+    bridge = MCPLLMBridge(config)
+    assert isinstance(bridge.mcp_client, MultiMCPClient)
+    await bridge._connect_and_discover()
+    try:
+        assert bridge.tool_name_mapping == {"a__view_template": "a__view-template", "b__view_template": "b__view_template",
+                                            "b2__view_template": "b2__view_template"}
+        names = [tool["function"]["name"] for tool in bridge.llm_client.tools if tool["function"]["name"] != "fetch_tool_output"]
+        assert len(names) == len(set(names)) == 3
+        assert await bridge.mcp_client.call_tool("b2__view_template", {}) == "view_template"
+        assert await bridge.mcp_client.call_tool("b__view_template", {}) == "b__view_template"
+        
+        # A single server's look-alike names don't overwrite each other either
+        tools = bridge._convert_mcp_tools_to_openai_format([SimpleNamespace(name=name, description=name) for name in ["x-y", "x_y"]])
+        assert [tool["function"]["name"] for tool in tools] == ["x_y", "x_y_2"]
+        assert bridge.tool_name_mapping["x_y"] == "x-y" and bridge.tool_name_mapping["x_y_2"] == "x_y"
+    finally: await bridge.close()
+
+@pytest.mark.parametrize("mode", ["cprofile", "sample"])
+def test_profiler_writes_cpu_memory_and_slow_callback_reports(tmp_path, mode):
+    import time
+    import pstats
+    import asyncio
+    from mcp_llm_bridge.profiling import Profiler
+    
+    async def blocking_step():
+        await asyncio.sleep(0)
+        buffers = [bytearray(1024 * 1024) for _ in range(8)]
+        time.sleep(0.12)  # Holds the event loop
+        return len(buffers)
+    
+    async def workload():
+        return await asyncio.create_task(blocking_step())
+    
+    with Profiler(str(tmp_path), mode, interval=0.002, slow_callback=0.05, memory_interval=0.02) as profiler:
+        assert asyncio.run(profiler.run(workload()), debug=True) == 8
+    
+    if mode == "cprofile":
+        stats = pstats.Stats(profiler.paths["pstats"])
+        assert any(name == "blocking_step" for _, _, name in stats.stats)
+    else:
+        lines = open(profiler.paths["collapsed"]).read().splitlines()
+        blocked = sum(int(line.rsplit(" ", 1)[1]) for line in lines if "blocking_step" in line)
+        assert blocked >= 10
+    memory = open(profiler.paths["memory"]).read()
+    assert "test_bridge.py" in memory and "peak traced: " in memory
+    assert float(memory.split("peak traced: ")[1].split(" ")[0]) >= 8
+    slow = open(profiler.paths["slow_callbacks"]).read()
+    assert "blocking_step" in slow and "took" in slow
+
+@pytest.mark.asyncio
+async def test_cassette_records_and_replays_llm_and_mcp_traffic(tmp_path):
+    import sys
+    import time
+    import asyncio
+    from types import SimpleNamespace
+    from openai.types.chat import ChatCompletionChunk
+    from mcp_llm_bridge.cassette import Cassette
+    from mcp_llm_bridge.llm_client import LLMClient
+    pytest.importorskip("mcp.server.fastmcp")
+    
+    def chunk(delta, finish_reason=None):
+        return ChatCompletionChunk.model_validate({"id": "c", "object": "chat.completion.chunk", "created": 0,
+            "model": "m", "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]})
+    
+    replies = [
+        [chunk({"tool_calls": [{"index": 0, "id": "call_1", "type": "function",
+                                "function": {"name": "echo", "arguments": '{"text": "pong"}'}}]}, "tool_calls")],
+        [chunk({"content": "The server said "}), chunk({"content": "pong."}, "stop")],
+    ]
+    
+    async def create(**kwargs):
+        async def stream(chunks):
+            for item in chunks:
+                await asyncio.sleep(0.15)
+                yield item
+        return stream(replies.pop(0))
+    
+    fake_openai = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+                                  models=SimpleNamespace(list=AsyncMock()))
+    params = StdioServerParameters(command=sys.executable, args=[os.path.join(os.path.dirname(__file__), "standin_server.py")])
+    config = BridgeConfig(mcp_server_params=params, llm_config=LLMConfig(api_key="test", model="test", base_url=None))
+    path = str(tmp_path / "session.jsonl.gz")
+    
+    async def run(cassette, llm_client):
+        events = []
+        bridge = MCPLLMBridge(config, cassette.mcp_client(params), llm_client)
+        await bridge._connect_and_discover()
+        try: answer = await bridge.process_message("ping the server", sink=events.append)
+        finally: await bridge.close()
+        outputs = [event.output for event in events if type(event).__name__ == "ToolCallEndEvent"]
+        return answer, outputs
+    
+    # Record against the real stand-in server and a scripted LLM stream
+    recording = Cassette(path, "record")
+    recorded = await run(recording, recording.attach(LLMClient(config.llm_config, client=fake_openai)))
+    recording.close()
+    assert recorded == ("The server said pong.", ["pong"])
+    
+    # Replay offline: no server process, no LLM; at full speed, then at recorded pacing
+    with patch('mcp_llm_bridge.mcp_client.stdio_client', side_effect=AssertionError("contacted a server")):
+        started = time.monotonic()
+        replay = Cassette(path, "replay", speed=0)
+        assert await run(replay, replay.attach(LLMClient(config.llm_config))) == recorded
+        assert time.monotonic() - started < 0.2
+        
+        started = time.monotonic()
+        replay = Cassette(path, "replay", speed=1.0)
+        assert await run(replay, replay.attach(LLMClient(config.llm_config))) == recorded
+        assert time.monotonic() - started >= 0.4
+
+@pytest.mark.asyncio
+async def test_load_test_ramps_concurrency_and_finds_knee():
+    import asyncio
+    from types import SimpleNamespace
+    from mcp_llm_bridge.config import LoadTestConfig
+    from mcp_llm_bridge.events import TokenEvent, ToolCallEndEvent
+    from mcp_llm_bridge.loadtest import run_load_test, percentile
+    
+    assert percentile([4, 1, 3, 2], 50) == 2 and percentile([4, 1, 3, 2], 99) == 4
+    
+    # A backend that serves four conversations at once; more just queue up
+    slots = asyncio.Semaphore(4)
+    
+    class FakeConversation:
+        def __init__(self, sink): self.sink = sink
+        async def process_message(self, prompt, stream=True):
+            async with slots:
+                await asyncio.sleep(0.02)
+                self.sink(TokenEvent("The answer "))
+                self.sink(ToolCallEndEvent("list_pipelines", "call_1", 0.01, "ok"))
+                await asyncio.sleep(0.02)
+                self.sink(TokenEvent("is 42."))
+            return "Error: boom" if prompt == "fail" else "The answer is 42."
+    
+    bridge = SimpleNamespace(config=SimpleNamespace(llm_config=SimpleNamespace(model="test")),
+                             conversation=lambda history=None, sink=None: FakeConversation(sink))
+    seen = []
+    report = await run_load_test(bridge, ["hello", "world", "again", "fail"],
+                                 LoadTestConfig(levels=[1, 2, 4, 8, 16], conversations_per_level=16), progress=seen.append)
+    
+    json.dumps(report)
+    steps = report["steps"]
+    assert [step["concurrency"] for step in steps] == [1, 2, 4, 8, 16] and seen == steps
+    assert all(step["conversations"] == 16 and step["error_rate"] == 0.25 for step in steps)
+    assert steps[0]["ttft"]["p50"] < steps[-1]["ttft"]["p50"]
+    assert steps[-1]["latency"]["p99"] > steps[2]["latency"]["p99"] * 2
+    assert steps[2]["throughput"] > steps[0]["throughput"] * 3
+    assert steps[0]["tool_calls"] == 16 and steps[0]["tool_latency"]["p50"] == 0.01
+    assert steps[0]["tokens_per_second"] > 0
+    # Past four in flight throughput stops growing while latency does
+    assert report["knee"] == 4
+
+def test_frozen_build_excludes_only_modules_the_cli_never_imports():
+    import sys
+    import subprocess
+    import importlib.util
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    spec = importlib.util.spec_from_file_location("build_binaries", os.path.join(root, "build_binaries.py"))
+    build_binaries = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(build_binaries)
+    
+    args = build_binaries.pyinstaller_args("computer-test", "onedir", 2)
+    assert "--onedir" in args and args[args.index("--optimize") + 1] == "2"
+    assert args.count("--exclude-module") == len(build_binaries.EXCLUDED_MODULES)
+    
+    # An excluded module the CLI imports would crash the binary at startup
+    probe = ("import sys, openai, mcp_llm_bridge.main, mcp_llm_bridge.bridge\n"
+             "client = openai.AsyncOpenAI(api_key='x', base_url='http://127.0.0.1:9/v1')\n"
+             "client.chat.completions, client.models\n"
+             f"print([m for m in {build_binaries.EXCLUDED_MODULES!r} if m in sys.modules])")
+    env = dict(os.environ, PYTHONPATH=os.path.join(root, "src"))
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, env=env, check=True).stdout
+    assert output.strip() == "[]"
+
+@pytest.mark.asyncio
+async def test_token_usage_is_accounted_per_turn_message_and_session(mock_config):
+    import json
+    import openai
+    from types import SimpleNamespace
+    from mcp_llm_bridge.events import UsageEvent
+    from mcp_llm_bridge.usage import prompt_breakdown
+    
+    def chunk(delta, finish_reason=None):
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(**{"tool_calls": None, **delta}),
+                                                        finish_reason=finish_reason)], usage=None)
+    tool_call = SimpleNamespace(index=0, id="call_1", function=SimpleNamespace(name="list_pipelines", arguments="{}"))
+    replies = [
+        [chunk({"content": None, "tool_calls": [tool_call]}, "tool_calls")],
+        [chunk({"content": "Two pipelines."}, "stop")],
+    ]
+    requests = []
+    
+    async def create(**kwargs):
+        requests.append(kwargs)
+        if "stream_options" in kwargs and len(requests) > 2:
+            raise openai.BadRequestError("stream_options unsupported", response=MagicMock(status_code=400), body=None)
+        chunks = replies.pop(0)
+        async def stream():
+            for item in chunks: yield item
+            # The usage chunk comes last and has no choices
+            if "stream_options" in kwargs:
+                yield SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=300, completion_tokens=20))
+        return stream()
+    
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        mock_mcp = AsyncMock()
+        mock_mcp.get_available_tools.return_value = [
+            SimpleNamespace(name="list_pipelines", description="List pipelines", inputSchema={"type": "object"})]
+        mock_mcp.call_tool.return_value = MagicMock(content=[MagicMock(text="build, deploy")])
+        MockMCPClient.return_value = mock_mcp
+        bridge = MCPLLMBridge(mock_config)
+        await bridge._connect_and_discover()
+        bridge.llm_client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        
+        events = []
+        assert await bridge.process_message("What pipelines exist?", sink=events.append) == "Two pipelines."
+        assert all(request["stream_options"] == {"include_usage": True} for request in requests)
+        usage_events = [event for event in events if isinstance(event, UsageEvent)]
+        assert [event.scope for event in usage_events] == ["turn", "turn", "message"]
+        
+        # Server-reported tokens, with the prompt split by source and scaled to the reported total
+        turn = usage_events[1].usage
+        assert (turn["prompt_tokens"], turn["completion_tokens"], turn["estimated"]) == (300, 20, False)
+        assert sum(turn["prompt_parts"].values()) == pytest.approx(300, abs=2)
+        assert all(turn["prompt_parts"][part] > 0 for part in ("system", "tool_schemas", "tool_results", "history"))
+        assert turn["per_tool"]["list_pipelines"]["schema"] > 0 and turn["per_tool"]["list_pipelines"]["results"] > 0
+        assert bridge.last_usage["total_tokens"] == 640 and bridge.last_usage["requests"] == 2
+        
+        # A server that rejects stream_options is retried without it and its usage estimated
+        replies.append([chunk({"content": "Still two."}, "stop")])
+        assert await bridge.process_message("And now?") == "Still two."
+        assert "stream_options" not in requests[-1] and not bridge.llm_client._stream_usage
+        assert bridge.last_usage["estimated"] and bridge.last_usage["prompt_tokens"] > 0
+        assert bridge.usage.requests == 3 and bridge.usage.total_tokens == 640 + bridge.last_usage["total_tokens"]
+    
+    parts = prompt_breakdown([{"role": "system", "content": "x" * 40}, {"role": "user", "content": "y" * 40}])["prompt_parts"]
+    assert parts == {"system": 10, "tool_schemas": 0, "tool_results": 0, "history": 10}
+
+@pytest.mark.asyncio
+async def test_limiter_orders_by_priority_and_shares_turns_between_flows(mock_config):
+    import time
+    import asyncio
+    from types import SimpleNamespace
+    from mcp_llm_bridge.config import RateLimit
+    from mcp_llm_bridge.llm_client import LLMClient
+    from mcp_llm_bridge.scheduler import Limiter, request_context
+    
+    limiter, order, gate = Limiter("test", max_concurrent=1), [], asyncio.Event()
+    
+    async def call(label, priority, flow):
+        with request_context(priority, flow):
+            async with limiter.slot():
+                order.append(label)
+                await (gate.wait() if label == "first" else asyncio.sleep(0.01))
+    
+    # One busy batch conversation, a second batch one and an interactive one queue behind "first"
+    tasks = []
+    for label, priority, flow in [("first", "batch", "x"), ("a1", "batch", "a"), ("a2", "batch", "a"),
+                                  ("a3", "batch", "a"), ("b1", "batch", "b"), ("i1", "interactive", "i")]:
+        tasks.append(asyncio.create_task(call(label, priority, flow)))
+        await asyncio.sleep(0)
+    assert limiter.stats()["queued"] == 5
+    gate.set()
+    await asyncio.gather(*tasks)
+    assert order == ["first", "i1", "a1", "b1", "a2", "a3"]
+    assert limiter.stats()["queue_wait"]["batch"]["count"] == 5 and limiter.stats()["queue_wait"]["batch"]["max"] > 0
+    
+    # Token bucket: 20 requests/s with no burst spaces five starts ~50ms apart
+    paced, started = Limiter("paced", requests_per_second=20), time.monotonic()
+    for _ in range(5):
+        async with paced.slot(): pass
+    assert time.monotonic() - started >= 0.18
+    
+    # LLMClient.invoke honours the endpoint's limit without the caller doing anything
+    in_flight, peak = [0], [0]
+    async def create(**kwargs):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.02)
+        in_flight[0] -= 1
+        message = SimpleNamespace(content="ok", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+    
+    config = LLMConfig(api_key="test", model="test", base_url="http://limited.invalid/v1",
+                       rate_limit=RateLimit(max_concurrent=1))
+    client = LLMClient(config, client=SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    responses = await asyncio.gather(*(client.fork().invoke_with_prompt(f"q{i}") for i in range(3)))
+    assert [response.content for response in responses] == ["ok"] * 3 and peak[0] == 1
+    assert client.limiter.stats()["started"] == 3
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_and_recovers(mock_config):
+    import asyncio
+    from types import SimpleNamespace
+    from mcp_llm_bridge.config import CircuitConfig
+    
+    mock_config.circuit = CircuitConfig(min_calls=2, error_rate=0.5, open_seconds=0.1, hide_open_tools=True)
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        mock_mcp = AsyncMock()
+        mock_mcp.get_available_tools.return_value = [
+            SimpleNamespace(name=name, description=name, inputSchema={"type": "object"}) for name in ["flaky", "steady"]]
+        mock_mcp.call_tool.side_effect = RuntimeError("upstream 502")
+        MockMCPClient.return_value = mock_mcp
+        bridge = MCPLLMBridge(mock_config)
+        await bridge._connect_and_discover()
+        
+        def call(n): return {"id": f"call_{n}", "type": "function", "function": {"name": "flaky", "arguments": "{}"}}
+        visible = lambda: [tool["function"]["name"] for tool in bridge.llm_client.tool_filter(bridge.llm_client.tools)]
+        
+        # Two failures open the circuit; the next call fails fast without reaching the server
+        outputs = [response["output"] for response in await bridge._handle_tool_calls([call(1), call(2), call(3)])]
+        assert outputs[:2] == ["Error: upstream 502"] * 2 and "temporarily disabled" in outputs[2]
+        assert mock_mcp.call_tool.call_count == 2
+        assert bridge.circuits.stats()["flaky"]["state"] == "open" and bridge.circuits.stats()["flaky"]["rejected"] == 1
+        assert "flaky" not in visible() and "steady" in visible()
+        
+        # After the cool-down one trial call goes through; its success closes the circuit
+        await asyncio.sleep(0.12)
+        assert "flaky" in visible()
+        mock_mcp.call_tool.side_effect = None
+        mock_mcp.call_tool.return_value = MagicMock(content=[MagicMock(text="ok")], isError=False)
+        outputs = [response["output"] for response in await bridge._handle_tool_calls([call(4), call(5)])]
+        assert outputs == ["ok", "ok"] and bridge.circuits.stats()["flaky"]["state"] == "closed"
+        
+        # Error results (e.g. the model asking for a missing template) don't open the circuit
+        mock_mcp.call_tool.return_value = MagicMock(content=[MagicMock(text="no such template")], isError=True)
+        outputs = [response["output"] for response in await bridge._handle_tool_calls([call(n) for n in range(6, 10)])]
+        assert "temporarily disabled" not in "".join(outputs) and bridge.circuits.stats()["flaky"]["state"] == "closed"
+        
+        # Hung calls time out (in the calling task) and count as failures
+        bridge.circuits.config.call_timeout = 0.05
+        async def hang(*args): await asyncio.Event().wait()
+        mock_mcp.call_tool.side_effect = hang
+        steady = [{"id": f"call_s{n}", "type": "function", "function": {"name": "steady", "arguments": "{}"}} for n in range(3)]
+        outputs = [response["output"] for response in await bridge._handle_tool_calls(steady)]
+        assert outputs[:2] == ["Error: steady timed out after 0.05s"] * 2 and "temporarily disabled" in outputs[2]
+
+@pytest.mark.asyncio
+async def test_request_builder_keeps_a_stable_prefix_across_turns(mock_config):
+    import json
+    from types import SimpleNamespace
+    from mcp_llm_bridge.llm_client import LLMClient
+    
+    sent = []
+    async def create(**kwargs):
+        sent.append(json.dumps({"tools": kwargs["tools"], "messages": kwargs["messages"]}))
+        message = SimpleNamespace(content="ok", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+    
+    client = LLMClient(mock_config.llm_config, client=SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    client.system_prompt = "Be brief."
+    schema = lambda *keys: {"type": "object", "properties": {key: {"type": "string"} for key in keys}}
+    client.tools = [{"type": "function", "function": {"name": "zeta", "description": "z", "parameters": schema("b", "a")}},
+                    {"type": "function", "function": {"name": "alpha", "description": "a", "parameters": schema("a", "b")}}]
+    
+    await client.invoke_with_prompt("first question")
+    await client.invoke([{"tool_call_id": "call_1", "output": "x" * 2000}])
+    await client.invoke_with_prompt("second question")
+    
+    # Every request starts with the previous one, tools sorted with key-sorted schemas
+    requests = [json.loads(text) for text in sent]
+    assert [tool["function"]["name"] for tool in requests[0]["tools"]] == ["alpha", "zeta"]
+    assert list(requests[0]["tools"][1]["function"]["parameters"]["properties"]) == ["a", "b"]
+    for before, after in zip(requests, requests[1:]):
+        assert after["tools"] == before["tools"] and after["messages"][:len(before["messages"])] == before["messages"]
+    stats = client.request_builder.stats()
+    assert stats["requests"] == 3 and stats["last_reuse"] > 0.9
+    
+    # A rewritten history is rebuilt from the first difference
+    client.messages = client.messages[:1]
+    await client.invoke_with_prompt("start over")
+    assert [message["role"] for message in json.loads(sent[-1])["messages"]] == ["system", "user", "user"]
+    assert client.request_builder.last_reuse < stats["last_reuse"]
+
+@pytest.mark.asyncio
+async def test_identical_idempotent_tool_calls_share_one_request(mock_config):
+    import asyncio
+    from types import SimpleNamespace
+    
+    calls = []
+    async def call_tool(name, arguments):
+        calls.append(name)
+        await asyncio.sleep(0.05)
+        return MagicMock(content=[MagicMock(text=f"{name} {arguments}")], isError=False)
+    
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        mock_mcp = AsyncMock()
+        mock_mcp.get_available_tools.return_value = [
+            SimpleNamespace(name="view_template", description="v", inputSchema={"type": "object"},
+                            annotations=SimpleNamespace(readOnlyHint=True)),
+            SimpleNamespace(name="deploy", description="d", inputSchema={"type": "object"}, annotations=None)]
+        mock_mcp.call_tool.side_effect = call_tool
+        MockMCPClient.return_value = mock_mcp
+        bridge = MCPLLMBridge(mock_config)
+        await bridge._connect_and_discover()
+        
+        def call(n, name, arguments): return {"id": f"call_{n}", "type": "function",
+                                              "function": {"name": name, "arguments": arguments}}
+        
+        # Two conversations ask for the same template at once (arguments in a different key order)
+        turns = await asyncio.gather(
+            bridge._handle_tool_calls([call(1, "view_template", '{"name": "ci", "rev": 2}')]),
+            bridge._handle_tool_calls([call(2, "view_template", '{"rev": 2, "name": "ci"}')]))
+        assert calls == ["view_template"] and turns[0][0]["output"] == turns[1][0]["output"]
+        assert [turn[0]["tool_call_id"] for turn in turns] == ["call_1", "call_2"]
+        
+        # Duplicates within one turn are answered once; tools that aren't idempotent always run
+        calls.clear()
+        responses = await bridge._handle_tool_calls([
+            call(3, "view_template", '{"name": "ci"}'), call(4, "view_template", '{"name": "ci"}'),
+            call(5, "deploy", '{"name": "ci"}'), call(6, "deploy", '{"name": "ci"}')])
+        assert calls == ["view_template", "deploy", "deploy"] and len(responses) == 4
+        assert bridge.single_flight.saved_calls == 2 and not bridge.single_flight.calls
+
+@pytest.mark.asyncio
+async def test_prompt_cache_reuses_answers_for_near_duplicate_read_only_prompts(mock_config, tmp_path):
+    from types import SimpleNamespace
+    from mcp_llm_bridge.config import PromptCacheConfig
+    from mcp_llm_bridge.events import CacheHitEvent
+    
+    mock_config.prompt_cache = PromptCacheConfig(path=str(tmp_path / "cache.db"))
+    requests = []
+    
+    async def create(**kwargs):
+        requests.append(kwargs)
+        prompt = next(m["content"] for m in kwargs["messages"] if m["role"] == "user")
+        if kwargs["messages"][-1]["role"] == "user":
+            name = "deploy" if "deploy" in prompt else "view_template"
+            call = SimpleNamespace(id="call_1", function=SimpleNamespace(name=name, arguments="{}"))
+            message = SimpleNamespace(content="", tool_calls=[call])
+            return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="tool_calls")], usage=None)
+        message = SimpleNamespace(content=f"Done: {kwargs['messages'][-1]['content']}", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+    
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        mock_mcp = AsyncMock()
+        mock_mcp.get_available_tools.return_value = [
+            SimpleNamespace(name="view_template", description="v", inputSchema={"type": "object"},
+                            annotations=SimpleNamespace(readOnlyHint=True)),
+            SimpleNamespace(name="deploy", description="d", inputSchema={"type": "object"}, annotations=None)]
+        mock_mcp.call_tool.return_value = MagicMock(content=[MagicMock(text="pipeline { }")], isError=False)
+        MockMCPClient.return_value = mock_mcp
+        bridge = MCPLLMBridge(mock_config)
+        await bridge._connect_and_discover()
+        bridge.llm_client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        
+        async def ask(prompt):
+            events = []
+            answer = await bridge.conversation(sink=events.append).process_message(prompt, stream=False)
+            return answer, [event for event in events if isinstance(event, CacheHitEvent)]
+        
+        answer, hits = await ask("show me the build template")
+        assert answer == "Done: pipeline { }" and not hits and len(requests) == 2
+        
+        # Casing, punctuation and a filler word don't matter; the hit is announced and costs no LLM call
+        cached, hits = await ask("  Show the BUILD template!")
+        assert cached == answer and len(requests) == 2
+        assert hits[0].prompt == "show me the build template" and hits[0].similarity >= 0.8
+        assert (await ask("show me the test template"))[1] == [] and len(requests) == 4
+        
+        # Answers that needed a tool with side effects are never cached
+        await ask("deploy the build template")
+        assert (await ask("deploy the build template"))[1] == [] and len(requests) == 8
+        await bridge.close()
+
+@pytest.mark.asyncio
+async def test_repl_keeps_one_bridge_warm_across_prompts(mock_config, capsys):
+    import asyncio
+    from types import SimpleNamespace
+    from mcp_llm_bridge import repl as repl_module
+    from mcp_llm_bridge.repl import Repl, compact_history
+    
+    async def create(**kwargs):
+        last = kwargs["messages"][-1]
+        if last["role"] == "user" and "template" in last["content"]:
+            call = SimpleNamespace(id=f"call_{len(kwargs['messages'])}", function=SimpleNamespace(name="view_template", arguments="{}"))
+            message = SimpleNamespace(content="", tool_calls=[call])
+            return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="tool_calls")], usage=None)
+        message = SimpleNamespace(content=f"answer after {len(kwargs['messages'])} messages", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+    
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        mock_mcp = AsyncMock()
+        mock_mcp.get_available_tools.return_value = [SimpleNamespace(name="view_template", description="v", inputSchema={"type": "object"})]
+        mock_mcp.call_tool.return_value = MagicMock(content=[MagicMock(text="pipeline { " + "stage { } " * 100 + "}")], isError=False)
+        mock_mcp.session = SimpleNamespace(send_ping=AsyncMock())
+        MockMCPClient.return_value = mock_mcp
+        bridge = MCPLLMBridge(mock_config)
+        await bridge._connect_and_discover()
+        bridge.llm_client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+                                                   models=SimpleNamespace(list=AsyncMock()))
+        
+        lines = iter(["show the build template", "and the deploy one?", "/timing", "/compact", "/tools", "/clear",
+                      "hello again", "/exit", "never read"])
+        async def read_line(prompt):
+            await asyncio.sleep(0.03)  # Idle time for the keepalive
+            return next(lines)
+        
+        with patch.object(repl_module, "_read_line", read_line):
+            await Repl(bridge, stream=False, show_usage=False, keepalive=0.02).run()
+        out = capsys.readouterr().out
+        
+        # Follow-ups saw the earlier turns; the MCP session was connected once and kept pinged
+        assert "answer after 4 messages" in out and "answer after 6 messages" in out
+        assert mock_mcp.connect.await_count == 1 and mock_mcp.session.send_ping.await_count >= 3
+        assert "last turn:" in out and "tools 0.00s over 0 call(s)" in out
+        assert "Nothing to compact." in out and "1 tools: view_template" in out and "Context cleared." in out
+        assert "answer after 2 messages" in out and next(lines) == "never read"
+    
+    history = [{"role": "user", "content": "q1"}, {"role": "tool", "tool_call_id": "c", "content": "x" * 1000},
+               {"role": "user", "content": "q2"}, {"role": "tool", "tool_call_id": "d", "content": "y" * 1000}]
+    assert compact_history(history, keep_turns=1) > 600
+    assert len(history[1]["content"]) < 400 and history[3]["content"] == "y" * 1000
+
+@pytest.mark.asyncio
+async def test_repl_shows_answers_that_were_not_streamed(mock_config, capsys):
+    from types import SimpleNamespace
+    from mcp_llm_bridge.repl import Repl
+    
+    async def create(**kwargs):
+        if kwargs["messages"][-1]["content"] == "fail": raise RuntimeError("model unavailable")
+        async def stream():
+            for text, finish_reason in [("stream", None), ("ed", "stop")]:
+                yield SimpleNamespace(usage=None, choices=[SimpleNamespace(
+                    delta=SimpleNamespace(content=text, tool_calls=None), finish_reason=finish_reason)])
+        return stream()
+    
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        MockMCPClient.return_value = AsyncMock()
+        bridge = MCPLLMBridge(mock_config)
+        bridge.llm_client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        repl = Repl(bridge, show_usage=False, keepalive=None)
+        
+        # A failing turn in stream mode streams nothing, so its error is printed
+        await repl.ask("fail")
+        assert "Error: model unavailable" in capsys.readouterr().out
+        # A streamed answer isn't printed a second time
+        await repl.ask("hi")
+        assert "streamed" not in capsys.readouterr().out
+
+@pytest.mark.asyncio
+async def test_repl_recovers_from_a_missed_ping_and_reconnects_multiple_servers():
+    import asyncio
+    from types import SimpleNamespace
+    from mcp_llm_bridge.repl import Repl
+    
+    class Server:
+        def __init__(self, names):
+            self.names, self.connects, self.pings, self.down = names, 0, [], False
+            self.session = SimpleNamespace(send_ping=self.ping)
+        async def ping(self):
+            if self.pings.pop(0) if self.pings else False: raise ConnectionError("no answer")
+        async def connect(self):
+            if self.down: raise ConnectionError("refused")
+            self.connects += 1
+        async def __aexit__(self, *exc): pass
+        def register_notification_handler(self, method, handler): pass
+        async def get_available_tools(self):
+            return [SimpleNamespace(name=name, description=name, inputSchema={"type": "object"}) for name in self.names]
+        async def call_tool(self, name, arguments): return name
+    
+    first, second, third = Server(["echo"]), Server(["deploy"]), Server(["status"])
+    third.down = True
+    config = BridgeConfig(mcp_server_params={"a": first, "b": second, "c": third},
+                          llm_config=LLMConfig(api_key="test", model="test", base_url=None))
+    bridge = MCPLLMBridge(config)
+    await bridge._connect_and_discover()
+    bridge.llm_client.prewarm = AsyncMock()
+    try:
+        # One unanswered ping marks the session lost; the next answered one clears it again
+        async def until(condition):
+            for _ in range(200):
+                if condition(): return True
+                await asyncio.sleep(0.005)
+        repl = Repl(bridge, stream=False, show_usage=False, keepalive=0.005, ping_timeout=0.1)
+        second.pings = [True, False]
+        keep_warm = asyncio.create_task(repl._keep_warm())
+        assert await until(lambda: repl.mcp_lost)
+        assert await until(lambda: not repl.mcp_lost) and not second.pings
+        keep_warm.cancel()
+        
+        # Several servers reconnect together and their tools are reloaded
+        second.names = ["deploy", "rollback"]
+        await bridge.reconnect()
+        assert first.connects == second.connects == 2
+        assert {"echo", "deploy", "rollback"} <= set(bridge.tool_name_mapping)
+        assert await bridge.mcp_client.call_tool("rollback", {}) == "rollback"
+        
+        # A server that was down is kept aside, retried by the keepalive and its tools loaded before the next prompt
+        assert list(bridge.mcp_client.failed) == ["c"] and "status" not in bridge.tool_name_mapping
+        third.down = False
+        bridge.process_message = AsyncMock(return_value="ok")
+        keep_warm = asyncio.create_task(repl._keep_warm())
+        assert await until(lambda: repl.tools_stale)
+        keep_warm.cancel()
+        await repl.ask("status?")
+        assert not bridge.mcp_client.failed and list(bridge.mcp_client.clients) == ["a", "b", "c"]
+        assert "status" in bridge.tool_name_mapping and not repl.tools_stale
+        
+        # One that blips during a reconnect comes back on the next one
+        third.down = True
+        await bridge.reconnect()
+        assert list(bridge.mcp_client.failed) == ["c"]
+        third.down = False
+        await bridge.reconnect()
+        assert not bridge.mcp_client.failed and third.connects == 2
+    finally: await bridge.close()
+
+@pytest.mark.asyncio
+async def test_cancelling_a_turn_closes_the_stream_cancels_tool_calls_and_rolls_back(mock_config):
+    import asyncio
+    from types import SimpleNamespace
+    from mcp_llm_bridge.mcp_client import call_cancellable
+    
+    closed, started = [], asyncio.Event()
+    def chunk(content=None, tool_call=None, finish_reason=None):
+        delta = SimpleNamespace(content=content, tool_calls=[tool_call] if tool_call else None)
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+    
+    class Stream:
+        def __init__(self, chunks, hang=False): self.chunks, self.hang = chunks, hang
+        def __aiter__(self): return self
+        async def __anext__(self):
+            if self.chunks: return self.chunks.pop(0)
+            if self.hang:
+                started.set()
+                await asyncio.Event().wait()
+            raise StopAsyncIteration
+        async def close(self): closed.append(self)
+    
+    async def create(**kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        if prompt == "use the tool":
+            call = SimpleNamespace(index=0, id="call_1", function=SimpleNamespace(name="slow_tool", arguments="{}"))
+            return Stream([chunk(tool_call=call), chunk(finish_reason="tool_calls")])
+        return Stream([chunk("par")], hang=prompt == "hang") if prompt != "hello" else Stream([chunk("hi", finish_reason="stop")])
+    
+    async def hung_tool(*args):
+        started.set()
+        await asyncio.Event().wait()
+    
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        mock_mcp = AsyncMock()
+        mock_mcp.get_available_tools.return_value = [SimpleNamespace(name="slow_tool", description="s", inputSchema={"type": "object"})]
+        mock_mcp.call_tool.side_effect = hung_tool
+        MockMCPClient.return_value = mock_mcp
+        bridge = MCPLLMBridge(mock_config)
+        await bridge._connect_and_discover()
+        bridge.llm_client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        sink = AsyncMock()
+        
+        assert await bridge.process_message("hello", True, sink=sink) == "hi"
+        history = list(bridge.llm_client.messages)
+        for prompt in ("use the tool", "hang"):
+            started.clear()
+            turn = asyncio.create_task(bridge.process_message(prompt, True, sink=sink))
+            await asyncio.wait_for(started.wait(), 1)
+            turn.cancel()
+            with pytest.raises(asyncio.CancelledError): await turn
+            # The partial turn (including the tool call that never got a result) is gone
+            assert bridge.llm_client.messages == history
+        assert len(closed) == 3 and closed[-1].hang
+        assert await bridge.process_message("hello", True, sink=sink) == "hi"
+        
+        # A closing MCP connection that hangs doesn't hang shutdown
+        async def hung_exit(*args): await asyncio.Event().wait()
+        mock_mcp.__aexit__.side_effect = hung_exit
+        bridge.config.shutdown_timeout = 0.05
+        await asyncio.wait_for(bridge.close(), 1)
+    
+    # The server is told which request was abandoned
+    session = SimpleNamespace(_request_id=7, call_tool=lambda *args, **kwargs: asyncio.Event().wait(), send_notification=AsyncMock())
+    call = asyncio.create_task(call_cancellable(session, "slow_tool", {}))
+    await asyncio.sleep(0.01)
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError): await call
+    notification = session.send_notification.await_args.args[0].root
+    assert notification.method == "notifications/cancelled" and notification.params.requestId == 7
+
+@pytest.mark.asyncio
+async def test_cancellation_and_shutdown_against_a_real_server(tmp_path):
+    import sys
+    import time
+    import signal
+    import asyncio
+    pytest.importorskip("mcp.server.fastmcp")
+    standin = os.path.join(os.path.dirname(__file__), "standin_server.py")
+    params = StdioServerParameters(command=sys.executable, args=[standin])
+    config = BridgeConfig(mcp_server_params=params, llm_config=LLMConfig(api_key="test", model="test", base_url="http://127.0.0.1:9/v1"))
+    
+    async def until(condition):
+        for _ in range(200):
+            if condition(): return True
+            await asyncio.sleep(0.05)
+    
+    marker = tmp_path / "wait"
+    async with BridgeManager(config) as bridge:
+        # A cancelled call stops on the server too, and the session stays usable
+        call = asyncio.create_task(bridge._call_tool("wait", {"seconds": 30, "marker": str(marker)}))
+        assert await until(marker.exists)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError): await call
+        assert await until(lambda: marker.read_text() == "cancelled")
+        assert (await bridge._call_tool("echo", {"text": "still here"})).content[0].text == "still here"
+        
+        # Leaving the context is bounded by shutdown_timeout and doesn't raise, even when it runs out
+        config.shutdown_timeout = 0.001
+        started = time.monotonic()
+    assert time.monotonic() - started < 2
+    
+    # Ctrl+C while the CLI waits on the model ends the run with status 130 and no traceback
+    requested = asyncio.Event()
+    async def llm_endpoint(reader, writer):
+        while True:
+            request = await reader.readuntil(b"\r\n\r\n")
+            if b"/chat/completions" in request:
+                requested.set()
+                await asyncio.Event().wait()
+            body = b'{"object": "list", "data": []}'
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+            await writer.drain()
+    server = await asyncio.start_server(llm_endpoint, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/v1"
+    script = (f"import sys\nfrom mcp import StdioServerParameters\nfrom mcp_llm_bridge import main\n"
+              f"from mcp_llm_bridge.config import BridgeConfig, LLMConfig\n"
+              f"main.build_config = lambda session=None: BridgeConfig(mcp_server_params=StdioServerParameters("
+              f"command=sys.executable, args=[{standin!r}]), llm_config=LLMConfig(api_key='test', model='test', base_url={url!r}))\n"
+              f"sys.argv = ['computer', 'hello']\nmain.cli_entry_point()\n")
+    env = dict(os.environ, PYTHONPATH=os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+    process = await asyncio.create_subprocess_exec(sys.executable, "-c", script, env=env, stdin=asyncio.subprocess.DEVNULL,
+                                                   stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    try:
+        await asyncio.wait_for(requested.wait(), 30)
+        process.send_signal(signal.SIGINT)
+        stdout, stderr = await asyncio.wait_for(process.communicate(), 10)
+    finally:
+        if process.returncode is None: process.kill()
+        server.close()
+    assert process.returncode == 130
+    assert b"Interrupted." in stderr and b"Traceback" not in stderr
+
+@pytest.mark.asyncio
+async def test_condensed_outputs_stay_with_their_conversation(mock_config):
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        mock_mcp_instance = AsyncMock()
+        MockMCPClient.return_value = mock_mcp_instance
+        bridge = MCPLLMBridge(mock_config)
+        bridge.tool_name_mapping = {"execute_command": "execute_command"}
+        first, second = bridge.conversation(), bridge.conversation()
+        
+        def offered(conversation):
+            tools = conversation.llm_client.tools + conversation.llm_client.extra_tools
+            return [tool["function"]["name"] for tool in tools]
+        
+        def call(name, arguments, call_id="call_1"):
+            return {"id": call_id, "function": {"name": name, "arguments": arguments}}
+        
+        # Nothing condensed yet, so nobody is offered the fetch tool
+        assert "fetch_tool_output" not in offered(first) + offered(second)
+        
+        # Both models reuse the same tool_call_id for different long outputs
+        for conversation, word in [(first, "alpha"), (second, "beta")]:
+            mock_mcp_instance.call_tool.return_value = "\n".join(f"{word} {i}" for i in range(500))
+            await bridge._handle_tool_calls([call("execute_command", '{"command": "build"}')], conversation=conversation)
+        assert "fetch_tool_output" in offered(first) and "fetch_tool_output" in offered(second)
+        assert "fetch_tool_output" not in offered(bridge.conversation())
+        
+        # Each conversation pages through its own original, and no other
+        fetch = call("fetch_tool_output", '{"tool_call_id": "call_1", "limit": 1}', "call_2")
+        assert (await bridge._handle_tool_calls([fetch], conversation=first))[0]["output"].startswith("alpha 0")
+        assert (await bridge._handle_tool_calls([fetch], conversation=second))[0]["output"].startswith("beta 0")
+        assert (await bridge._handle_tool_calls([fetch], conversation=bridge.conversation()))[0]["output"].startswith("Error")
+
+@pytest.mark.asyncio
+async def test_refreshed_tools_reach_existing_conversations(mock_config):
+    from types import SimpleNamespace
+    with patch('mcp_llm_bridge.bridge.MCPClient') as MockMCPClient:
+        mock_mcp_instance = AsyncMock()
+        MockMCPClient.return_value = mock_mcp_instance
+        tool = lambda name: SimpleNamespace(name=name, description=name, inputSchema={"type": "object"})
+        mock_mcp_instance.get_available_tools.return_value = [tool("old-tool"), tool("kept")]
+        
+        bridge = MCPLLMBridge(mock_config)
+        await bridge.refresh_tools()
+        conversation = bridge.conversation()
+        
+        # The server swaps a tool; the conversation opened before the reload sees the new catalog
+        mock_mcp_instance.get_available_tools.return_value = [tool("kept"), tool("new-tool")]
+        await bridge.refresh_tools()
+        names = [t["function"]["name"] for t in conversation.llm_client.tools]
+        assert names == ["kept", "new_tool"]
+        
+        # The removed tool no longer resolves, and its schema is gone
+        assert bridge.tool_name_mapping == {"kept": "kept", "new_tool": "new-tool"}
+        assert "old-tool" not in bridge.tool_validators
+        call = {"id": "call_1", "function": {"name": "old_tool", "arguments": "{}"}}
+        assert await bridge._handle_tool_calls([call], conversation=conversation) == []
+        mock_mcp_instance.call_tool.assert_not_called()